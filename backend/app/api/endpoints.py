@@ -1,36 +1,55 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import time
 import uuid
+import json
+import hashlib
+import hmac
 from datetime import datetime
 # Import our custom services (The "Brain" modules)
 from app.nlu.classifier import predict_intent
+from app.nlu.gurmukhi import gloss
 # from app.nlu.entity_extractor import extract_entities
-from app.rag.retriever import hybrid_search
+from app.rag.retriever import hybrid_search, prefetch_search, index_generation, content_search, check_content_version
 from app.rag.generator import generate_response
+from app.rag.reranker import rerank
+from app.rag.facet_index import get_facet_index, filters_from_entities
+from app.rag.fast_path import try_fast_path, render_retrieval_answer
+from app.rag.sync import sync_status
+from app.rag.compaction import compaction_status
+from app.rag.faq_matcher import get_faq_matcher, load_faq_matcher
 from app.core.logger import log_interaction
-from sarvamai import SarvamAI
-import os
-from dotenv import load_dotenv
+from app.core.caches import answer_cache, embedding_cache, translation_cache
+from app.services.session_store import session_store
+from app.services.speech import SpeechSession, get_speech_backend
+from app.core import metrics
+from app.core import sarvam_client
+from app.core import config
+from app.core import tracing
+from app.core.deadline import Deadline
+from app.core.admission import AdmissionRejected, client_ip, get_admission_limiter
+from app.core.singleflight import SingleFlight, normalize_text
 
-load_dotenv()
-client = SarvamAI(api_subscription_key=os.getenv("SARVAM_API_KEY"))
-
-def translate_text(text: str, source_lang: str, target_lang: str) -> str:
-    """Translate text using Sarvam AI"""
+def translate_text(text: str, source_lang: str, target_lang: str, timeout: Optional[float] = None) -> str:
+    """Translate text using Sarvam AI (falls back to the original text on failure)"""
+    key = (source_lang, target_lang, normalize_text(text))
+    cached = translation_cache.get(key)
+    if cached is not None:
+        tracing.record("translate", time.perf_counter(), target=target_lang, chars=len(text), cached=True)
+        return cached
     try:
-        response = client.text.translate(
-            input=text,
-            source_language_code=source_lang,
-            target_language_code=target_lang,
-            mode="formal",
-            model="sarvam-translate:v1",
-            numerals_format="native",
-            speaker_gender="Male",
-            enable_preprocessing=False
-        )
-        return response.translated_text
+        with tracing.span("translate", target=target_lang, chars=len(text)) as span:
+            translated = sarvam_client.translate(text, source_lang, target_lang, timeout=timeout)
+            span.set(translated_chars=len(translated or ""))
+        if translated and translated != text:
+            translation_cache.put(key, translated)  # failures are retried next time
+        return translated
+    except sarvam_client.CircuitOpenError:
+        print(f"Translation circuit open, returning original text")
+        return text
     except AttributeError:
         print(f"Translation API not available, returning original text")
         return text
@@ -56,58 +75,283 @@ class ChatResponse(BaseModel):
     timestamp: str
 
 # --- 2. The Chat Logic ---
+# Identical concurrent requests share one computation (see app/core/singleflight.py)
+translate_flight = SingleFlight("translate")
+answer_flight = SingleFlight("answer")
+
+def answer_query(query: str, language: str, intent: str, entities: list,
+                 history: Optional[List[Dict[str, str]]], summary: str,
+                 deadline: Deadline) -> Dict[str, Any]:
+    """
+    Retrieval -> Generation -> back-translation for an already understood query.
+    Blocking; runs in the threadpool and may be shared by coalesced requests.
+    Each stage checks `deadline` and falls back to a cheaper mode when time is short.
+    """
+    # Fast path: fully structured job searches are answered from the facet index
+    # with a template in the user's language (no retrieval, LLM or back-translation)
+    generation_stats = {}
+    upstream_calls = 0
+    with tracing.span("fast_path") as span:
+        fast_answer = try_fast_path(query, intent, entities, language=language)
+        span.set(hit=bool(fast_answer))
+    if fast_answer:
+        final_answer, rows = fast_answer
+        english_response = final_answer
+        sources = ["facet_index" for _ in rows]
+        answer_path = "template"
+    else:
+        # Step 2: Retrieval Layer (English, or Punjabi in PA_QUERY_MODE native/parallel; filtered by entities):
+        # a wide candidate set, reranked down to the few docs that go into the prompt
+        candidates, rerank_ms = config.RERANK_CANDIDATES, None
+        if deadline.remaining() < config.DEADLINE_FULL_RETRIEVAL:
+            deadline.degrade("fewer_candidates")
+            candidates, rerank_ms = 10, 0  # feature scores only
+        with tracing.span("retrieval", candidates=candidates) as span:
+            candidate_docs = hybrid_search(query, top_k=candidates, entities=entities, candidates=candidates)
+            span.set(hits=len(candidate_docs))
+        # Scheme and training questions also get the best matching content documents
+        # (in-memory content index), ahead of the jobs
+        with tracing.span("content_search", intent=intent) as span:
+            content_docs = content_search(query, intent, top_k=min(config.CONTENT_TOP_K, config.RERANK_TOP_N - 1))
+            span.set(hits=len(content_docs))
+        with tracing.span("rerank", docs=len(candidate_docs)):
+            top_docs = rerank(query, candidate_docs, entities, top_n=config.RERANK_TOP_N - len(content_docs), max_ms=rerank_ms)
+        top_docs = content_docs + top_docs
+        sources = [doc['source'] for doc in top_docs]
+        
+        canned = intent in ["general_query", "off_topic"]
+        if not canned and deadline.remaining() < config.DEADLINE_MIN_COMPLETION:
+            # No time for a completion: list the retrieved jobs with the templates
+            # in the user's language (field values are not translated)
+            deadline.degrade("retrieval_only")
+            english_response = render_retrieval_answer(top_docs, "en")
+            final_answer = render_retrieval_answer(top_docs, language)
+            answer_path = "retrieval_only"
+        else:
+            # Step 3: Generation (always in English first)
+            english_response = generate_response(
+                query=query, 
+                context_docs=top_docs,
+                intent=intent,
+                language="en",  # Always generate in English first
+                history=history,
+                summary=summary,
+                stats=generation_stats,
+                deadline=deadline
+            )
+            answer_path = "canned" if canned else "llm"
+            upstream_calls += 1 if answer_path == "llm" else 0
+            
+            # Step 4: Translate response back to Punjabi if needed
+            final_answer = english_response
+            if language == "pa":
+                if deadline.remaining() < config.DEADLINE_MIN_TRANSLATE:
+                    deadline.degrade("untranslated_answer")
+                else:
+                    final_answer = translate_text(english_response, "en-IN", "pa-IN",
+                                                  timeout=deadline.timeout(config.SARVAM_TRANSLATE_TIMEOUT))
+                    upstream_calls += 1
+                    if final_answer == english_response:
+                        deadline.degrade("untranslated_answer")
+                    print(f"Translated response: {final_answer}")
+    print(f"🛣️ Answer path: {answer_path}")
+    
+    return {
+        "final_answer": final_answer,
+        "english_response": english_response,
+        "sources": sources,
+        "answer_path": answer_path,
+        "generation_stats": generation_stats,
+        "upstream_calls": upstream_calls,
+        "degradations": list(deadline.degradations)
+    }
+
+def _history_digest(summary: str, history: Optional[List[Dict[str, str]]]) -> str:
+    return hashlib.sha1(json.dumps([summary, history or []], sort_keys=True).encode("utf-8")).hexdigest()
+
+def _finished_translation(translation: asyncio.Future, original: str) -> Optional[str]:
+    """
+    Result of a background query translation if it has already arrived, else None.
+    """
+    if not translation.done():
+        translation.add_done_callback(lambda f: f.exception())  # don't log "exception never retrieved"
+        return None
+    if translation.exception() is not None:
+        return None
+    text, _ = translation.result()
+    return text if text != original else None
+
+def _admin_token_valid(token: Optional[str]) -> bool:
+    return bool(config.ADMIN_TOKEN) and hmac.compare_digest(token or "", config.ADMIN_TOKEN)
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest, background_tasks: BackgroundTasks):
+async def chat_endpoint(payload: ChatRequest, background_tasks: BackgroundTasks,
+                        x_profile: Optional[str] = Header(None), x_admin_token: Optional[str] = Header(None)):
+    """
+    Traces the request (span tree, slow-request log; see app/core/tracing.py).
+    With `X-Profile: 1` and the admin token, the trace and a CPU profile are returned in meta.trace.
+    """
+    profile = (x_profile or "").lower() in ("1", "true")
+    if profile and not _admin_token_valid(x_admin_token):
+        metrics.incr("tracing.profile_denied")
+        profile = False
+    with tracing.trace("chat", profile=profile) as trace:
+        response = await _chat(payload, background_tasks)
+    if profile:
+        response.meta["trace"] = trace.to_dict()
+    return response
+
+async def _chat(payload: ChatRequest, background_tasks: BackgroundTasks) -> ChatResponse:
     start_time = time.time()
     """
     Multilingual Chat Pipeline: NLU -> Retrieval -> Generation -> Response
     """
+    # Latency budget shared by every stage of this request
+    deadline = Deadline()
     try:
         # Generate session and response IDs
         session_id = payload.session_id or str(uuid.uuid4())
         response_id = str(uuid.uuid4())
+        tracing.annotate(response_id=response_id, session_id=session_id, language=payload.language,
+                         chars=len(payload.message))
+        
+        # Conversation memory: legacy clients still send history, others rely on the session store
+        history = payload.history
+        summary = ""
+        if history is None:
+            summary, history = session_store.get_context(session_id)
         
         # Translation workflow for Punjabi
         query_for_processing = payload.message
-        if payload.language == "pa":
+        nlu_text = payload.message
+        translation = None
+        if payload.language == "pa" and config.PA_QUERY_MODE == "translate":
             # Translate Punjabi to English for processing
-            query_for_processing = translate_text(payload.message, "pa-IN", "en-IN")
+            query_for_processing, shared = await translate_flight.run(
+                ("pa-IN", "en-IN", normalize_text(payload.message)),
+                translate_text, payload.message, "pa-IN", "en-IN",
+                deadline.timeout(config.SARVAM_TRANSLATE_TIMEOUT, reserve=config.DEADLINE_MIN_COMPLETION)
+            )
+            if shared:
+                metrics.incr("upstream_calls_saved")
+            if query_for_processing == payload.message:
+                # Translation failed or ran out of time; continue with the original text
+                deadline.degrade("untranslated_query")
+            nlu_text = query_for_processing
             print(f"Translated query: {query_for_processing}")
+        elif payload.language == "pa":
+            # Punjabi-native: keyword NLU on the English gloss, retrieval on the original
+            # text (app/nlu/gurmukhi.py); no translation on the critical path
+            nlu_text = gloss(payload.message)
+            metrics.incr("pa_native.queries")
+            if config.PA_QUERY_MODE == "parallel":
+                # English version for conversation memory, never awaited by the answer
+                translation = asyncio.ensure_future(translate_flight.run(
+                    ("pa-IN", "en-IN", normalize_text(payload.message)),
+                    translate_text, payload.message, "pa-IN", "en-IN",
+                    deadline.timeout(config.SARVAM_TRANSLATE_TIMEOUT)
+                ))
+            print(f"Glossed query: {nlu_text}")
         
-        # Step 1: NLU Layer (always in English)
-        intent = predict_intent(query_for_processing, history=payload.history)
-        from app.nlu.entity_extractor import extract_entities
-        entities = extract_entities(query_for_processing, use_fast=True)  # Use fast extraction
+        # FAQ short-circuit: a curated question gets its stored answer (no NLU, retrieval or LLM)
+        check_content_version()  # reloads the FAQs in the background after faq_ingestion.py
+        faq_matcher = get_faq_matcher()
+        with tracing.span("faq_match") as span:
+            # Off the event loop: the embedding tier runs the sentence-embedding model
+            faq_hit = await run_in_threadpool(faq_matcher.match, nlu_text) if faq_matcher is not None else None
+            span.set(hit=faq_hit is not None)
+        if faq_hit is not None:
+            faq = faq_hit["faq"]
+            tracing.annotate(answer_path="faq")
+            final_answer = faq["answer"]
+            if payload.language != "en":
+                final_answer = await run_in_threadpool(
+                    faq_matcher.answer, faq, payload.language,
+                    lambda text, source, target: translate_text(text, source, target,
+                                                                timeout=deadline.timeout(config.SARVAM_TRANSLATE_TIMEOUT))
+                )
+            session_store.append_turn(session_id, query_for_processing, faq["answer"], intent="faq", entities=[])
+            return ChatResponse(
+                text=final_answer,
+                session_id=session_id,
+                response_id=response_id,
+                original_language=payload.language,
+                meta={
+                    "intent": "faq",
+                    "entities": [],
+                    "sources": ["faq"],
+                    "answer_path": "faq",
+                    "faq_id": faq["id"],
+                    "faq_match": {"method": faq_hit["method"], "score": round(faq_hit["score"], 4)},
+                    "degradations": deadline.degradations,
+                    "processing_time": time.time() - start_time,
+                    "translated_query": query_for_processing if payload.language == "pa" and config.PA_QUERY_MODE == "translate" else None
+                },
+                timestamp=datetime.now().isoformat()
+            )
         
-        # Step 2: Retrieval Layer (always in English)
-        top_docs = hybrid_search(query_for_processing, top_k=3)
+        # Step 1: NLU Layer (keyword rules, English)
+        with tracing.span("intent") as span:
+            intent = predict_intent(nlu_text, history=history)
+            span.set(intent=intent)
+        from app.nlu.entity_extractor import extract_entities
+        with tracing.span("entities") as span:
+            entities = extract_entities(nlu_text, use_fast=True)  # Use fast extraction
+            span.set(count=len(entities))
         
-        # Step 3: Generation (always in English first)
-        english_response = generate_response(
-            query=query_for_processing, 
-            context_docs=top_docs,
-            intent=intent,
-            language="en",  # Always generate in English first
-            history=payload.history
+        # Steps 2-4, coalesced on (query, language, intent, index generation, conversation state)
+        answer_key = (
+            normalize_text(query_for_processing),
+            payload.language,
+            intent,
+            index_generation(),
+            _history_digest(summary, history)
         )
+        # First turns of a conversation are also answered from the answer cache
+        # (pre-warmed with the most frequent logged queries, see app/core/caches.py)
+        cacheable = not history and not summary
+        answer = answer_cache.get(answer_key) if cacheable else None
+        cached, shared = answer is not None, False
+        if cached:
+            metrics.incr("upstream_calls_saved", answer["upstream_calls"])
+        else:
+            answer, shared = await answer_flight.run(
+                answer_key, answer_query,
+                query_for_processing, payload.language, intent, entities, history, summary, deadline
+            )
+            if shared:
+                metrics.incr("upstream_calls_saved", answer["upstream_calls"])
+            elif cacheable and not answer["degradations"]:
+                answer_cache.put(answer_key, answer)
+        final_answer = answer["final_answer"]
+        generation_stats = answer["generation_stats"]
+        tracing.annotate(intent=intent, answer_path=answer["answer_path"], cached=cached, coalesced=shared)
+        # A coalesced answer carries the leader's degradations
+        degradations = deadline.degradations + [d for d in answer["degradations"] if d not in deadline.degradations]
+        
+        translated_query = query_for_processing if payload.language == "pa" and config.PA_QUERY_MODE == "translate" else None
+        if translation is not None:
+            translated_query = _finished_translation(translation, payload.message)
         
-        # Step 4: Translate response back to Punjabi if needed
-        final_answer = english_response
-        if payload.language == "pa":
-            final_answer = translate_text(english_response, "en-IN", "pa-IN")
-            print(f"Translated response: {final_answer}")
+        session_store.append_turn(session_id, translated_query or query_for_processing, answer["english_response"], intent=intent, entities=entities)
         
         process_time = time.time() - start_time
+        if deadline.expired():
+            metrics.incr("deadline.exceeded")
         
         # Step 4: Logging (Background Task)
-        # background_tasks.add_task(
-        #     log_interaction, 
-        #     query=payload.message, 
-        #     intent=intent, 
-        #     entities=entities, 
-        #     response=final_answer,
-        #     latency=process_time
-        # )
+        if config.CHAT_LOG_ENABLED:
+            background_tasks.add_task(
+                log_interaction, 
+                query=payload.message, 
+                intent=intent, 
+                entities=entities, 
+                response=final_answer,
+                latency=process_time,
+                language=payload.language,
+                processed_query=query_for_processing,
+                answer_path=answer["answer_path"]
+            )
         
         return ChatResponse(
             text=final_answer,
@@ -117,12 +361,208 @@ async def chat_endpoint(payload: ChatRequest, background_tasks: BackgroundTasks)
             meta={
                 "intent": intent,
                 "entities": [e['text'] for e in entities],  # Simplified for response
-                "sources": [doc['source'] for doc in top_docs],
+                "sources": answer["sources"],
+                "answer_path": answer["answer_path"],
+                "prompt_tokens": generation_stats.get("prompt_tokens", 0),
+                "context_tokens": generation_stats.get("context_tokens", 0),
+                "coalesced": shared,
+                "cached": cached,
+                "degradations": degradations,
                 "processing_time": process_time,
-                "translated_query": query_for_processing if payload.language == "pa" else None
+                "translated_query": translated_query
             },
             timestamp=datetime.now().isoformat()
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/session/{session_id}")
+def clear_session(session_id: str):
+    """Forget the server-side memory of a conversation."""
+    session_store.clear(session_id)
+    return {"session_id": session_id, "cleared": True}
+
+# --- 3. Structured Job Lookup ---
+@router.get("/jobs")
+def search_jobs(
+    district: Optional[str] = None,
+    job_type: Optional[str] = None,
+    qualification: Optional[str] = None,
+    age: Optional[int] = None,
+    open_only: bool = True,
+    limit: int = 10
+):
+    """
+    Facet-index lookup: conjunctive filters, total count and per-district/type breakdown.
+    """
+    facet_index = get_facet_index()
+    if facet_index is None:
+        raise HTTPException(status_code=503, detail="Facet index not loaded. Run ingest_mongo first.")
+    
+    start = time.perf_counter()
+    entities = []
+    if district:
+        entities.append({"text": district, "label": "city"})
+    if job_type:
+        entities.append({"text": job_type, "label": "job_type"})
+    if qualification:
+        entities.append({"text": qualification, "label": "qualification"})
+    if age:
+        entities.append({"text": str(age), "label": "age"})
+    filters = filters_from_entities(entities, open_only=open_only)
+    
+    return {
+        "count": facet_index.count(**filters),
+        "jobs": facet_index.search(limit=limit, **filters),
+        "facets": {
+            "district": facet_index.facet_counts("district", **filters),
+            "job_type": facet_index.facet_counts("job_type", **filters)
+        },
+        "took_ms": (time.perf_counter() - start) * 1000
+    }
+
+# --- 4. Streaming Speech Input ---
+def prefetch_retrieval(text: str, language: str):
+    """
+    NLU + retrieval for a partial transcript, kept for answer_query if the final
+    transcript ends on the same words. Punjabi in PA_QUERY_MODE=translate is
+    skipped: its retrieval query is the translation, not known yet.
+    """
+    if language == "pa" and config.PA_QUERY_MODE == "translate":
+        return
+    from app.nlu.entity_extractor import extract_entities
+    entities = extract_entities(gloss(text) if language == "pa" else text, use_fast=True)
+    prefetch_search(text, top_k=config.RERANK_CANDIDATES, entities=entities, candidates=config.RERANK_CANDIDATES)
+
+@router.websocket("/speech/stream")
+async def speech_stream(websocket: WebSocket, language: str = "en", session_id: Optional[str] = None,
+                        sample_rate: int = config.SPEECH_SAMPLE_RATE):
+    """
+    Streaming voice input. Binary messages are 16-bit mono PCM frames at `sample_rate`.
+    Text messages are JSON controls: {"type": "start", "language", "script"} and
+    {"type": "end"} (push-to-talk released). The server sends speech_start,
+    partial, final and answer (a ChatResponse plus end_to_answer_ms) events.
+    """
+    await websocket.accept()
+    session_id = session_id or str(uuid.uuid4())
+    # Voice answers and prefetches take slots from the same limits as POST /chat
+    limiter, ip = get_admission_limiter(), client_ip(websocket.scope)
+
+    async def answer(text: str, lang: str) -> dict:
+        background_tasks = BackgroundTasks()
+        try:
+            async with limiter.slot(session_id, ip):
+                response = await chat_endpoint(ChatRequest(message=text, language=lang, session_id=session_id),
+                                               background_tasks, x_profile=None, x_admin_token=None)
+        except AdmissionRejected as e:
+            metrics.incr(f"admission.rejected.{e.reason}")
+            raise
+        await background_tasks()  # chat log, as after an HTTP response
+        return response.model_dump()
+
+    async def prefetch(text: str, lang: str):
+        # Speculative: skipped rather than queued when the server is busy
+        if not limiter.try_acquire(ip):
+            metrics.incr("speech.prefetch_skipped")
+            return
+        try:
+            await run_in_threadpool(prefetch_retrieval, text, lang)
+        finally:
+            limiter.release(None, ip)
+
+    speech = SpeechSession(get_speech_backend(), websocket.send_json, answer, prefetch,
+                           language=language, sample_rate=sample_rate)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await speech.feed(message["bytes"])
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "start":
+                    speech.language = control.get("language", speech.language)
+                    speech.script = control.get("script", "")
+                elif control.get("type") == "end":
+                    speech.end_utterance()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        await speech.close()
+
+# --- 5. Metrics ---
+@router.get("/metrics")
+def get_metrics():
+    """In-process counters, including upstream calls saved by request coalescing."""
+    snapshot = metrics.snapshot()
+    snapshot["gauges"]["singleflight.inflight"] = translate_flight.inflight() + answer_flight.inflight()
+    for cache in (answer_cache, translation_cache, embedding_cache):
+        snapshot["gauges"][f"cache.{cache.name}.size"] = len(cache)
+    snapshot["circuits"] = sarvam_client.breaker_states()
+    snapshot["sync"] = sync_status()
+    snapshot["compaction"] = compaction_status()
+    return snapshot
+
+# --- 6. Admin ---
+class FaqSettings(BaseModel):
+    keyword_threshold: Optional[float] = None
+    embedding_threshold: Optional[float] = None
+    min_keyword_score: Optional[float] = None
+    enabled: Optional[bool] = None
+
+class TracingSettings(BaseModel):
+    enabled: Optional[bool] = None
+    slow_ms: Optional[float] = None
+
+def _require_admin(token: Optional[str]):
+    if not _admin_token_valid(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def _faq_matcher_or_503():
+    faq_matcher = get_faq_matcher()
+    if faq_matcher is None:
+        raise HTTPException(status_code=503, detail="FAQ matcher not loaded")
+    return faq_matcher
+
+@router.get("/admin/faq")
+def faq_status(q: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """FAQ matcher thresholds and hit counts (this process); `q` shows the scores a query gets."""
+    _require_admin(x_admin_token)
+    faq_matcher = _faq_matcher_or_503()
+    status = faq_matcher.status()
+    if q:
+        status["query"] = {"text": q, "match": faq_matcher.match(q, record=False), "top": faq_matcher.explain(q)}
+    return status
+
+@router.put("/admin/faq")
+def configure_faq(settings: FaqSettings, x_admin_token: Optional[str] = Header(None)):
+    """Changes the FAQ match thresholds at runtime (this process)."""
+    _require_admin(x_admin_token)
+    faq_matcher = _faq_matcher_or_503()
+    faq_matcher.configure(settings.keyword_threshold, settings.embedding_threshold, settings.enabled,
+                          settings.min_keyword_score)
+    return faq_matcher.status()
+
+@router.post("/admin/faq/reload")
+def reload_faq(x_admin_token: Optional[str] = Header(None)):
+    """Reloads the FAQs from MongoDB (after editing the collection)."""
+    _require_admin(x_admin_token)
+    return load_faq_matcher().status()
+
+@router.get("/admin/traces")
+def slow_traces(limit: int = 20, x_admin_token: Optional[str] = Header(None)):
+    """Most recent slow or failed /chat traces (this process), newest first."""
+    _require_admin(x_admin_token)
+    return {"settings": tracing.settings, "traces": tracing.recent_slow_traces(limit)}
+
+@router.put("/admin/tracing")
+def configure_tracing(settings: TracingSettings, x_admin_token: Optional[str] = Header(None)):
+    """Turns tracing on/off or changes the slow-request threshold at runtime (this process)."""
+    _require_admin(x_admin_token)
+    tracing.configure(settings.enabled, settings.slow_ms)
+    return tracing.settings
@@ -0,0 +1,339 @@
+# backend/app/core/admission.py
+"""
+Admission control for the chat endpoints.
+
+Every chat request ends up waiting on Sarvam, so letting an unbounded burst in
+just queues it behind the provider until everything times out together. This
+ASGI middleware admits at most ADMISSION_MAX_INFLIGHT requests at once, parks
+up to ADMISSION_MAX_QUEUE more in a FIFO for at most ADMISSION_MAX_QUEUE_WAIT
+seconds, and caps concurrent requests per session and per client IP (read from
+X-Forwarded-For / X-Real-IP when the peer is in ADMISSION_TRUSTED_PROXIES). Everything
+beyond that is rejected immediately (429 for a noisy client, 503 when the
+server is full) with a Retry-After header.
+
+The limits live in one AdmissionLimiter per process (get_admission_limiter),
+shared with the speech WebSocket (/speech/stream), whose voice answers and
+retrieval prefetches take slots from the same caps.
+"""
+import asyncio
+import ipaddress
+import json
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from app.core import config, metrics
+from app.core.logger import logger
+
+MAX_BODY_PEEK = 64 * 1024  # only look for session_id in small JSON bodies
+
+
+class AdmissionController:
+    """
+    Global in-flight cap with a bounded FIFO wait queue. Slots are handed
+    directly to the oldest waiter on release so queued requests keep their order.
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, max_wait: float):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.inflight = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """
+        :return: None when admitted, otherwise the rejection reason
+        """
+        if self.inflight < self.max_inflight and not self._waiters:
+            self.inflight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._publish()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return "queue_timeout"
+        finally:
+            metrics.observe("admission.queue_wait_seconds", time.perf_counter() - start)
+        return None
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a free slot without queueing, for speculative work that can be skipped.
+        """
+        if self.inflight >= self.max_inflight or self._waiters:
+            return False
+        self.inflight += 1
+        self._publish()
+        return True
+
+    def release(self):
+        # Hand the slot to the oldest live waiter, otherwise free it
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                self._publish()
+                return
+        self.inflight -= 1
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("admission.inflight", self.inflight)
+        metrics.set_gauge("admission.queued", len(self._waiters))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+
+class AdmissionLimiter:
+    """
+    The global cap plus the per-session and per-IP counts.
+    """
+
+    def __init__(self, max_inflight: Optional[int] = None, max_queue: Optional[int] = None,
+                 max_wait: Optional[float] = None, per_session: Optional[int] = None,
+                 per_ip: Optional[int] = None):
+        self.controller = AdmissionController(
+            max_inflight if max_inflight is not None else config.ADMISSION_MAX_INFLIGHT,
+            max_queue if max_queue is not None else config.ADMISSION_MAX_QUEUE,
+            max_wait if max_wait is not None else config.ADMISSION_MAX_QUEUE_WAIT,
+        )
+        self.per_session = per_session if per_session is not None else config.ADMISSION_PER_SESSION
+        self.per_ip = per_ip if per_ip is not None else config.ADMISSION_PER_IP
+        self._by_session: Dict[str, int] = {}
+        self._by_ip: Dict[str, int] = {}
+
+    async def acquire(self, session_id: Optional[str], client_ip: str):
+        """
+        Waits for a slot; raises AdmissionRejected when the client or the server is over its limit.
+        """
+        # 1. Per-client limits: one client can't take the whole server
+        if session_id and self._by_session.get(session_id, 0) >= self.per_session:
+            raise AdmissionRejected(429, "session_busy",
+                                    "A previous message from this conversation is still being answered.")
+        if self._by_ip.get(client_ip, 0) >= self.per_ip:
+            raise AdmissionRejected(429, "ip_busy", "Too many concurrent requests from this client.")
+
+        _bump(self._by_ip, client_ip, 1)
+        if session_id:
+            _bump(self._by_session, session_id, 1)
+        # 2. Global cap with a bounded, time-limited queue
+        try:
+            reason = await self.controller.acquire()
+        except BaseException:
+            self._forget(session_id, client_ip)
+            raise
+        if reason is not None:
+            self._forget(session_id, client_ip)
+            raise AdmissionRejected(503, reason, "The assistant is busy right now. Please try again shortly.")
+        metrics.incr("admission.admitted")
+
+    def try_acquire(self, client_ip: str) -> bool:
+        """
+        A slot for speculative work (speech prefetch): never queues and holds no session slot.
+        """
+        if self._by_ip.get(client_ip, 0) >= self.per_ip or not self.controller.try_acquire():
+            return False
+        _bump(self._by_ip, client_ip, 1)
+        return True
+
+    def release(self, session_id: Optional[str], client_ip: str):
+        self.controller.release()
+        self._forget(session_id, client_ip)
+
+    @asynccontextmanager
+    async def slot(self, session_id: Optional[str], client_ip: str):
+        await self.acquire(session_id, client_ip)
+        try:
+            yield
+        finally:
+            self.release(session_id, client_ip)
+
+    def _forget(self, session_id: Optional[str], client_ip: str):
+        _bump(self._by_ip, client_ip, -1)
+        if session_id:
+            _bump(self._by_session, session_id, -1)
+
+
+_limiter: Optional[AdmissionLimiter] = None
+
+
+def get_admission_limiter() -> AdmissionLimiter:
+    """
+    The process-wide limiter, configured from ADMISSION_*.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = AdmissionLimiter()
+    return _limiter
+
+
+def _networks(proxies: List[str]):
+    networks = []
+    for proxy in proxies:
+        try:
+            networks.append(ipaddress.ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"Ignoring invalid ADMISSION_TRUSTED_PROXIES entry: {proxy!r}")
+    return networks
+
+
+_trusted = _networks(config.ADMISSION_TRUSTED_PROXIES)
+
+
+def _is_trusted(ip: str, trusted) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted)
+
+
+def client_ip(scope, trusted=None) -> str:
+    """
+    The address the per-IP cap is keyed on. The socket peer, unless it is a
+    trusted proxy: then the rightmost X-Forwarded-For hop that is not itself
+    a trusted proxy (earlier hops are client-supplied and can be forged),
+    falling back to X-Real-IP.
+    """
+    trusted = _trusted if trusted is None else trusted
+    peer = (scope.get("client") or ("unknown", 0))[0]
+    if not trusted or not _is_trusted(peer, trusted):
+        return peer
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+    hops = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    if hops:
+        return hops[0]
+    return headers.get("x-real-ip", "").strip() or peer
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware) so rejected requests never
+    reach the route and admitted ones are not buffered through an extra task.
+    Uses the shared limiter unless limits are passed explicitly.
+    """
+
+    def __init__(self, app, paths: Optional[List[str]] = None,
+                 max_inflight: Optional[int] = None, max_queue: Optional[int] = None,
+                 max_wait: Optional[float] = None, per_session: Optional[int] = None,
+                 per_ip: Optional[int] = None, retry_after: Optional[int] = None):
+        self.app = app
+        self.paths = set(paths if paths is not None else config.ADMISSION_PATHS)
+        limits = (max_inflight, max_queue, max_wait, per_session, per_ip)
+        if any(limit is not None for limit in limits):
+            self.limiter = AdmissionLimiter(*limits)
+        else:
+            self.limiter = get_admission_limiter()
+        self.retry_after = retry_after if retry_after is not None else config.ADMISSION_RETRY_AFTER
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        ip = client_ip(scope)
+        session_id = headers.get("x-session-id")
+        if not session_id:
+            session_id, receive = await self._peek_session_id(receive, headers)
+
+        try:
+            await self.limiter.acquire(session_id, ip)
+        except AdmissionRejected as e:
+            await self._reject(send, e.status, e.reason, e.message)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(session_id, ip)
+
+    async def _peek_session_id(self, receive, headers):
+        """
+        Reads a small JSON body to find session_id, then returns a receive()
+        that replays it to the route.
+        """
+        if "json" not in headers.get("content-type", ""):
+            return None, receive
+        try:
+            if int(headers.get("content-length", "0")) > MAX_BODY_PEEK:
+                return None, receive
+        except ValueError:
+            return None, receive
+
+        messages, body = [], b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        try:
+            session_id = json.loads(body or b"{}").get("session_id")
+        except (ValueError, AttributeError):
+            session_id = None
+        return (str(session_id) if session_id else None), replay
+
+    async def _reject(self, send, status: int, reason: str, message: str):
+        metrics.incr(f"admission.rejected.{reason}")
+        controller = self.limiter.controller
+        logger.warning(f"Admission rejected ({status} {reason}); inflight={controller.inflight} queued={controller.queued}")
+        body = json.dumps({"detail": message, "reason": reason}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _bump(counts: Dict[str, int], key: str, delta: int):
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
@@ -0,0 +1,127 @@
+# backend/app/core/caches.py
+"""
+In-process response caches, and their warm-up from a mined hot-query bundle.
+
+- answers:      first-turn /chat answers, keyed like the answer coalescing key
+                (query, language, intent, index generation, conversation state),
+                kept for ANSWER_CACHE_TTL_SECONDS
+- translations: successful Sarvam translations, keyed on (source, target, normalized text)
+- embeddings:   dense-search query embeddings, keyed on the embedded text
+
+scripts/build_hot_queries.py mines chat_logs for the most frequent queries,
+runs them through the pipeline offline and saves what these caches would have
+learned to HOT_BUNDLE_PATH. warm_up() loads it, so the first requests after a
+deploy don't all pay full LLM and translation latency.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Hashable, Optional
+
+from app.core import config, metrics
+
+BUNDLE_VERSION = 1
+
+
+class LRUCache:
+    def __init__(self, name: str, maxsize: int, ttl: float = 0):
+        """
+        :param ttl: seconds an entry stays valid (0 = until evicted)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] and entry[0] < time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+        metrics.incr(f"cache.{self.name}.{'hit' if entry is not None else 'miss'}")
+        return entry[1] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl if self.ttl else 0, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires, value) in self._data.items() if not expires or expires >= now]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+answer_cache = LRUCache("answer", config.ANSWER_CACHE_SIZE, config.ANSWER_CACHE_TTL_SECONDS)
+translation_cache = LRUCache("translation", config.TRANSLATION_CACHE_SIZE)
+embedding_cache = LRUCache("embedding", config.EMBEDDING_CACHE_SIZE)
+
+
+# ------------------ HOT-QUERY BUNDLE ------------------
+def save_bundle(entries: list, answers: list, path: str = None) -> dict:
+    """
+    :param entries: per hot query: query, language, intent, count, retrieval ids, ...
+    :param answers: (answer key without the index generation, answer dict)
+    """
+    bundle = {
+        "version": BUNDLE_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "entries": entries,
+        "answers": [[list(key), answer] for key, answer in answers],
+        "translations": [[list(key), value] for key, value in translation_cache.items()],
+        "embeddings": [[key, [round(float(x), 6) for x in value]] for key, value in embedding_cache.items()],
+    }
+    path = path or config.HOT_BUNDLE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return bundle
+
+
+def load_bundle(index_generation: tuple, path: str = None) -> Optional[dict]:
+    """
+    Fills the caches from the bundle. Answers are keyed on the current index
+    generation: the bundle is assumed to match the corpus it was built against,
+    and bundles older than HOT_BUNDLE_MAX_AGE_HOURS are ignored.
+    Returns counts per cache, or None when there is no usable bundle.
+    """
+    path = path or config.HOT_BUNDLE_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            bundle = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if bundle.get("version") != BUNDLE_VERSION:
+        return None
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(bundle["built_at"])
+    if age.total_seconds() > config.HOT_BUNDLE_MAX_AGE_HOURS * 3600:
+        print(f"⚠️ Hot-query bundle is {age.total_seconds() / 3600:.0f}h old, not loaded.")
+        return None
+
+    for key, value in bundle["translations"]:
+        translation_cache.put(tuple(key), value)
+    for key, value in bundle["embeddings"]:
+        embedding_cache.put(key, value)
+    for (query, language, intent, history), answer in bundle["answers"]:
+        answer_cache.put((query, language, intent, index_generation, history), answer)
+    counts = {"answers": len(bundle["answers"]), "translations": len(bundle["translations"]),
+              "embeddings": len(bundle["embeddings"])}
+    for name, count in counts.items():
+        metrics.set_gauge(f"cache.prewarmed.{name}", count)
+    return counts
@@ -0,0 +1,209 @@
+import os
+from dotenv import load_dotenv
+from sarvamai.environment import SarvamAIEnvironment
+
+load_dotenv()
+
+# --- Sarvam AI upstream ---
+SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
+# Point this at a local mock (see scripts/mock_sarvam.py) for load testing
+SARVAM_BASE_URL = os.getenv("SARVAM_BASE_URL", "https://api.sarvam.ai").rstrip("/")
+
+# Connection pool, per-call deadlines and retries for the shared client (app/core/sarvam_client.py)
+SARVAM_MAX_CONNECTIONS = int(os.getenv("SARVAM_MAX_CONNECTIONS", "50"))
+SARVAM_CHAT_TIMEOUT = float(os.getenv("SARVAM_CHAT_TIMEOUT", "15"))
+SARVAM_TRANSLATE_TIMEOUT = float(os.getenv("SARVAM_TRANSLATE_TIMEOUT", "5"))
+SARVAM_TRANSLATE_RETRIES = int(os.getenv("SARVAM_TRANSLATE_RETRIES", "2"))
+SARVAM_STT_TIMEOUT = float(os.getenv("SARVAM_STT_TIMEOUT", "5"))
+SARVAM_STT_MODEL = os.getenv("SARVAM_STT_MODEL", "saarika:v2.5")
+
+# Circuit breaker: open when >= BREAKER_ERROR_RATE of the last BREAKER_WINDOW seconds' calls failed
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+BREAKER_WINDOW = float(os.getenv("BREAKER_WINDOW", "30"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "15"))
+
+
+def sarvam_environment() -> SarvamAIEnvironment:
+    """
+    Returns the Sarvam AI environment, honouring SARVAM_BASE_URL overrides.
+    """
+    if SARVAM_BASE_URL == SarvamAIEnvironment.PRODUCTION.base:
+        return SarvamAIEnvironment.PRODUCTION
+    return SarvamAIEnvironment(
+        base=SARVAM_BASE_URL,
+        creative=f"{SARVAM_BASE_URL}/dubbing",
+        production=SARVAM_BASE_URL.replace("http", "ws", 1),
+    )
+
+
+# --- Vector store (app/rag/vector_store.py) ---
+# "chroma" (HNSW + SQLite under ./data/vector_db) or "flat" (quantized memory-mapped
+# arrays under FLAT_INDEX_DIR, brute-force scan, see app/rag/flat_index.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+FLAT_INDEX_DIR = os.getenv("FLAT_INDEX_DIR", "./data/flat_index")
+FLAT_INDEX_CODES = os.getenv("FLAT_INDEX_CODES", "int8")          # "int8" or "binary"
+FLAT_RESCORE_FACTOR = int(os.getenv("FLAT_RESCORE_FACTOR", "4"))  # shortlist = k * factor, rescored in float
+
+# Sentence-transformers model for dense search ("" = Chroma's default English MiniLM).
+# With a multilingual model (e.g. sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2)
+# and EMBEDDING_MULTILINGUAL=true, Punjabi queries are embedded as they are. Re-ingest after changing.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_MULTILINGUAL = os.getenv("EMBEDDING_MULTILINGUAL", "false").lower() == "true"
+
+
+# Documents fetched per page when building the in-memory keyword index at startup
+CORPUS_PAGE_SIZE = int(os.getenv("CORPUS_PAGE_SIZE", "1000"))
+
+
+# --- Static content (app/rag/content_index.py) ---
+# Schemes, training programs, news and FAQs are searched in memory; reloaded when
+# an ingestion script bumps the content version, checked at most this often
+CONTENT_VERSION_CHECK_SECONDS = float(os.getenv("CONTENT_VERSION_CHECK_SECONDS", "60"))
+CONTENT_TOP_K = int(os.getenv("CONTENT_TOP_K", "2"))  # scheme/training docs in the prompt of scheme questions
+
+
+# --- Live index sync (app/rag/sync.py) ---
+# Newly scraped jobs are applied to Chroma and the in-process indexes without a restart
+SYNC_ENABLED = os.getenv("SYNC_ENABLED", "false").lower() == "true"        # run inside the API process
+SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", "30"))     # poll period / retry delay
+SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "500"))
+SYNC_CHANGE_STREAMS = os.getenv("SYNC_CHANGE_STREAMS", "true").lower() == "true"  # when Mongo supports them
+SYNC_RECONCILE_SECONDS = float(os.getenv("SYNC_RECONCILE_SECONDS", "600"))  # delete detection while polling
+# false when a standalone `python -m app.rag.sync` owns Chroma writes (multi-worker serving)
+SYNC_VECTOR_WRITES = os.getenv("SYNC_VECTOR_WRITES", "true").lower() == "true"
+SYNC_STATE_PATH = os.getenv("SYNC_STATE_PATH", "./data/sync_state.json")
+
+
+# --- Near-duplicate postings (app/rag/dedup.py) ---
+# Re-posted vacancies are folded into one indexed posting listing the others' apply links
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))   # estimated Jaccard similarity of the features
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))       # MinHash signature length
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))              # LSH bands; must divide DEDUP_NUM_PERM
+# Same vacancy from different employers (agencies) counts as a duplicate unless true
+DEDUP_COMPARE_EMPLOYER = os.getenv("DEDUP_COMPARE_EMPLOYER", "false").lower() == "true"
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "./data/dedup_index.pkl")
+
+
+# --- Expired postings (app/rag/compaction.py) ---
+# A posting expires EXPIRY_GRACE_DAYS after its last apply date
+EXPIRY_GRACE_DAYS = int(os.getenv("EXPIRY_GRACE_DAYS", "1"))
+# What happens to expired jobs in Mongo: "sweep" (deleted by compaction), "ttl" (TTL index on
+# deadline_at, deleted by the server) or "keep" (only dropped from the search indexes).
+# Deleting is irreversible, so it is opt-in
+EXPIRY_MONGO_MODE = os.getenv("EXPIRY_MONGO_MODE", "keep")
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "false").lower() == "true"  # run inside the API process
+COMPACTION_INTERVAL_HOURS = float(os.getenv("COMPACTION_INTERVAL_HOURS", "24"))
+# Chroma keeps deleted vectors as tombstones; rebuild its segment once this fraction was deleted
+COMPACTION_REBUILD_FRACTION = float(os.getenv("COMPACTION_REBUILD_FRACTION", "0.2"))
+COMPACTION_HISTORY_PATH = os.getenv("COMPACTION_HISTORY_PATH", "./data/compaction_history.jsonl")
+
+
+# --- Punjabi queries (app/nlu/gurmukhi.py) ---
+# "translate": translate pa queries to English before NLU and retrieval (one upstream hop first)
+# "native":    run intent, entities and retrieval on the Punjabi text, no query translation
+# "parallel":  answer natively while the translation runs alongside, for English conversation memory
+PA_QUERY_MODE = os.getenv("PA_QUERY_MODE", "translate")
+
+
+# --- Streaming speech input (app/services/speech.py) ---
+# "sarvam" or "scripted" (local stand-in: the client supplies the transcript, for tests)
+SPEECH_BACKEND = os.getenv("SPEECH_BACKEND", "sarvam")
+SPEECH_SAMPLE_RATE = int(os.getenv("SPEECH_SAMPLE_RATE", "16000"))                # 16-bit mono PCM
+SPEECH_MAX_UTTERANCE_SECONDS = float(os.getenv("SPEECH_MAX_UTTERANCE_SECONDS", "30"))  # ring buffer size
+SPEECH_PRE_ROLL_MS = int(os.getenv("SPEECH_PRE_ROLL_MS", "300"))       # audio kept from before speech starts
+SPEECH_VAD_THRESHOLD = float(os.getenv("SPEECH_VAD_THRESHOLD", "500"))  # frame RMS counted as speech
+SPEECH_END_SILENCE_MS = int(os.getenv("SPEECH_END_SILENCE_MS", "600"))  # silence that ends an utterance
+SPEECH_PARTIAL_INTERVAL_MS = int(os.getenv("SPEECH_PARTIAL_INTERVAL_MS", "800"))
+SPEECH_PREFETCH_MIN_WORDS = int(os.getenv("SPEECH_PREFETCH_MIN_WORDS", "2"))
+PREFETCH_TTL_SECONDS = float(os.getenv("PREFETCH_TTL_SECONDS", "30"))  # prefetched retrieval kept this long
+
+
+# --- Admission control (app/core/admission.py) ---
+ADMISSION_PATHS = [p.strip() for p in os.getenv("ADMISSION_PATHS", "/chat,/api/v1/chat").split(",") if p.strip()]
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "32"))   # keep below the 40-thread pool
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_MAX_QUEUE_WAIT = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", "2.0"))
+ADMISSION_PER_SESSION = int(os.getenv("ADMISSION_PER_SESSION", "1"))
+ADMISSION_PER_IP = int(os.getenv("ADMISSION_PER_IP", "8"))
+# Reverse proxies / load balancers (IPs or CIDRs) whose X-Forwarded-For / X-Real-IP
+# is trusted for the per-IP cap; without them every client behind a proxy shares one IP
+ADMISSION_TRUSTED_PROXIES = [p.strip() for p in os.getenv("ADMISSION_TRUSTED_PROXIES", "").split(",") if p.strip()]
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+
+# --- Per-request latency budget (app/core/deadline.py) ---
+# Each /chat request gets REQUEST_DEADLINE seconds; stages switch to cheaper
+# modes when the remaining budget drops below these thresholds.
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+DEADLINE_FULL_RETRIEVAL = float(os.getenv("DEADLINE_FULL_RETRIEVAL", "6"))     # else fewer candidates
+DEADLINE_FULL_COMPLETION = float(os.getenv("DEADLINE_FULL_COMPLETION", "5"))   # else DEGRADED_MAX_TOKENS
+DEADLINE_MIN_COMPLETION = float(os.getenv("DEADLINE_MIN_COMPLETION", "2"))     # else retrieval-only answer
+DEADLINE_MIN_TRANSLATE = float(os.getenv("DEADLINE_MIN_TRANSLATE", "1"))       # else answer stays in English
+DEGRADED_MAX_TOKENS = int(os.getenv("DEGRADED_MAX_TOKENS", "150"))
+
+
+# --- Conversation sessions ---
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")           # "memory" or "mongo"
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_RECENT_TURNS = int(os.getenv("SESSION_RECENT_TURNS", "2"))  # user+assistant pairs kept verbatim
+SESSION_SUMMARY_CHARS = int(os.getenv("SESSION_SUMMARY_CHARS", "600"))
+
+
+# --- Prompt building ---
+# Hugging Face tokenizer matching the Sarvam chat model, used to count prompt tokens
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER", "sarvamai/sarvam-m")
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "350"))   # grounding documents
+CONTEXT_FIELD_TOKENS = int(os.getenv("CONTEXT_FIELD_TOKENS", "60"))    # any single field value
+HISTORY_TURN_TOKENS = int(os.getenv("HISTORY_TURN_TOKENS", "60"))      # each replayed history message
+
+
+# --- Reranking (app/rag/reranker.py) ---
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))   # hybrid search hits to rescore
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "3"))              # docs passed to the generator
+# Optional cross-encoder on top of the feature scorer, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "")
+RERANKER_QUANTIZE = os.getenv("RERANKER_QUANTIZE", "true").lower() == "true"  # int8 dynamic quantization
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+RERANK_MAX_MS = float(os.getenv("RERANK_MAX_MS", "150"))       # cross-encoder latency cap per request
+
+
+# --- FAQ short-circuit (app/rag/faq_matcher.py) ---
+# Queries matching a curated FAQ get its stored answer, skipping NLU, retrieval and the LLM
+FAQ_MATCH_ENABLED = os.getenv("FAQ_MATCH_ENABLED", "true").lower() == "true"
+FAQ_KEYWORD_THRESHOLD = float(os.getenv("FAQ_KEYWORD_THRESHOLD", "0.8"))      # idf-weighted content-word overlap, both ways
+FAQ_EMBEDDING_THRESHOLD = float(os.getenv("FAQ_EMBEDDING_THRESHOLD", "0.85"))  # question embedding cosine; 0 = off
+FAQ_EMBEDDING_MIN_KEYWORD = float(os.getenv("FAQ_EMBEDDING_MIN_KEYWORD", "0.4"))  # keyword score needed to try embeddings
+
+
+# --- Response caches (app/core/caches.py) ---
+# Identical concurrent requests share one computation (app/core/singleflight.py)
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))                   # first-turn answers; 0 = off
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))   # 0 = until evicted
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2000"))
+# Written by scripts/build_hot_queries.py, loaded by warm_up(); older bundles are ignored
+HOT_BUNDLE_PATH = os.getenv("HOT_BUNDLE_PATH", "./data/hot_queries.json")
+HOT_BUNDLE_MAX_AGE_HOURS = float(os.getenv("HOT_BUNDLE_MAX_AGE_HOURS", "48"))
+# Save every answered /chat query to chat_logs (the input of build_hot_queries.py)
+CHAT_LOG_ENABLED = os.getenv("CHAT_LOG_ENABLED", "false").lower() == "true"
+
+
+# --- Request tracing (app/core/tracing.py) ---
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "3000"))   # also adjustable at PUT /admin/tracing
+SLOW_REQUEST_LOG_PATH = os.getenv("SLOW_REQUEST_LOG_PATH", "./data/slow_requests.jsonl")  # empty = memory only
+SLOW_REQUEST_LOG_MAX_MB = float(os.getenv("SLOW_REQUEST_LOG_MAX_MB", "50"))  # then rotated to <path>.1
+SLOW_TRACES_KEPT = int(os.getenv("SLOW_TRACES_KEPT", "100"))   # recent slow traces at GET /admin/traces
+# Sampling CPU profile of one request, requested with X-Profile: 1 and the admin token
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+
+
+# --- Admin endpoints (/admin/*) ---
+# Sent as the X-Admin-Token header; admin endpoints are disabled while empty
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
@@ -0,0 +1,49 @@
+# backend/app/core/deadline.py
+"""
+Per-request latency budget.
+
+A Deadline is created when a chat request arrives and passed explicitly to
+each stage (translation, retrieval, generation). Stages read the remaining
+budget to cap their upstream timeouts and to choose a cheaper mode when time
+is short, recording what they gave up so the response can report it.
+"""
+import time
+from typing import List, Optional
+
+from app.core import config, metrics
+from app.core.logger import logger
+
+MIN_CALL_TIMEOUT = 0.1
+
+
+class Deadline:
+    def __init__(self, budget: Optional[float] = None):
+        self.budget = config.REQUEST_DEADLINE if budget is None else budget
+        self.started = time.monotonic()
+        self.expires = self.started + self.budget
+        self.degradations: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float, reserve: float = 0.0) -> float:
+        """
+        Upstream timeout: at most `cap`, leaving `reserve` seconds for later stages.
+        """
+        return max(MIN_CALL_TIMEOUT, min(cap, self.remaining() - reserve))
+
+    def degrade(self, name: str):
+        """
+        Records that a stage switched to a cheaper mode.
+        """
+        if name in self.degradations:
+            return
+        self.degradations.append(name)
+        metrics.incr(f"deadline.degraded.{name}")
+        logger.info(f"Degraded: {name} ({self.remaining():.2f}s of {self.budget:.1f}s left)")
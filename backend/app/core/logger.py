@@ -14,27 +14,35 @@ logger = logging.getLogger("pgrkam_bot")
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "pgrkam_db")
 LOG_COLLECTION = "chat_logs"
+_client = None  # one connection pool for all log writes
 
 def get_db_collection():
+    global _client
     try:
-        client = MongoClient(MONGODB_URI)
-        db = client[DB_NAME]
+        if _client is None:
+            _client = MongoClient(MONGODB_URI)
+        db = _client[DB_NAME]
         return db[LOG_COLLECTION]
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB for logging: {e}")
         return None
 
-def log_interaction(query: str, intent: str, entities: list, response: str, latency: float = 0.0):
+def log_interaction(query: str, intent: str, entities: list, response: str, latency: float = 0.0,
+                    language: str = "en", processed_query: str = None, answer_path: str = None):
     """
     Saves the chat interaction to MongoDB for future analysis/fine-tuning.
     Run this as a BackgroundTask so it doesn't slow down the user.
+    scripts/build_hot_queries.py mines these entries for the most frequent queries.
     """
     log_entry = {
         "timestamp": datetime.now(timezone.utc),
         "user_query": query,
+        "language": language,
+        "processed_query": processed_query or query,
         "predicted_intent": intent,
         "extracted_entities": entities,
         "bot_response": response,
+        "answer_path": answer_path,
         "latency_seconds": latency
     }
 
@@ -0,0 +1,45 @@
+# backend/app/core/metrics.py
+"""
+Minimal in-process metrics: counters and value summaries, exposed at GET /metrics.
+"""
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_summaries: Dict[str, Dict[str, float]] = {}
+_gauges: Dict[str, float] = {}
+
+
+def incr(name: str, value: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float):
+    """
+    Records one sample (latency, size, ...) as count/sum/min/max.
+    """
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            _summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+        else:
+            s["count"] += 1
+            s["sum"] += value
+            s["min"] = min(s["min"], value)
+            s["max"] = max(s["max"], value)
+
+
+def set_gauge(name: str, value: float):
+    with _lock:
+        _gauges[name] = value
+
+
+def snapshot() -> dict:
+    with _lock:
+        summaries = {
+            name: {**s, "avg": s["sum"] / s["count"] if s["count"] else 0.0}
+            for name, s in _summaries.items()
+        }
+        return {"counters": dict(_counters), "gauges": dict(_gauges), "summaries": summaries}
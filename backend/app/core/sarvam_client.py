@@ -0,0 +1,248 @@
+# backend/app/core/sarvam_client.py
+"""
+Shared Sarvam AI client for chat completions, translation and speech-to-text.
+
+One pooled keep-alive HTTP client serves every call in the process. Each call
+has an explicit deadline, translate calls (idempotent) are retried with
+jittered exponential backoff, and a circuit breaker per operation fails fast
+when the provider is erroring so callers drop straight to their fallback
+messages instead of waiting out the full timeout.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import httpx
+from sarvamai import SarvamAI
+from sarvamai.core.api_error import ApiError
+
+from app.core import config, metrics
+from app.core.logger import logger
+
+if not config.SARVAM_API_KEY:
+    logger.error("SARVAM_API_KEY environment variable is not set")
+    raise ValueError("SARVAM_API_KEY is required but not found in environment variables")
+
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window error-rate breaker: closed -> open (fail fast for `cooldown`
+    seconds) -> half-open (one probe call) -> closed again on success.
+
+    Every state change starts a new generation. before_call() returns the
+    generation a call was admitted under and record() ignores outcomes from
+    older ones, so a slow call started before the breaker opened cannot pass
+    for the half-open probe.
+    """
+
+    def __init__(self, name: str, error_rate: float, min_calls: int, window: float, cooldown: float):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._outcomes = deque()  # (timestamp, ok)
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def before_call(self) -> int:
+        """
+        Admits a call or raises CircuitOpenError; returns the generation to pass to record().
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return self._generation
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                metrics.incr(f"circuit.{self.name}.rejected")
+                raise CircuitOpenError(f"Sarvam {self.name} circuit is open")
+            self._probing = True  # let exactly one probe through
+            return self._generation
+
+    def record(self, ok: bool, generation: int):
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return  # admitted before the last state change
+            if self._opened_at is not None:
+                # Result of the half-open probe decides
+                self._probing = False
+                self._generation += 1
+                if ok:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                    logger.info(f"Circuit {self.name} closed")
+                else:
+                    self._opened_at = now
+                self._publish()
+                return
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, outcome in self._outcomes if not outcome)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._opened_at = now
+                self._generation += 1
+                metrics.incr(f"circuit.{self.name}.opened")
+                logger.error(f"Circuit {self.name} opened: {failures}/{len(self._outcomes)} calls failed")
+            self._publish()
+
+    def _publish(self):
+        metrics.set_gauge(f"circuit.{self.name}.open", 0 if self._opened_at is None else 1)
+
+
+def _new_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        error_rate=config.BREAKER_ERROR_RATE,
+        min_calls=config.BREAKER_MIN_CALLS,
+        window=config.BREAKER_WINDOW,
+        cooldown=config.BREAKER_COOLDOWN,
+    )
+
+
+chat_breaker = _new_breaker("chat")
+translate_breaker = _new_breaker("translate")
+stt_breaker = _new_breaker("stt")
+
+_http_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=config.SARVAM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.SARVAM_MAX_CONNECTIONS,
+        keepalive_expiry=60.0,
+    ),
+    timeout=httpx.Timeout(config.SARVAM_CHAT_TIMEOUT, connect=3.0),
+)
+
+client = SarvamAI(
+    api_subscription_key=config.SARVAM_API_KEY,
+    environment=config.sarvam_environment(),
+    httpx_client=_http_client,
+    timeout=config.SARVAM_CHAT_TIMEOUT,
+)
+
+
+def _is_upstream_failure(error: Exception) -> bool:
+    """
+    Errors that say the provider is unhealthy (vs. a bad request on our side).
+    """
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(error, ApiError):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def chat_completion(messages: List[Dict[str, str]], temperature: float = 0.1,
+                    max_tokens: int = 400, timeout: Optional[float] = None):
+    """
+    One chat completion within `timeout` seconds. Not retried: completions are not idempotent
+    and a retry would double the worst-case latency.
+    """
+    generation = chat_breaker.before_call()
+    metrics.incr("upstream.chat")
+    start = time.perf_counter()
+    try:
+        response = client.chat.completions(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            request_options={"timeout_in_seconds": timeout or config.SARVAM_CHAT_TIMEOUT, "max_retries": 0},
+        )
+    except Exception as e:
+        chat_breaker.record(not _is_upstream_failure(e), generation)
+        metrics.incr("upstream.chat.errors")
+        raise
+    chat_breaker.record(True, generation)
+    metrics.observe("upstream.chat.seconds", time.perf_counter() - start)
+    return response
+
+
+def translate(text: str, source_lang: str, target_lang: str,
+              timeout: Optional[float] = None, retries: Optional[int] = None) -> str:
+    """
+    Translation with jittered exponential backoff, all attempts inside one `timeout` budget.
+    """
+    budget = timeout or config.SARVAM_TRANSLATE_TIMEOUT
+    retries = config.SARVAM_TRANSLATE_RETRIES if retries is None else retries
+    deadline = time.monotonic() + budget
+    attempt = 0
+    while True:
+        generation = translate_breaker.before_call()
+        metrics.incr("upstream.translate")
+        start = time.perf_counter()
+        try:
+            response = client.text.translate(
+                input=text,
+                source_language_code=source_lang,
+                target_language_code=target_lang,
+                mode="formal",
+                model="sarvam-translate:v1",
+                numerals_format="native",
+                speaker_gender="Male",
+                enable_preprocessing=False,
+                request_options={
+                    "timeout_in_seconds": max(0.1, deadline - time.monotonic()),
+                    "max_retries": 0,
+                },
+            )
+            translate_breaker.record(True, generation)
+            metrics.observe("upstream.translate.seconds", time.perf_counter() - start)
+            return response.translated_text
+        except Exception as e:
+            retryable = _is_upstream_failure(e)
+            translate_breaker.record(not retryable, generation)
+            metrics.incr("upstream.translate.errors")
+            # Full jitter: sleep a random slice of the exponential backoff
+            backoff = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+            if not retryable or attempt >= retries or time.monotonic() + backoff >= deadline:
+                raise
+            attempt += 1
+            metrics.incr("upstream.translate.retries")
+            time.sleep(backoff)
+
+
+def transcribe(wav: bytes, language_code: str, timeout: Optional[float] = None) -> str:
+    """
+    Speech-to-text for one short WAV clip. Not retried: speech partials are
+    re-requested anyway and the final transcript is on the latency-critical path.
+    """
+    generation = stt_breaker.before_call()
+    metrics.incr("upstream.stt")
+    start = time.perf_counter()
+    try:
+        response = client.speech_to_text.transcribe(
+            file=("speech.wav", wav, "audio/wav"),
+            model=config.SARVAM_STT_MODEL,
+            language_code=language_code,
+            request_options={"timeout_in_seconds": timeout or config.SARVAM_STT_TIMEOUT, "max_retries": 0},
+        )
+    except Exception as e:
+        stt_breaker.record(not _is_upstream_failure(e), generation)
+        metrics.incr("upstream.stt.errors")
+        raise
+    stt_breaker.record(True, generation)
+    metrics.observe("upstream.stt.seconds", time.perf_counter() - start)
+    return response.transcript
+
+
+def breaker_states() -> Dict[str, str]:
+    return {"chat": chat_breaker.state, "translate": translate_breaker.state, "stt": stt_breaker.state}
@@ -0,0 +1,61 @@
+# backend/app/core/singleflight.py
+"""
+Single-flight coalescing of identical in-flight work.
+
+When many users ask the same thing at once (a new recruitment drive), only
+the first request for a key runs the expensive pipeline; concurrent requests
+with the same key await that one computation and get a copy of its result.
+Nothing is cached: once the computation finishes, the next request starts fresh.
+"""
+import asyncio
+import copy
+import re
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core import config, metrics
+
+
+def normalize_text(text: str) -> str:
+    """
+    Case/whitespace/trailing-punctuation insensitive form used in coalescing keys.
+    """
+    return re.sub(r"\s+", " ", text or "").strip().lower().rstrip("?!.। ")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Runs blocking `fn(*args, **kwargs)` in the threadpool, or joins an identical in-flight call.
+
+        :return: (result, shared) where shared is True if another request computed it
+        """
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return await run_in_threadpool(fn, *args, **kwargs), False
+        pending = self._inflight.get(key)
+        if pending is not None:
+            metrics.incr(f"singleflight.{self.name}.shared")
+            result = await asyncio.shield(pending)
+            return copy.deepcopy(result), True
+
+        # The computation is a task of its own: if the leader's request is cancelled
+        # (client disconnect) only the leader stops waiting, the followers still get it
+        task = asyncio.ensure_future(run_in_threadpool(fn, *args, **kwargs))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finished(key, t))
+        metrics.incr(f"singleflight.{self.name}.leader")
+        return await asyncio.shield(task), False
+
+    def _finished(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Avoid "exception never retrieved" warnings when nobody joined
+        task.cancelled() or task.exception()
+
+    def inflight(self) -> int:
+        return len(self._inflight)
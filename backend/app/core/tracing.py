@@ -0,0 +1,283 @@
+# backend/app/core/tracing.py
+"""
+Per-request span traces, a slow-request log and on-demand sampling profiles.
+
+A trace is opened around each /chat request and kept in a context variable,
+so it follows the request into the threadpool (run_in_threadpool copies the
+context). Stages open spans on it: translate, faq_match, intent, entities,
+embedding, chroma_query, bm25, rerank, prompt_build, llm. Each span has a
+duration and size attributes (characters, hits, tokens, cache hits). Outside
+a trace, span() does nothing.
+
+Requests slower than SLOW_REQUEST_MS (runtime-adjustable at PUT /admin/tracing)
+are appended to SLOW_REQUEST_LOG_PATH as one JSON line with the span tree.
+The most recent ones are also kept for GET /admin/traces.
+
+A request sent with `X-Profile: 1` and a valid X-Admin-Token also gets a
+sampling CPU profile. A thread samples the stacks of the threads currently
+inside one of the request's spans every PROFILE_INTERVAL_MS. The result
+(collapsed stacks and the hottest functions) is returned in `meta.trace`.
+The event loop thread is only sampled inside synchronous spans. The profile
+therefore doesn't pick up other requests, except when they share a
+coalesced computation.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.core import config, metrics
+
+PROFILE_STACK_DEPTH = 64
+PROFILE_TOP_STACKS = 30
+PROFILE_TOP_FUNCTIONS = 15
+
+_current: ContextVar[Optional[tuple]] = ContextVar("trace", default=None)  # (Trace, Span)
+_slow_traces: deque = deque(maxlen=config.SLOW_TRACES_KEPT)
+_log_lock = threading.Lock()
+
+settings = {"enabled": config.TRACING_ENABLED, "slow_ms": config.SLOW_REQUEST_MS}
+
+
+class Span:
+    __slots__ = ("name", "start", "end", "attrs", "children")
+
+    def __init__(self, name: str, attrs: dict, start: float = None):
+        self.name = name
+        self.start = time.perf_counter() if start is None else start
+        self.end = None
+        self.attrs = attrs
+        self.children = []
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self, origin: float) -> dict:
+        node = {"name": self.name, "start_ms": round((self.start - origin) * 1000, 2), "ms": round(self.ms(), 2)}
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in sorted(self.children, key=lambda s: s.start)]
+        return node
+
+
+class _NoSpan:
+    def set(self, **attrs):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Trace:
+    def __init__(self, name: str, profile: bool = False):
+        self.root = Span(name, {})
+        self.started_at = time.time()
+        self.error = None
+        self.profile = None
+        self._lock = threading.Lock()
+        self._active: Dict[int, int] = {}  # thread id -> open spans of this trace in it
+        self._sampler = _Sampler(self) if profile else None
+
+    def add(self, parent: Span, span: Span):
+        with self._lock:
+            parent.children.append(span)
+
+    def enter_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+
+    def exit_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._active.get(ident, 0) - 1
+            if depth > 0:
+                self._active[ident] = depth
+            else:
+                self._active.pop(ident, None)
+
+    def active_threads(self) -> list:
+        with self._lock:
+            return list(self._active)
+
+    def ms(self) -> float:
+        return self.root.ms()
+
+    def to_dict(self) -> dict:
+        trace = {
+            "name": self.root.name,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.started_at)) + "Z",
+            "ms": round(self.ms(), 2),
+            **self.root.attrs,
+            "spans": [child.to_dict(self.root.start) for child in sorted(self.root.children, key=lambda s: s.start)],
+        }
+        if self.error:
+            trace["error"] = self.error
+        if self.profile:
+            trace["profile"] = self.profile
+        return trace
+
+
+# ------------------ PROFILER ------------------
+def _stack(frame) -> tuple:
+    names = []
+    while frame is not None and len(names) < PROFILE_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return tuple(reversed(names))
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, trace: Trace):
+        super().__init__(name="trace-profiler", daemon=True)
+        self.trace = trace
+        self.interval = config.PROFILE_INTERVAL_MS / 1000
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + config.PROFILE_MAX_SECONDS
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident in self.trace.active_threads():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[_stack(frame)] += 1
+
+    def finish(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        leaf, inclusive = Counter(), Counter()
+        for stack, count in self.samples.items():
+            leaf[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+        return {
+            "interval_ms": config.PROFILE_INTERVAL_MS,
+            "samples": sum(self.samples.values()),
+            # flamegraph.pl / speedscope "collapsed" format
+            "stacks": [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common(PROFILE_TOP_STACKS)],
+            "functions": [{"function": function, "self": count, "total": inclusive[function]}
+                          for function, count in leaf.most_common(PROFILE_TOP_FUNCTIONS)],
+        }
+
+
+# ------------------ API ------------------
+@contextmanager
+def trace(name: str, profile: bool = False):
+    """
+    Opens a trace for the enclosed request; yields the Trace, or None when tracing is off.
+    """
+    if not settings["enabled"] and not profile:
+        yield None
+        return
+    current = Trace(name, profile)
+    token = _current.set((current, current.root))
+    if current._sampler is not None:
+        metrics.incr("tracing.profiled")
+        current._sampler.start()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.root.end = time.perf_counter()
+        _current.reset(token)
+        if current._sampler is not None:
+            current.profile = current._sampler.finish()
+        _finish(current)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Times the enclosed stage as a child of the current span; yields it for .set(**attrs).
+    """
+    current = _current.get()
+    if current is None:
+        yield NO_SPAN
+        return
+    owner, parent = current
+    child = Span(name, attrs)
+    owner.add(parent, child)
+    token = _current.set((owner, child))
+    owner.enter_thread()
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        child.end = time.perf_counter()
+        owner.exit_thread()
+        _current.reset(token)
+        metrics.observe(f"trace.{name}_ms", child.ms())
+
+
+def record(name: str, start: float, **attrs):
+    """
+    Adds an already finished stage that began at `start` (time.perf_counter()) and ends now.
+    """
+    current = _current.get()
+    if current is None:
+        return
+    owner, parent = current
+    child = Span(name, attrs, start)
+    child.end = time.perf_counter()
+    owner.add(parent, child)
+    metrics.observe(f"trace.{name}_ms", child.ms())
+
+
+def annotate(**attrs):
+    """
+    Sets attributes on the request's root span (ids, answer path, cache hits, ...).
+    """
+    current = _current.get()
+    if current is not None:
+        current[0].root.set(**attrs)
+
+
+def _finish(current: Trace):
+    total = current.ms()
+    metrics.observe(f"trace.{current.root.name}_ms", total)
+    if total < settings["slow_ms"] and current.error is None:
+        return
+    metrics.incr("tracing.slow_requests")
+    entry = current.to_dict()
+    _slow_traces.append(entry)
+    if not config.SLOW_REQUEST_LOG_PATH:
+        return
+    try:
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with _log_lock:
+            path = config.SLOW_REQUEST_LOG_PATH
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > config.SLOW_REQUEST_LOG_MAX_MB * 1024 * 1024:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        metrics.incr("tracing.log_errors")
+        print(f"⚠️ Could not write slow-request log: {e}")
+
+
+def recent_slow_traces(limit: int = 20) -> list:
+    return list(_slow_traces)[-limit:][::-1]
+
+
+def configure(enabled: bool = None, slow_ms: float = None):
+    if enabled is not None:
+        settings["enabled"] = enabled
+    if slow_ms is not None:
+        settings["slow_ms"] = slow_ms
@@ -0,0 +1,88 @@
+# backend/app/core/warmup.py
+"""
+Startup loading of models and read-only indexes, once per process tree.
+
+The FastAPI lifespan calls warm_up() in every process. When
+scripts/serve_prefork.py has already called it in the parent before forking,
+workers inherit the loaded objects copy-on-write and the call is a no-op, so
+the BM25 structures, facet index, pre-warmed caches, tokenizer, GLiNER and
+reranker weights are shared between workers instead of loaded once per worker.
+
+Two things are left to each worker because they do not survive a fork: the
+Chroma client (its Rust runtime deadlocks in a forked child, so the parent
+pages the corpus in from a spawned process instead) and the ONNX embedding model
+(an onnxruntime session starts its thread pool when created).
+"""
+import time
+from typing import Iterable
+
+_warmed = False
+
+
+def is_warm() -> bool:
+    return _warmed
+
+
+def warm_up(corpus_pages: Iterable[dict] = None):
+    """
+    :param corpus_pages: collection.get()-shaped pages to build BM25 from instead of reading the vector store
+    """
+    global _warmed
+    if _warmed:
+        print("✅ Models and indexes inherited from the parent process.")
+        return
+
+    from app.rag.retriever import index_generation, initialize_bm25, initialize_content_index
+    from app.rag.facet_index import load_facet_index
+    from app.rag.context_packer import tokenizer_name
+    from app.rag.reranker import reranker_name
+    from app.rag.sync import pin_state
+
+    start = time.perf_counter()
+
+    # Initialize the BM25 (Keyword) Index from ChromaDB data
+    # This ensures Hybrid Search works immediately
+    # (sync watermarks are read first: the index covers at least up to them)
+    pin_state()
+    try:
+        initialize_bm25(corpus_pages)
+        print("✅ Search Index Initialized.")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not initialize search index: {e}")
+
+    # Schemes, training programs, news and FAQs for search_content (Mongo $text while this fails)
+    try:
+        initialize_content_index()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load content index: {e}")
+
+    # Load the facet index used for structured job lookups
+    try:
+        load_facet_index()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load facet index: {e}")
+
+    # Answers, translations and embeddings of the most frequent logged queries
+    # (scripts/build_hot_queries.py); answers are keyed on the index just built
+    try:
+        from app.core.caches import load_bundle
+        counts = load_bundle(index_generation())
+        if counts:
+            print(f"✅ Hot-query caches: {counts['answers']} answers, {counts['translations']} translations, "
+                  f"{counts['embeddings']} embeddings.")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load hot-query bundle: {e}")
+
+    # Load the prompt tokenizer and reranker now rather than on the first chat request
+    print(f"✅ Prompt tokenizer: {tokenizer_name()}")
+    print(f"✅ Reranker: {reranker_name()}")
+
+    # Entity extractor (loads GLiNER when installed)
+    try:
+        import app.nlu.entity_extractor  # noqa: F401
+        print("✅ Entity extractor loaded.")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not load entity extractor: {e}")
+
+    print(f"✅ Warm-up finished in {time.perf_counter() - start:.1f}s.")
+    _warmed = True
@@ -5,8 +5,12 @@ import uvicorn
 
 # Import your API routes
 from app.api.endpoints import router as api_router
-# Import the function to build the Keyword Index
-from app.rag.retriever import initialize_bm25
+# Loads the search indexes and models (no-op in workers forked from a warmed parent)
+from app.core.warmup import warm_up
+from app.core.admission import AdmissionControlMiddleware
+from app.rag.sync import start_sync, stop_sync
+from app.rag.compaction import start_compaction, stop_compaction
+from app.rag.faq_matcher import load_faq_matcher
 
 # --- 1. Lifecycle Manager ---
 # This runs BEFORE the app starts receiving requests
@@ -14,16 +18,24 @@ from app.rag.retriever import initialize_bm25
 async def lifespan(app: FastAPI):
     print("🚀 Starting PGRKAM Smart Assistant...")
     
-    # Initialize the BM25 (Keyword) Index from ChromaDB data
-    # This ensures Hybrid Search works immediately
+    # BM25 index, facet index, tokenizer, reranker and NLU models
+    warm_up()
+    
+    # FAQ signatures and question embeddings (per worker: the embedding model doesn't survive a fork)
     try:
-        initialize_bm25()
-        print("✅ Search Index Initialized.")
+        print(f"✅ FAQ matcher: {len(load_faq_matcher().faqs)} FAQs.")
     except Exception as e:
-        print(f"⚠️ Warning: Could not initialize search index: {e}")
+        print(f"⚠️ Warning: Could not load FAQs: {e}")
+    
+    # Applies newly scraped jobs to the indexes (SYNC_ENABLED)
+    start_sync()
+    # Drops expired jobs from the indexes on a schedule (COMPACTION_ENABLED)
+    start_compaction()
         
     yield
     
+    stop_compaction()
+    stop_sync()
     print("🛑 Shutting down...")
 
 # --- 2. App Initialization ---
@@ -34,7 +46,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# --- 3. CORS Policy (Crucial for Frontend connection) ---
+# --- 3. Admission Control ---
+# Caps concurrent chat requests (global, per session, per IP) and sheds the
+# excess with 429/503 + Retry-After. Added before CORS so CORS wraps it and
+# rejections still carry CORS headers for the browser.
+app.add_middleware(AdmissionControlMiddleware)
+
+# --- 4. CORS Policy (Crucial for Frontend connection) ---
 origins = [
     "http://localhost:3000",  # React default port
     "http://localhost:5173",  # Vite default port
@@ -49,13 +67,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# --- 4. Register Routes ---
+# --- 5. Register Routes ---
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(api_router)  # Also register without prefix for frontend
 
-# --- 5. Health Check ---
+# --- 6. Health Check ---
 @app.get("/")
 def health_check():
     return {
@@ -22,6 +22,9 @@ def extract_entities_fast(text: str) -> List[Dict[str, str]]:
     qualifications = ["b.tech", "btech", "mba", "bca", "mca", "ba", "bsc", "ma", "msc", 
                      "12th", "10th", "graduate", "diploma", "phd"]
     
+    # Sector keywords (normalized to 'govt' / 'private' by the retriever)
+    job_types = {"government": "Govt", "govt": "Govt", "sarkari": "Govt", "private": "Private"}
+    
     # Extract cities
     for city in cities:
         if city in text_lower:
@@ -32,11 +35,17 @@ def extract_entities_fast(text: str) -> List[Dict[str, str]]:
         if role in text_lower:
             entities.append({"text": role.title(), "label": "job_role"})
     
-    # Extract qualifications
+    # Extract qualifications (whole words only, so 'ba' does not fire on 'bathinda')
     for qual in qualifications:
-        if qual in text_lower:
+        if re.search(r'(?<![a-z0-9])' + re.escape(qual) + r'(?![a-z0-9])', text_lower):
             entities.append({"text": qual.upper(), "label": "qualification"})
     
+    # Extract job type
+    for keyword, job_type in job_types.items():
+        if keyword in text_lower:
+            entities.append({"text": job_type, "label": "job_type"})
+            break
+    
     # Extract age using regex
     age_pattern = r'\b(\d{1,2})\s*(?:years?|yrs?)\b'
     age_matches = re.findall(age_pattern, text_lower)
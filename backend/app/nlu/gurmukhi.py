@@ -0,0 +1,170 @@
+# backend/app/nlu/gurmukhi.py
+"""
+Gurmukhi-aware text normalization, tokenization and glossing.
+
+Used to handle Punjabi queries without first translating them to English:
+
+- normalize() folds spelling variants that Punjabi writers use interchangeably
+  (nukta letters, bindi/tippi, addak, Gurmukhi digits, zero-width joiners).
+- tokenize() keeps vowel signs attached to their consonants. A plain `\\w+`
+  split breaks Gurmukhi words apart at every matra, because vowel signs are
+  combining marks, not word characters.
+- gloss() rewrites the domain words of a Punjabi query (jobs, districts, roles,
+  qualifications, sectors, question words) into the English terms the keyword
+  intent classifier, the rule-based entity extractor and the English job corpus
+  use, leaving unknown words in Gurmukhi.
+"""
+import re
+import unicodedata
+from typing import List
+
+_ZERO_WIDTH = dict.fromkeys([0x200B, 0x200C, 0x200D, 0xFEFF])
+
+# After NFC the nukta letters (ਸ਼, ਖ਼, ਗ਼, ਜ਼, ਫ਼, ਲ਼) are base letter + nukta, so
+# dropping the nukta folds them onto the base letters they are often written as
+_FOLD = {
+    0x0A3C: None,        # nukta
+    0x0A02: "\u0A70",   # bindi -> tippi (positional variants of the same nasal)
+    0x0A71: None,        # addak (gemination mark), often omitted
+    0x0964: " ",         # danda
+    0x0965: " ",         # double danda
+}
+_FOLD.update({0x0A66 + d: str(d) for d in range(10)})  # Gurmukhi digits
+_FOLD_TABLE = str.maketrans(_FOLD)
+
+# Word characters plus the whole Gurmukhi block (vowel signs, tippi, ...);
+# dots and pluses are kept inside tokens (b.tech, +2)
+_TOKEN = re.compile(r"[\w\u0A00-\u0A7F]+(?:[.+][\w\u0A00-\u0A7F]+)*")
+_GURMUKHI = re.compile(r"[\u0A00-\u0A7F]")
+
+# Phrases glossed before tokenization
+PUNJABI_PHRASES = {
+    "ਸਤ ਸ੍ਰੀ ਅਕਾਲ": "hello",
+    "ਆਖਰੀ ਮਿਤੀ": "deadline",
+    "ਬਿਜਲੀ ਮਿਸਤਰੀ": "electrician",
+    "ਸੁਰੱਖਿਆ ਗਾਰਡ": "security guard",
+    "ਫ਼ਤਹਿਗੜ੍ਹ ਸਾਹਿਬ": "fatehgarh sahib",
+    "ਤਰਨ ਤਾਰਨ": "tarn taran",
+    "ਸ੍ਰੀ ਮੁਕਤਸਰ ਸਾਹਿਬ": "muktsar",
+}
+
+# Punjabi word -> English term(s) ("" drops the word)
+PUNJABI_LEXICON = {
+    # Jobs and applications
+    "ਨੌਕਰੀ": "job", "ਰੁਜ਼ਗਾਰ": "employment", "ਰੋਜ਼ਗਾਰ": "employment", "ਭਰਤੀ": "recruitment",
+    "ਅਸਾਮੀ": "vacancy", "ਖਾਲੀ": "vacancy", "ਕੰਮ": "work", "ਕੈਰੀਅਰ": "career", "ਪੋਸਟ": "post",
+    "ਅਪਲਾਈ": "apply", "ਅਰਜ਼ੀ": "application", "ਰਜਿਸਟਰ": "register", "ਰਜਿਸਟ੍ਰੇਸ਼ਨ": "registration",
+    "ਸਥਿਤੀ": "status", "ਸਟੇਟਸ": "status",
+    # Schemes and training
+    "ਯੋਜਨਾ": "scheme", "ਸਕੀਮ": "scheme", "ਸਿਖਲਾਈ": "training", "ਟ੍ਰੇਨਿੰਗ": "training",
+    "ਹੁਨਰ": "skill", "ਕੋਰਸ": "course", "ਲਾਭ": "benefit", "ਸਬਸਿਡੀ": "subsidy", "ਪ੍ਰੋਗਰਾਮ": "program",
+    # Sector
+    "ਸਰਕਾਰੀ": "government", "ਪ੍ਰਾਈਵੇਟ": "private", "ਨਿੱਜੀ": "private",
+    # Job fields
+    "ਉਮਰ": "age", "ਸਾਲ": "years", "ਤਨਖਾਹ": "salary", "ਯੋਗਤਾ": "qualification",
+    "ਮਿਤੀ": "date", "ਤਾਰੀਖ": "date", "ਆਖਰੀ": "last", "ਪਾਸ": "pass",
+    # Roles
+    "ਅਧਿਆਪਕ": "teacher", "ਟੀਚਰ": "teacher", "ਡਰਾਈਵਰ": "driver", "ਕਲਰਕ": "clerk",
+    "ਇੰਜੀਨੀਅਰ": "engineer", "ਡਾਕਟਰ": "doctor", "ਨਰਸ": "nurse", "ਅਫ਼ਸਰ": "officer",
+    "ਅਧਿਕਾਰੀ": "officer", "ਮੈਨੇਜਰ": "manager", "ਮਕੈਨਿਕ": "mechanic", "ਇਲੈਕਟ੍ਰੀਸ਼ੀਅਨ": "electrician",
+    "ਪਲੰਬਰ": "plumber", "ਲੇਖਾਕਾਰ": "accountant", "ਅਕਾਊਂਟੈਂਟ": "accountant", "ਪ੍ਰੋਗਰਾਮਰ": "programmer",
+    "ਸਿਪਾਹੀ": "constable", "ਕਾਂਸਟੇਬਲ": "constable", "ਪੁਲਿਸ": "police", "ਚਪੜਾਸੀ": "peon", "ਗਾਰਡ": "guard",
+    # Qualifications
+    "ਦਸਵੀਂ": "10th", "ਬਾਰ੍ਹਵੀਂ": "12th", "ਬਾਰਵੀਂ": "12th", "ਮੈਟ੍ਰਿਕ": "matric", "ਗ੍ਰੈਜੂਏਟ": "graduate",
+    "ਗ੍ਰੈਜੂਏਸ਼ਨ": "graduation", "ਡਿਪਲੋਮਾ": "diploma", "ਆਈਟੀਆਈ": "iti", "ਬੀਟੈਕ": "b.tech",
+    "ਐਮਬੀਏ": "mba", "ਪੀਐਚਡੀ": "phd",
+    # Districts
+    "ਅੰਮ੍ਰਿਤਸਰ": "amritsar", "ਬਰਨਾਲਾ": "barnala", "ਬਠਿੰਡਾ": "bathinda", "ਫ਼ਰੀਦਕੋਟ": "faridkot",
+    "ਫ਼ਾਜ਼ਿਲਕਾ": "fazilka", "ਫ਼ਿਰੋਜ਼ਪੁਰ": "ferozepur", "ਗੁਰਦਾਸਪੁਰ": "gurdaspur", "ਹੁਸ਼ਿਆਰਪੁਰ": "hoshiarpur",
+    "ਜਲੰਧਰ": "jalandhar", "ਕਪੂਰਥਲਾ": "kapurthala", "ਲੁਧਿਆਣਾ": "ludhiana", "ਮਲੇਰਕੋਟਲਾ": "malerkotla",
+    "ਮਾਨਸਾ": "mansa", "ਮੋਗਾ": "moga", "ਮੋਹਾਲੀ": "mohali", "ਮੁਹਾਲੀ": "mohali", "ਮੁਕਤਸਰ": "muktsar",
+    "ਨਵਾਂਸ਼ਹਿਰ": "nawanshahr", "ਪਠਾਨਕੋਟ": "pathankot", "ਪਟਿਆਲਾ": "patiala", "ਰੂਪਨਗਰ": "rupnagar",
+    "ਰੋਪੜ": "ropar", "ਸੰਗਰੂਰ": "sangrur", "ਚੰਡੀਗੜ੍ਹ": "chandigarh", "ਪੰਜਾਬ": "punjab",
+    # Greetings and question/function words
+    "ਨਮਸਤੇ": "namaste", "ਹੈਲੋ": "hello",
+    "ਵਿੱਚ": "in", "ਵਿਚ": "in", "ਲਈ": "for", "ਦੀ": "of", "ਦਾ": "of", "ਦੇ": "of", "ਨਾਲ": "with",
+    "ਤੋਂ": "from", "ਤੱਕ": "upto", "ਅਤੇ": "and", "ਤੇ": "and", "ਜਾਂ": "or", "ਬਾਰੇ": "about",
+    "ਕੀ": "what", "ਕਿਹੜੀ": "which", "ਕਿਹੜੀਆਂ": "which", "ਕਿਵੇਂ": "how", "ਕਿੱਥੇ": "where",
+    "ਕਿੰਨੀ": "how much", "ਕਿੰਨਾ": "how much", "ਮੈਨੂੰ": "me", "ਮੈਂ": "i", "ਮੇਰੀ": "my", "ਮੇਰਾ": "my",
+    "ਹੈ": "is", "ਹਨ": "are", "ਕੋਈ": "any", "ਸਾਰੀਆਂ": "all", "ਦੱਸੋ": "tell", "ਦਿਖਾਓ": "show",
+    "ਲੱਭੋ": "find", "ਚਾਹੀਦੀ": "need", "ਚਾਹੀਦਾ": "need", "ਵਾਲੇ": "", "ਵਾਲੀਆਂ": "", "ਜੀ": "",
+}
+
+# Inflections tried when a word is not in the lexicon: plural/oblique endings
+_SUFFIX_RULES = [("ੀਆਂ", "ੀ"), ("ਿਆਂ", "ਾ"), ("ਵਾਂ", ""), ("ਆਂ", ""), ("ਾਂ", ""), ("ੇ", "ਾ"), ("ੇ", ""), ("ਿਆ", "ਾ")]
+# "12ਵੀਂ", "10 ਵੀਂ" -> "12th"
+_ORDINAL = re.compile(r"(\d+)\s*\u0A35\u0A40\u0A70?(?![\u0A00-\u0A7F])")
+
+
+def normalize(text: str) -> str:
+    """
+    NFC, zero-width characters removed, Gurmukhi spelling variants folded, lowercased.
+    """
+    text = unicodedata.normalize("NFC", text or "").translate(_ZERO_WIDTH)
+    return text.translate(_FOLD_TABLE).lower()
+
+
+def has_gurmukhi(text: str) -> bool:
+    return bool(_GURMUKHI.search(text or ""))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Index/query tokens for the keyword index (English and Punjabi alike).
+    """
+    return _TOKEN.findall(normalize(text))
+
+
+_PHRASES = sorted(((normalize(k), v) for k, v in PUNJABI_PHRASES.items()), key=lambda kv: -len(kv[0]))
+_LEXICON = {normalize(k): v for k, v in PUNJABI_LEXICON.items()}
+_SUFFIXES = [(normalize(s), normalize(r)) for s, r in _SUFFIX_RULES]
+
+
+def _lookup(token: str):
+    if token in _LEXICON:
+        return _LEXICON[token]
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 1:
+            stem = token[:-len(suffix)] + replacement
+            if stem in _LEXICON:
+                return _LEXICON[stem]
+    return None
+
+
+def gloss(text: str) -> str:
+    """
+    English rendering of the known words of a (possibly mixed) Punjabi query.
+    English words pass through; unknown Gurmukhi words are kept as they are.
+    """
+    text = normalize(text)
+    if not has_gurmukhi(text):
+        return " ".join(_TOKEN.findall(text))
+    text = _ORDINAL.sub(r" \1th ", text)
+    for phrase, english in _PHRASES:
+        text = text.replace(phrase, f" {english} ")
+    words = []
+    for token in _TOKEN.findall(text):
+        english = _lookup(token) if has_gurmukhi(token) else None
+        if english is None:
+            words.append(token)
+        elif english:
+            words.append(english)
+    return " ".join(words)
+
+
+def english_view(text: str) -> str:
+    """
+    The text for English-only models: unchanged unless it contains Gurmukhi, else its gloss.
+    """
+    return gloss(text) if has_gurmukhi(text) else text
+
+
+def query_terms(text: str) -> List[str]:
+    """
+    Keyword-index terms for a query: its own tokens plus, for Punjabi, the
+    English glosses (the job corpus is English).
+    """
+    tokens = tokenize(text)
+    if has_gurmukhi(text):
+        tokens += [t for t in tokenize(gloss(text)) if not has_gurmukhi(t)]
+    return tokens
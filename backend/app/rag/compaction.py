@@ -0,0 +1,355 @@
+# backend/app/rag/compaction.py
+"""
+Expiry-aware pruning and compaction of the job indexes.
+
+Government postings carry a last apply date; once it has passed (plus
+EXPIRY_GRACE_DAYS) the posting should stop being searched and recommended.
+One compaction pass:
+
+1. Types deadlines in Mongo: jobs without `deadline_at` (scraped before the
+   scraper wrote it) get it parsed from last_apply_date.
+2. Finds expired postings in the vector store and the keyword index by their
+   `deadline` metadata, and in Mongo by `deadline_at`.
+3. Removes them from Mongo with EXPIRY_MONGO_MODE=sweep ("ttl" leaves it to a
+   TTL index on deadline_at). The default, "keep", leaves them there.
+4. Drops them from all indexes in one batch through the sync sink
+   (JobSync.apply): Chroma delete, a rebuilt keyword index, the facet and
+   dedup indexes.
+5. Rebuilds the Chroma segment when deletes since the last rebuild exceed
+   COMPACTION_REBUILD_FRACTION of it (HNSW only tombstones deleted vectors; the
+   flat backend rewrites its arrays itself once enough rows are dead). This briefly
+   replaces the collection, so it only runs standalone with --rebuild. The old
+   collection is renamed aside and deleted only after the fresh one took its
+   name; a rebuild interrupted in between is undone by the next one.
+6. Appends index sizes before/after and the reclaimed bytes to
+   COMPACTION_HISTORY_PATH (one JSON line per pass).
+
+Runs inside the API process every COMPACTION_INTERVAL_HOURS (COMPACTION_ENABLED)
+or standalone:
+
+    python -m app.rag.compaction              # one pass
+    python -m app.rag.compaction --rebuild    # one pass, rebuild the Chroma segment if due
+    python -m app.rag.compaction --history    # index size over time
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core import config, metrics
+from app.core.logger import logger
+from app.rag import retriever, vector_store
+from app.rag.ingest_mongo import DB_NAME, JOB_TYPES, MONGODB_URI
+from app.rag.job_fields import expiry_cutoff, parse_deadline
+from app.rag.sync import JobSync, load_state, running_sync
+
+TTL_INDEX_NAME = "deadline_at_ttl"
+REBUILD_PAGE_SIZE = 500
+
+_compactor: Optional["Compactor"] = None
+
+
+# ------------------ EXPIRY ------------------
+def expired_where(cutoff: datetime) -> dict:
+    """
+    Metadata filter for expired postings (deadline 0 = unknown, never expires).
+    """
+    return {"$and": [{"deadline": {"$gt": 0}}, {"deadline": {"$lt": int(cutoff.strftime("%Y%m%d"))}}]}
+
+
+def backfill_deadlines(db) -> int:
+    """
+    Sets deadline_at on jobs that don't have it yet; returns how many were updated.
+    """
+    updated = 0
+    for coll_name in JOB_TYPES:
+        ops = [UpdateOne({"_id": job["_id"]}, {"$set": {"deadline_at": parse_deadline(job.get("last_apply_date"))}})
+               for job in db[coll_name].find({"deadline_at": {"$exists": False}}, {"last_apply_date": 1})]
+        for i in range(0, len(ops), 1000):
+            updated += db[coll_name].bulk_write(ops[i:i + 1000], ordered=False).modified_count
+    return updated
+
+
+def ensure_ttl_index(db):
+    """
+    TTL index on deadline_at: the server deletes a job the grace period after its last day.
+    """
+    ttl = (config.EXPIRY_GRACE_DAYS + 1) * 86400
+    for coll_name in JOB_TYPES:
+        try:
+            db[coll_name].create_index([("deadline_at", ASCENDING)], name=TTL_INDEX_NAME, expireAfterSeconds=ttl)
+        except OperationFailure:
+            # Grace period changed since the index was created
+            db.command("collMod", coll_name, index={"name": TTL_INDEX_NAME, "expireAfterSeconds": ttl})
+
+
+# ------------------ SIZES ------------------
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _vector_dir() -> str:
+    return config.FLAT_INDEX_DIR if config.VECTOR_BACKEND == "flat" else vector_store.PERSIST_DIRECTORY
+
+
+def index_sizes(db=None, keyword_index: bool = True) -> dict:
+    sizes = {"vector_documents": vector_store.get_collection().count(), "vector_bytes": _dir_bytes(_vector_dir())}
+    if keyword_index:
+        keyword = retriever.keyword_index_stats()
+        sizes.update(keyword_documents=keyword["documents"], keyword_terms=keyword["terms"],
+                     keyword_bytes=keyword["bytes"])
+    if db is not None:
+        sizes["mongo_documents"] = sum(db[coll_name].estimated_document_count() for coll_name in JOB_TYPES)
+    return sizes
+
+
+# ------------------ HISTORY ------------------
+def append_history(report: dict, path: str = None):
+    path = path or config.COMPACTION_HISTORY_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report) + "\n")
+
+
+def load_history(path: str = None) -> list:
+    try:
+        with open(path or config.COMPACTION_HISTORY_PATH, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+# ------------------ VECTOR SEGMENT ------------------
+def _get_existing(client, name: str):
+    try:
+        return client.get_collection(name=name, embedding_function=vector_store.emb_fn)
+    except Exception:
+        return None
+
+
+def restore_interrupted_rebuild(client, name: str):
+    """
+    Undoes a rebuild that stopped between renames: puts the backup back under
+    `name` if nothing took it, drops the leftovers otherwise.
+    """
+    backup = _get_existing(client, f"{name}_backup")
+    if backup is not None:
+        if _get_existing(client, name) is None:
+            backup.modify(name=name)
+            logger.warning(f"Restored collection {name} from an interrupted segment rebuild")
+        else:
+            client.delete_collection(f"{name}_backup")
+    if _get_existing(client, f"{name}_compacting") is not None:
+        client.delete_collection(f"{name}_compacting")
+
+
+def rebuild_vector_segment() -> bool:
+    """
+    Copies the live vectors (no re-embedding) into a fresh Chroma collection that
+    replaces the old one, then VACUUMs the SQLite file, so the HNSW graph and
+    storage only hold live postings. Returns False for the flat backend.
+    """
+    if config.VECTOR_BACKEND == "flat":
+        return False
+    client = vector_store.get_client()
+    restore_interrupted_rebuild(client, "pgrkam_docs")
+    old = vector_store.get_collection()
+    name = old.name
+    fresh = client.create_collection(name=f"{name}_compacting", embedding_function=vector_store.emb_fn,
+                                     metadata={"hnsw:space": "cosine"})
+    offset = 0
+    while True:
+        page = old.get(limit=REBUILD_PAGE_SIZE, offset=offset, include=["embeddings", "documents", "metadatas"])
+        if page["ids"]:
+            fresh.upsert(ids=page["ids"], embeddings=page["embeddings"], documents=page["documents"],
+                         metadatas=page["metadatas"])
+        if len(page["ids"]) < REBUILD_PAGE_SIZE:
+            break
+        offset += REBUILD_PAGE_SIZE
+    # Old one aside first: some collection holds the live vectors at every point
+    old.modify(name=f"{name}_backup")
+    try:
+        fresh.modify(name=name)
+    except Exception:
+        old.modify(name=name)
+        raise
+    client.delete_collection(f"{name}_backup")
+    with sqlite3.connect(os.path.join(vector_store.PERSIST_DIRECTORY, "chroma.sqlite3")) as conn:
+        conn.execute("VACUUM")
+    return True
+
+
+# ------------------ COMPACTION ------------------
+class Compactor:
+    def __init__(self, db=None, sync: Optional[JobSync] = None, write_vectors: bool = True,
+                 update_keyword_index: bool = True):
+        self.db = db if db is not None else MongoClient(MONGODB_URI)[DB_NAME]
+        # Deletes go through the running sync, so its dedup index and state stay consistent
+        self.owns_sync = sync is None
+        self.sync = sync or JobSync(db=self.db, write_vectors=write_vectors, update_keyword_index=update_keyword_index)
+        self.last_report: Optional[dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _expired_ids(self, cutoff: datetime) -> set:
+        where = expired_where(cutoff)
+        expired = set()
+        if self.sync.write_vectors:
+            expired.update(vector_store.get_collection().get(where=where, include=[])["ids"])
+        if self.sync.update_keyword_index:
+            expired.update(retriever.indexed_ids(where))
+        for coll_name in JOB_TYPES:
+            expired.update(str(job["_id"]) for job in self.db[coll_name].find({"deadline_at": {"$lt": cutoff}}, {"_id": 1}))
+        return expired
+
+    def run_once(self, rebuild: bool = False) -> dict:
+        start = time.perf_counter()
+        owner = self.sync.write_vectors  # the vector writer also owns Mongo and the history
+        cutoff = expiry_cutoff()
+        before = index_sizes(self.db, self.sync.update_keyword_index)
+
+        backfilled = backfill_deadlines(self.db) if owner else 0
+        if owner and config.EXPIRY_MONGO_MODE == "ttl":
+            ensure_ttl_index(self.db)
+        expired = self._expired_ids(cutoff)
+        removed_from_mongo = 0
+        if owner and config.EXPIRY_MONGO_MODE == "sweep":
+            for coll_name in JOB_TYPES:
+                removed_from_mongo += self.db[coll_name].delete_many({"deadline_at": {"$lt": cutoff}}).deleted_count
+        if expired:
+            if self.owns_sync:
+                # Don't write back watermarks older than a separate sync process saved
+                self.sync.state = load_state()
+            self.sync.apply({}, expired)
+
+        history = load_history() if owner else []
+        deleted_since_rebuild = len(expired) + (history[-1].get("deleted_since_rebuild", 0) if history else 0)
+        segment = max(before["vector_documents"] + deleted_since_rebuild - len(expired), 1)
+        rebuild_due = config.VECTOR_BACKEND != "flat" and deleted_since_rebuild / segment >= config.COMPACTION_REBUILD_FRACTION
+        rebuilt = bool(owner and rebuild and rebuild_due and rebuild_vector_segment())
+        after = index_sizes(self.db, self.sync.update_keyword_index)
+
+        report = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "cutoff": cutoff.date().isoformat(),
+            "expired": len(expired),
+            "removed_from_mongo": removed_from_mongo,
+            "deadlines_backfilled": backfilled,
+            "rebuilt_vector_segment": rebuilt,
+            "rebuild_due": rebuild_due and not rebuilt,
+            "deleted_since_rebuild": 0 if rebuilt else deleted_since_rebuild,
+            "reclaimed_bytes": {key[:-len("_bytes")]: before[key] - after[key] for key in before if key.endswith("_bytes")},
+            "before": before,
+            "after": after,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        if owner:
+            append_history(report)
+        self.last_report = report
+
+        metrics.incr("compaction.runs")
+        metrics.incr("compaction.expired", len(expired))
+        for key, value in after.items():
+            metrics.set_gauge(f"index.{key}", value)
+        metrics.observe("compaction.seconds", report["seconds"])
+        logger.info(f"Compaction: {len(expired)} expired postings dropped, {removed_from_mongo} removed from Mongo, "
+                    f"reclaimed {report['reclaimed_bytes']}")
+        return report
+
+    def run(self):
+        while not self._stop.wait(config.COMPACTION_INTERVAL_HOURS * 3600):
+            try:
+                self.run_once()
+            except PyMongoError as e:
+                metrics.incr("compaction.errors")
+                logger.warning(f"Compaction failed: {e}")
+            except Exception as e:
+                metrics.incr("compaction.errors")
+                logger.error(f"Compaction failed: {e}")
+
+    def start(self) -> "Compactor":
+        self._thread = threading.Thread(target=self.run, name="index-compaction", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        return {"interval_hours": config.COMPACTION_INTERVAL_HOURS, "last": self.last_report}
+
+
+def start_compaction() -> Optional[Compactor]:
+    """
+    Starts the in-process compaction thread (FastAPI lifespan) when COMPACTION_ENABLED.
+    """
+    global _compactor
+    if not config.COMPACTION_ENABLED or _compactor is not None:
+        return _compactor
+    sync = running_sync()
+    _compactor = Compactor(db=sync.db if sync else None, sync=sync,
+                           write_vectors=config.SYNC_VECTOR_WRITES).start()
+    print(f"🧹 Index compaction scheduled every {config.COMPACTION_INTERVAL_HOURS}h "
+          f"(expired jobs: {config.EXPIRY_MONGO_MODE}).")
+    return _compactor
+
+
+def stop_compaction():
+    global _compactor
+    if _compactor is not None:
+        _compactor.stop()
+        _compactor = None
+
+
+def compaction_status() -> Optional[dict]:
+    return _compactor.status() if _compactor is not None else None
+
+
+# ------------------ MAIN ------------------
+def print_history(history: list):
+    print(f"{'at':<26}{'expired':>9}{'vectors':>10}{'vector MB':>11}{'mongo':>9}{'reclaimed MB':>14}  rebuilt")
+    for entry in history:
+        after = entry["after"]
+        print(f"{entry['at']:<26}{entry['expired']:>9}{after['vector_documents']:>10}"
+              f"{after['vector_bytes'] / 1e6:>11.2f}{after.get('mongo_documents', 0):>9}"
+              f"{entry['reclaimed_bytes'].get('vector', 0) / 1e6:>14.2f}  {'yes' if entry['rebuilt_vector_segment'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop expired jobs from MongoDB and the search indexes")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild the Chroma segment if enough was deleted (don't serve meanwhile)")
+    parser.add_argument("--history", action="store_true", help="Print index size over time and exit")
+    args = parser.parse_args()
+
+    if args.history:
+        print_history(load_history())
+        return
+    report = Compactor(update_keyword_index=False).run_once(rebuild=args.rebuild)
+    print(f"🧹 {report['expired']} expired postings dropped ({report['removed_from_mongo']} from MongoDB), "
+          f"{report['deadlines_backfilled']} deadlines typed.")
+    print(f"📉 Vector store: {report['before']['vector_documents']} -> {report['after']['vector_documents']} documents, "
+          f"{report['reclaimed_bytes']['vector'] / 1e6:.2f} MB reclaimed"
+          f"{' (segment rebuilt)' if report['rebuilt_vector_segment'] else ''}.")
+    if report["rebuild_due"]:
+        print("ℹ️ Enough vectors were deleted to rebuild the Chroma segment: run again with --rebuild.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/app/rag/content_index.py
+"""
+In-process keyword index for the small, rarely changing content collections
+(faqs, schemes, training_programs, news_updates).
+
+They hold a few dozen documents, so at startup each collection is read once
+into a BM25 index (the same SparseIndex and tokenizer as the job corpus, over
+the fields of its Mongo text index) plus the formatted results.
+retriever.search_content then answers from memory without a Mongo round-trip,
+and falls back to the Mongo $text query while the index is cold. Questions
+about schemes and training get these documents in their prompt
+(retriever.content_search).
+
+Ingestion scripts bump a version number (content_meta, _id "content"). At most
+every CONTENT_VERSION_CHECK_SECONDS a background thread reads it and rebuilds
+the index when it changed, and reloads the FAQ matcher (app/rag/faq_matcher.py)
+if one is loaded; requests keep using the current ones meanwhile.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core import config, metrics
+from app.nlu.gurmukhi import query_terms, tokenize
+from app.rag.sparse_index import SparseIndex
+
+# content type -> (Mongo collection, fields of its text index)
+CONTENT_SOURCES = {
+    "faq": ("faqs", ["question", "answer"]),
+    "scheme": ("schemes", ["name", "description", "benefits"]),
+    "training": ("training_programs", ["name", "description"]),
+    "news": ("news_updates", ["title", "content"]),
+}
+VERSION_COLLECTION = "content_meta"
+VERSION_ID = "content"
+
+_content_index: Optional["ContentIndex"] = None
+_checked_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+def format_content(r: dict, content_type: str) -> str:
+    if content_type == "faq":
+        return f"Q: {r['question']}\nA: {r['answer']}"
+    if content_type == "scheme":
+        return f"Scheme: {r['name']}\nDescription: {r['description']}\nBenefits: {r['benefits']}\nEligibility: {r['eligibility']}"
+    if content_type == "training":
+        return f"Training: {r['name']}\nDescription: {r['description']}\nDuration: {r['duration']}\nEligibility: {r['eligibility']}"
+    return f"News: {r['title']}\nContent: {r['content']}\nDate: {r['date']}"
+
+
+def content_version(db) -> int:
+    doc = db[VERSION_COLLECTION].find_one({"_id": VERSION_ID})
+    return int(doc.get("version", 0)) if doc else 0
+
+
+class ContentIndex:
+    def __init__(self, version: int):
+        self.version = version
+        self._indexes: Dict[str, tuple] = {}  # content type -> (SparseIndex, results)
+
+    @classmethod
+    def build(cls, db) -> "ContentIndex":
+        # Version first: a bump during the read triggers another rebuild, never a missed one
+        index = cls(content_version(db))
+        for content_type, (coll_name, fields) in CONTENT_SOURCES.items():
+            sparse, results = SparseIndex(), []
+            for r in db[coll_name].find():
+                try:
+                    content = format_content(r, content_type)
+                except KeyError:
+                    continue  # the Mongo path skips these too (its formatting fails)
+                sparse.add([tokenize(" ".join(str(r.get(field) or "") for field in fields))])
+                results.append({"id": str(r["_id"]), "content": content, "source": content_type})
+            index._indexes[content_type] = (sparse.finalize(), results)
+        return index
+
+    def has(self, content_type: str) -> bool:
+        return content_type in self._indexes
+
+    def size(self) -> int:
+        return sum(len(results) for _, results in self._indexes.values())
+
+    def search(self, query: str, content_type: str, top_k: int = 2) -> List[dict]:
+        sparse, results = self._indexes[content_type]
+        if not results:
+            return []
+        scores = sparse.get_scores(query_terms(query))
+        top = np.argsort(scores)[::-1][:top_k]
+        return [{**results[i], "score": float(scores[i])} for i in top if scores[i] > 0]
+
+
+def load_content_index(db) -> ContentIndex:
+    global _content_index, _checked_at
+    index = ContentIndex.build(db)
+    _content_index, _checked_at = index, time.monotonic()
+    metrics.set_gauge("content_index.documents", index.size())
+    metrics.set_gauge("content_index.version", index.version)
+    return index
+
+
+def _refresh(db):
+    try:
+        if _content_index is None or content_version(db) != _content_index.version:
+            index = load_content_index(db)
+            print(f"🔄 Content index reloaded (version {index.version}, {index.size()} documents).")
+            from app.rag.faq_matcher import get_faq_matcher, load_faq_matcher
+            if get_faq_matcher() is not None:
+                print(f"🔄 FAQ matcher reloaded ({len(load_faq_matcher().faqs)} FAQs).")
+    except Exception as e:
+        metrics.incr("content_index.refresh_errors")
+        print(f"⚠️ Content index refresh failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def loaded_version() -> int:
+    return _content_index.version if _content_index is not None else 0
+
+
+def get_content_index(db) -> Optional[ContentIndex]:
+    """
+    The loaded index (None while cold). Starts a background version check when one is due.
+    """
+    global _checked_at
+    if time.monotonic() - _checked_at >= config.CONTENT_VERSION_CHECK_SECONDS and _refresh_lock.acquire(blocking=False):
+        _checked_at = time.monotonic()
+        threading.Thread(target=_refresh, args=(db,), name="content-index-refresh", daemon=True).start()
+    return _content_index
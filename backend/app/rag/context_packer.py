@@ -0,0 +1,151 @@
+# backend/app/rag/context_packer.py
+"""
+Token-aware packing of retrieved documents into the generator prompt.
+
+Documents are "KEY: value" records (see ingest_mongo.format_job_to_text).
+Instead of cutting each one at a fixed character offset, fields are ranked by
+how useful they are for answering, empty ones ("N/A") are dropped, and the
+best fields of the best-ranked documents are added until a token budget,
+measured with the chat model's tokenizer, is spent.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core import config
+from app.core.logger import logger
+
+# Lower tier = packed first. Core facts of every document go in before the
+# secondary details of any single one.
+FIELD_TIERS = {
+    "ROLE": 0, "SCHEME": 0, "TRAINING": 0, "NEWS": 0, "Q": 0, "A": 0,
+    "ORGANIZATION": 1, "LOCATION": 1, "DEADLINE": 1, "QUALIFICATION": 1,
+    "AGE LIMIT": 1, "ELIGIBILITY": 1, "BENEFITS": 1, "DESCRIPTION": 1,
+    "SALARY": 2, "VACANCIES": 2, "DURATION": 2, "CONTENT": 2, "DATE": 2,
+    "APPLY LINK": 3, "OFFICIAL NOTIFICATION": 3, "ALTERNATE APPLY LINKS": 3, "JOB_TYPE": 3,
+}
+DEFAULT_TIER = 2
+
+EMPTY_VALUES = {"", "n/a", "na", "none", "null", "-", "--", "not specified", "not available", "nil"}
+
+_FIELD_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z_ ]{0,30}?)\s*:\s*(.*)$")
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+_tokenizer = None
+_tokenizer_name = None
+
+
+def _get_tokenizer():
+    """
+    Loads the Hugging Face tokenizer once; falls back to an approximate
+    word/punctuation counter if transformers or the model files are unavailable.
+    """
+    global _tokenizer, _tokenizer_name
+    if _tokenizer_name is None:
+        try:
+            from transformers import AutoTokenizer
+            _tokenizer = AutoTokenizer.from_pretrained(config.CONTEXT_TOKENIZER)
+            _tokenizer_name = config.CONTEXT_TOKENIZER
+        except Exception as e:
+            logger.warning(f"Tokenizer {config.CONTEXT_TOKENIZER} unavailable, using approximate counts: {e}")
+            _tokenizer = None
+            _tokenizer_name = "approx"
+    return _tokenizer
+
+
+def tokenizer_name() -> str:
+    _get_tokenizer()
+    return _tokenizer_name
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return len(_APPROX_TOKEN.findall(text))
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts text to at most max_tokens tokens, on a token boundary.
+    """
+    if max_tokens <= 0:
+        return ""
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        matches = list(_APPROX_TOKEN.finditer(text))
+        if len(matches) <= max_tokens:
+            return text
+        return text[:matches[max_tokens - 1].end()].rstrip() + "…"
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(ids) <= max_tokens:
+        return text
+    return tokenizer.decode(ids[:max_tokens]).rstrip() + "…"
+
+
+def parse_fields(content: str) -> List[Tuple[str, str]]:
+    """
+    Splits a record into (KEY, value) pairs, dropping empty values.
+    Lines that are not key/value pairs are kept under an empty key.
+    """
+    fields = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _FIELD_LINE.match(line)
+        if match and not match.group(2).startswith("//"):
+            key, value = match.group(1).strip().upper(), match.group(2).strip()
+        else:
+            key, value = "", line
+        if value.lower() in EMPTY_VALUES:
+            continue
+        fields.append((key, value))
+    return fields
+
+
+def pack_context(docs: List[dict], budget: Optional[int] = None,
+                 field_cap: Optional[int] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Builds the grounding text from ranked docs within a token budget.
+
+    :return: (grounding_text, stats) where stats has context_tokens, docs_used, fields_used, fields_dropped
+    """
+    budget = config.CONTEXT_TOKEN_BUDGET if budget is None else budget
+    field_cap = config.CONTEXT_FIELD_TOKENS if field_cap is None else field_cap
+
+    candidates = []  # (tier, doc_rank, field_pos, line, tokens)
+    for rank, doc in enumerate(docs):
+        for pos, (key, value) in enumerate(parse_fields(doc.get("content", ""))):
+            value = truncate_to_tokens(value, field_cap)
+            line = f"{key}: {value}" if key else value
+            tier = FIELD_TIERS.get(key, DEFAULT_TIER)
+            candidates.append((tier, rank, pos, line, count_tokens(line) + 1))
+
+    chosen, used = [], 0
+    for tier, rank, pos, line, tokens in sorted(candidates):
+        if used + tokens > budget:
+            continue
+        chosen.append((rank, pos, line))
+        used += tokens
+
+    per_doc: Dict[int, List[Tuple[int, str]]] = {}
+    for rank, pos, line in chosen:
+        per_doc.setdefault(rank, []).append((pos, line))
+    blocks = ["\n".join(line for _, line in sorted(lines)) for _, lines in sorted(per_doc.items())]
+
+    stats = {
+        "context_tokens": used,
+        "docs_used": len(blocks),
+        "fields_used": len(chosen),
+        "fields_dropped": len(candidates) - len(chosen),
+    }
+    return "\n\n".join(blocks), stats
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Prompt size of a chat message list (content only, plus a small per-message overhead).
+    """
+    return sum(count_tokens(m.get("content", "")) + 4 for m in messages)
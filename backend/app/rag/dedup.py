@@ -0,0 +1,211 @@
+# backend/app/rag/dedup.py
+"""
+Near-duplicate detection for job postings before they are indexed.
+
+The same vacancy is often posted by several employers (placement agencies) or
+re-posted with small wording changes. Such copies are folded into one
+canonical posting that carries the others' apply links, instead of being
+embedded and indexed separately.
+
+- Features: each "KEY: value" line of format_job_to_text output gives
+  key-prefixed word unigrams and bigrams, after lowercasing, dropping
+  punctuation and plural "s". Link lines are ignored, and so is ORGANIZATION
+  unless DEDUP_COMPARE_EMPLOYER is set.
+- MinHash: DEDUP_NUM_PERM hash functions over those features. The fraction of
+  equal signature slots estimates their Jaccard similarity.
+- LSH: the signature is split into DEDUP_BANDS bands, and each band is a bucket
+  key. Only canonical postings sharing a bucket with a new one are compared, so
+  the cost per new posting doesn't grow with the corpus.
+
+A posting whose estimated similarity to a canonical one reaches DEDUP_THRESHOLD
+joins that canonical posting's cluster; otherwise it becomes canonical itself.
+The index is persisted next to the facet index so app/rag/sync.py can extend it.
+"""
+import hashlib
+import os
+import pickle
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core import config
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"[a-z0-9]+")
+_IGNORED_FIELDS = {"APPLY LINK", "OFFICIAL NOTIFICATION", "ALTERNATE APPLY LINKS"}
+
+_dedup_index = None
+
+
+# ------------------ FEATURES ------------------
+def _normalize_word(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def features(text: str, compare_employer: bool = None) -> Set[str]:
+    compare_employer = config.DEDUP_COMPARE_EMPLOYER if compare_employer is None else compare_employer
+    found = set()
+    for line in (text or "").splitlines():
+        key, sep, value = line.partition(":")
+        key = key.strip().upper()
+        if not sep or key in _IGNORED_FIELDS or (key == "ORGANIZATION" and not compare_employer):
+            continue
+        words = [_normalize_word(w) for w in _WORD.findall(value.lower())]
+        if words in (["n", "a"], ["na"]):
+            continue
+        found.update(f"{key}:{w}" for w in words)
+        found.update(f"{key}:{a} {b}" for a, b in zip(words, words[1:]))
+    return found
+
+
+def _feature_hashes(found: Iterable[str]) -> np.ndarray:
+    # Stable across processes (unlike hash()), so persisted signatures stay valid
+    return np.array([int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "little")
+                     for f in found], dtype=np.uint64)
+
+
+# ------------------ INDEX ------------------
+class NearDuplicateIndex:
+    def __init__(self, num_perm: int = None, bands: int = None, threshold: float = None, seed: int = 1):
+        self.num_perm = num_perm or config.DEDUP_NUM_PERM
+        self.bands = bands or config.DEDUP_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"DEDUP_NUM_PERM ({self.num_perm}) must be a multiple of DEDUP_BANDS ({self.bands})")
+        self.rows = self.num_perm // self.bands
+        self.threshold = config.DEDUP_THRESHOLD if threshold is None else threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE), self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE), self.num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}   # canonical id -> signature
+        self.canonical_of: Dict[str, str] = {}          # every posting id -> its canonical id
+        self.members: Dict[str, List[str]] = {}         # canonical id -> duplicate ids, oldest first
+        self.info: Dict[str, dict] = {}                  # posting id -> {"collection", "apply_link", "employer"}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = _feature_hashes(features(text))
+        if not hashes.size:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # (a*h + b) mod p, truncated to 32 bits, minimized over the features
+        values = (np.outer(hashes, self._a) + self._b) % _MERSENNE & _MAX_HASH
+        return values.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.count_nonzero(a == b)) / self.num_perm
+
+    def find(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """
+        Most similar canonical posting at or above the threshold, if any.
+        """
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best = None
+        for doc_id in candidates:
+            score = self.similarity(signature, self._signatures[doc_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def assign(self, doc_id: str, text: str, info: Optional[dict] = None) -> str:
+        """
+        Adds a posting; returns its canonical id (its own id if it is new).
+        """
+        if doc_id in self.canonical_of:
+            self.remove(doc_id)
+        self.info[doc_id] = info or {}
+        signature = self.signature(text)
+        match = self.find(signature)
+        if match is not None:
+            canonical = match[0]
+            self.canonical_of[doc_id] = canonical
+            self.members[canonical].append(doc_id)
+            return canonical
+        self._signatures[doc_id] = signature
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(doc_id)
+        self.canonical_of[doc_id] = doc_id
+        self.members[doc_id] = []
+        return doc_id
+
+    def remove(self, doc_id: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Drops a posting. Returns (the canonical it was folded into, or None if it
+        was canonical itself or unknown; the members left without a canonical,
+        to be assigned again).
+        """
+        canonical = self.canonical_of.pop(doc_id, None)
+        self.info.pop(doc_id, None)
+        if canonical is None:
+            return None, []
+        if canonical != doc_id:
+            self.members[canonical].remove(doc_id)
+            return canonical, []
+        signature = self._signatures.pop(doc_id)
+        for band, key in self._band_keys(signature):
+            bucket = self._buckets[band][key]
+            bucket.remove(doc_id)
+            if not bucket:
+                del self._buckets[band][key]
+        orphans = self.members.pop(doc_id)
+        for member in orphans:
+            self.canonical_of.pop(member, None)
+        return None, orphans
+
+    def is_duplicate(self, doc_id: str) -> bool:
+        return self.canonical_of.get(doc_id, doc_id) != doc_id
+
+    def alternates(self, doc_id: str) -> List[dict]:
+        """
+        Info of the postings folded into a canonical one.
+        """
+        return [self.info.get(member, {}) for member in self.members.get(doc_id, ())]
+
+    def known_ids(self) -> Set[str]:
+        return set(self.canonical_of)
+
+    def stats(self) -> dict:
+        duplicates = sum(len(m) for m in self.members.values())
+        return {"canonical": len(self.members), "duplicates": duplicates,
+                "clusters": sum(1 for m in self.members.values() if m)}
+
+    # ------------------ PERSISTENCE ------------------
+    def save(self, path: str = None):
+        path = path or config.DEDUP_INDEX_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = None) -> "NearDuplicateIndex":
+        with open(path or config.DEDUP_INDEX_PATH, "rb") as f:
+            return pickle.load(f)
+
+
+def get_dedup_index() -> Optional[NearDuplicateIndex]:
+    """
+    The persisted index (loaded once), a new empty one if none was saved yet,
+    or None when DEDUP_ENABLED is off.
+    """
+    global _dedup_index
+    if not config.DEDUP_ENABLED:
+        return None
+    if _dedup_index is None:
+        try:
+            _dedup_index = NearDuplicateIndex.load()
+        except (OSError, pickle.UnpicklingError, EOFError):
+            _dedup_index = NearDuplicateIndex()
+    return _dedup_index
+
+
+def set_dedup_index(index: Optional[NearDuplicateIndex]):
+    global _dedup_index
+    _dedup_index = index
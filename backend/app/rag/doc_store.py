@@ -0,0 +1,197 @@
+# backend/app/rag/doc_store.py
+"""
+Compact columnar store for the documents behind the in-memory keyword index.
+
+Instead of a dict per document ({"id", "content", "meta"} plus a metadata dict,
+each with its own object headers), documents are kept as:
+
+    text     one contiguous UTF-8 buffer + uint64 offsets
+    ids      another UTF-8 buffer + offsets
+    metadata one integer code array per key, indexing an interned table of
+             the distinct values of that key (0 = key absent); keys that are
+             near-unique strings (job_id) get a UTF-8 buffer + offsets instead
+
+Filters are evaluated once per distinct value and broadcast to all documents
+through the code arrays, and documents are only materialized as dicts for the
+few results actually returned.
+
+A finalized store is immutable; updated() copies the surviving documents and
+appends new ones into the next version (used by app/rag/sync.py).
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.rag.job_fields import matches_where
+
+_MISSING = object()
+
+
+class DocStore:
+    def __init__(self):
+        self.size = 0
+        self._text = bytearray()
+        self._text_offsets = array("Q", [0])
+        self._ids = bytearray()
+        self._id_offsets = array("Q", [0])
+        self._codes: Dict[str, object] = {}      # key -> array("I") while building, np array after finalize
+        self._values: Dict[str, list] = {}       # key -> interned values, index 0 = absent
+        self._lookup: Dict[str, dict] = {}       # key -> {(type, value): code}, build time only
+        self._raw: Dict[str, tuple] = {}         # key -> (UTF-8 buffer, offsets, present mask)
+        self._keys: List[str] = []               # metadata keys in first-seen order
+
+    # --- Build ---
+    def add(self, ids: Iterable[str], documents: Iterable[str], metadatas: Iterable[Optional[dict]]):
+        for doc_id, document, meta in zip(ids, documents, metadatas):
+            self._ids += doc_id.encode("utf-8")
+            self._id_offsets.append(len(self._ids))
+            self._text += (document or "").encode("utf-8")
+            self._text_offsets.append(len(self._text))
+            for key, value in (meta or {}).items():
+                codes = self._codes.get(key)
+                if codes is None:
+                    # Key first seen now: earlier documents don't have it
+                    codes = self._codes[key] = array("I", bytes(4 * self.size))
+                    self._values[key] = [_MISSING]
+                    self._lookup[key] = {}
+                    self._keys.append(key)
+                lookup = self._lookup[key]
+                interned = (type(value), value)  # keep 1, 1.0 and True apart
+                code = lookup.get(interned)
+                if code is None:
+                    code = lookup[interned] = len(self._values[key])
+                    self._values[key].append(value)
+                codes.append(code)
+            self.size += 1
+            for key, codes in self._codes.items():
+                if len(codes) < self.size:
+                    codes.append(0)
+
+    def finalize(self) -> "DocStore":
+        """
+        Freezes buffers into immutable bytes / NumPy arrays with the narrowest code type.
+        """
+        self._text = bytes(self._text)
+        self._ids = bytes(self._ids)
+        self._text_offsets = np.frombuffer(self._text_offsets, dtype=np.uint64).copy()
+        self._id_offsets = np.frombuffer(self._id_offsets, dtype=np.uint64).copy()
+        for key, codes in list(self._codes.items()):
+            values = len(self._values[key])
+            if values - 1 > self.size // 2 and all(isinstance(v, str) for v in self._values[key][1:]):
+                # Interning buys nothing when almost every value is distinct
+                self._raw[key] = self._pack_strings(self._values.pop(key), codes)
+                del self._codes[key]
+                continue
+            dtype = np.uint8 if values <= 0xFF else np.uint16 if values <= 0xFFFF else np.uint32
+            self._codes[key] = np.frombuffer(codes, dtype=np.uint32).astype(dtype)
+        self._lookup = {}
+        return self
+
+    @staticmethod
+    def _pack_strings(values: list, codes) -> tuple:
+        buffer, offsets = bytearray(), array("Q", [0])
+        for code in codes:
+            if code:
+                buffer += values[code].encode("utf-8")
+            offsets.append(len(buffer))
+        present = np.frombuffer(codes, dtype=np.uint32) != 0
+        return bytes(buffer), np.frombuffer(offsets, dtype=np.uint64).copy(), present
+
+    # --- Read ---
+    def __len__(self) -> int:
+        return self.size
+
+    def id(self, i: int) -> str:
+        return self._ids[int(self._id_offsets[i]):int(self._id_offsets[i + 1])].decode("utf-8")
+
+    def content(self, i: int) -> str:
+        return self._text[int(self._text_offsets[i]):int(self._text_offsets[i + 1])].decode("utf-8")
+
+    def meta(self, i: int) -> dict:
+        meta = {}
+        for key in self._keys:
+            codes = self._codes.get(key)
+            if codes is not None:
+                if codes[i]:
+                    meta[key] = self._values[key][codes[i]]
+            elif self._raw[key][2][i]:
+                meta[key] = self._raw_value(key, i)
+        return meta
+
+    def _raw_value(self, key: str, i: int) -> str:
+        buffer, offsets, _ = self._raw[key]
+        return buffer[int(offsets[i]):int(offsets[i + 1])].decode("utf-8")
+
+    def get(self, i: int) -> dict:
+        return {"id": self.id(i), "content": self.content(i), "meta": self.meta(i)}
+
+    def id_mask(self, ids: set) -> np.ndarray:
+        """
+        Boolean mask of documents whose id is in `ids`.
+        """
+        return np.fromiter((self.id(i) in ids for i in range(self.size)), dtype=bool, count=self.size)
+
+    def updated(self, keep: np.ndarray, ids: List[str], documents: List[str],
+                metadatas: List[Optional[dict]], page_size: int = 1000) -> "DocStore":
+        """
+        New finalized store: the documents where `keep` is True, in order, then the given ones.
+        """
+        store = DocStore()
+        positions = np.flatnonzero(keep)
+        for start in range(0, len(positions), page_size):
+            page = [self.get(int(i)) for i in positions[start:start + page_size]]
+            store.add([d["id"] for d in page], [d["content"] for d in page], [d["meta"] for d in page])
+        store.add(ids, documents, metadatas)
+        return store.finalize()
+
+    def mask(self, where: Optional[dict]) -> np.ndarray:
+        """
+        Boolean mask of documents matching a Chroma-style `where` filter
+        (same semantics as job_fields.matches_where).
+        """
+        if not where:
+            return np.ones(self.size, dtype=bool)
+        result = np.ones(self.size, dtype=bool)
+        for key, cond in where.items():
+            if key == "$and":
+                for clause in cond:
+                    result &= self.mask(clause)
+            elif key == "$or":
+                any_match = np.zeros(self.size, dtype=bool)
+                for clause in cond:
+                    any_match |= self.mask(clause)
+                result &= any_match
+            else:
+                result &= self._field_mask(key, cond)
+        return result
+
+    def _field_mask(self, key: str, cond) -> np.ndarray:
+        if key in self._raw:
+            present = self._raw[key][2]
+            return np.array([
+                matches_where({key: self._raw_value(key, i)} if present[i] else {}, {key: cond})
+                for i in range(self.size)
+            ], dtype=bool)
+        codes = self._codes.get(key)
+        if codes is None:
+            return np.full(self.size, matches_where({}, {key: cond}), dtype=bool)
+        # Decide once per distinct value, then broadcast through the codes
+        allowed = np.array([
+            matches_where({} if value is _MISSING else {key: value}, {key: cond})
+            for value in self._values[key]
+        ], dtype=bool)
+        return allowed[codes]
+
+    def nbytes(self) -> int:
+        """
+        Approximate footprint: buffers, offsets and code arrays (interned values excluded).
+        """
+        total = len(self._text) + len(self._ids)
+        arrays = [self._text_offsets, self._id_offsets, *self._codes.values()]
+        for buffer, offsets, present in self._raw.values():
+            total += len(buffer)
+            arrays += [offsets, present]
+        for arr in arrays:
+            total += arr.nbytes if hasattr(arr, "nbytes") else arr.itemsize * len(arr)
+        return total
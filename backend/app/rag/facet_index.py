@@ -0,0 +1,254 @@
+# backend/app/rag/facet_index.py
+"""
+In-memory facet and range index over scraped job postings.
+
+Built at ingestion time from the raw `private_jobs` / `govt_jobs` records and
+persisted next to the vector DB. Structured questions ("govt jobs in Patiala
+for 12th pass under 30") are answered with bitmap intersections instead of an
+embedding search:
+
+- categorical fields (district, job_type) keep one packed bitmap per value
+- numeric fields (qualification_level, max_age, deadline) keep a sorted value
+  array plus the matching doc positions, so a range is two binary searches
+"""
+import os
+import pickle
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.rag.job_fields import (
+    entity_filters,
+    normalize_district,
+    normalize_job_type,
+    parse_date,
+    parse_max_age,
+    qualification_level,
+)
+
+FACET_INDEX_PATH = os.getenv("FACET_INDEX_PATH", "./data/facet_index.pkl")
+
+CATEGORICAL_FIELDS = ["district", "job_type"]
+NUMERIC_FIELDS = ["qualification_level", "max_age", "deadline"]
+
+# Fields kept per posting so matches can be rendered without touching Mongo/Chroma
+DISPLAY_FIELDS = ["name_of_post", "name_of_employer", "place_of_posting", "last_apply_date", "apply_link"]
+
+# Bits set per byte value, for counting packed bitmaps
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+_facet_index = None
+
+
+class FacetIndex:
+    def __init__(self):
+        self.size = 0
+        self.rows: List[Dict[str, str]] = []
+        self.categorical: Dict[str, Dict[str, np.ndarray]] = {f: {} for f in CATEGORICAL_FIELDS}
+        self.numeric: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    # ------------------ BUILD ------------------
+    @classmethod
+    def build(cls, records: Iterable[Tuple[str, dict, str]]) -> "FacetIndex":
+        """
+        Builds the index from (doc_id, raw_job, job_type) tuples.
+        """
+        rows = []
+        values = {f: [] for f in CATEGORICAL_FIELDS + NUMERIC_FIELDS}
+
+        for doc_id, job, job_type in records:
+            row = {"id": doc_id, "job_type": normalize_job_type(job_type)}
+            row.update({f: job.get(f) or "" for f in DISPLAY_FIELDS})
+            rows.append(row)
+
+            values["district"].append(normalize_district(job.get("place_of_posting")))
+            values["job_type"].append(row["job_type"])
+            values["qualification_level"].append(qualification_level(job.get("required_qualification")))
+            values["max_age"].append(parse_max_age(job.get("maximum_applicable_age")))
+            values["deadline"].append(parse_date(job.get("last_apply_date")))
+        return cls._from_columns(rows, values)
+
+    @classmethod
+    def _from_columns(cls, rows: List[Dict[str, str]], values: Dict[str, Iterable]) -> "FacetIndex":
+        index = cls()
+        index.rows = rows
+        index.size = len(rows)
+        for field in CATEGORICAL_FIELDS:
+            column = np.array(list(values[field]), dtype=object)
+            for value in set(column.tolist()):
+                index.categorical[field][value] = np.packbits(column == value)
+        for field in NUMERIC_FIELDS:
+            column = np.asarray(values[field], dtype=np.int32)
+            order = np.argsort(column, kind="stable").astype(np.int32)
+            index.numeric[field] = (column[order], order)
+        return index
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Per-posting field values, recovered from the bitmaps and sorted arrays.
+        """
+        columns = {}
+        for field in CATEGORICAL_FIELDS:
+            column = np.empty(self.size, dtype=object)
+            for value, postings in self.categorical[field].items():
+                column[np.unpackbits(postings, count=self.size).astype(bool)] = value
+            columns[field] = column
+        for field in NUMERIC_FIELDS:
+            sorted_values, order = self.numeric[field]
+            column = np.empty(self.size, dtype=np.int32)
+            column[order] = sorted_values
+            columns[field] = column
+        return columns
+
+    def updated(self, removed: Iterable[str], records: Iterable[Tuple[str, dict, str]]) -> "FacetIndex":
+        """
+        A new index without the `removed` ids, with `records` added (replacing
+        their current versions). Built from this index, without re-reading Mongo.
+        """
+        added = FacetIndex.build(records)
+        drop = set(removed) | {row["id"] for row in added.rows}
+        keep = np.fromiter((row["id"] not in drop for row in self.rows), dtype=bool, count=self.size)
+        old, new = self.columns(), added.columns()
+        rows = [row for row, kept in zip(self.rows, keep) if kept] + added.rows
+        values = {field: np.concatenate([old[field][keep], new[field]]) for field in old}
+        return FacetIndex._from_columns(rows, values)
+
+    # ------------------ PRIMITIVES ------------------
+    def _all(self) -> np.ndarray:
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    def _none(self) -> np.ndarray:
+        return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _equals(self, field: str, values: List[str]) -> np.ndarray:
+        bitmap = self._none()
+        for value in values:
+            postings = self.categorical[field].get(value)
+            if postings is not None:
+                bitmap |= postings
+        return bitmap
+
+    def _range(self, field: str, low: Optional[int] = None, high: Optional[int] = None) -> np.ndarray:
+        """
+        Bitmap of docs with low <= field <= high (either bound optional).
+        """
+        sorted_values, order = self.numeric[field]
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side="left")
+        end = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side="right")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[start:end]] = True
+        return np.packbits(mask)
+
+    def _unknown_or_at_least(self, field: str, low: int) -> np.ndarray:
+        # Unparseable values are stored as 0 and are kept rather than silently hidden
+        return self._range(field, high=0) | self._range(field, low=low)
+
+    # ------------------ QUERIES ------------------
+    def match(self, districts: Optional[List[str]] = None, job_type: str = "",
+              qualification_level: int = 0, age: int = 0,
+              deadline_from: Optional[int] = None) -> np.ndarray:
+        """
+        Conjunctive query; returns a packed bitmap of matching postings.
+
+        :param qualification_level: the user's level; keeps jobs requiring at most that
+        :param age: the user's age; keeps jobs whose max age is unknown or >= age
+        :param deadline_from: YYYYMMDD; keeps jobs without a deadline or still open
+        """
+        bitmap = self._all()
+        if districts:
+            bitmap &= self._equals("district", districts)
+        if job_type:
+            bitmap &= self._equals("job_type", [job_type])
+        if qualification_level:
+            bitmap &= self._range("qualification_level", high=qualification_level)
+        if age:
+            bitmap &= self._unknown_or_at_least("max_age", age)
+        if deadline_from:
+            bitmap &= self._unknown_or_at_least("deadline", deadline_from)
+        return bitmap
+
+    def count(self, **filters) -> int:
+        return int(_POPCOUNT[self.match(**filters)].sum())
+
+    def search(self, limit: int = 10, **filters) -> List[Dict[str, str]]:
+        """
+        Matching postings, soonest deadline first (postings without one last).
+        """
+        positions = np.flatnonzero(np.unpackbits(self.match(**filters), count=self.size))
+        if len(positions) == 0:
+            return []
+        sorted_values, order = self.numeric["deadline"]
+        deadlines = np.empty(self.size, dtype=np.int64)
+        deadlines[order] = sorted_values
+        keys = deadlines[positions]
+        keys = np.where(keys == 0, np.iinfo(np.int64).max, keys)
+        ranked = positions[np.argsort(keys, kind="stable")][:limit]
+        return [self.rows[i] for i in ranked]
+
+    def facet_counts(self, field: str, **filters) -> Dict[str, int]:
+        """
+        Per-value counts of a categorical field among the postings matching `filters`.
+        """
+        bitmap = self.match(**filters)
+        counts = {}
+        for value, postings in self.categorical[field].items():
+            n = int(_POPCOUNT[bitmap & postings].sum())
+            if n and value:
+                counts[value] = n
+        return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+    # ------------------ PERSISTENCE ------------------
+    def save(self, path: str = FACET_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str = FACET_INDEX_PATH) -> "FacetIndex":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def filters_from_entities(entities: Optional[List[Dict[str, str]]], open_only: bool = True) -> Dict[str, object]:
+    """
+    Maps extracted entities to FacetIndex.match keyword arguments.
+    """
+    filters = entity_filters(entities)
+    if open_only:
+        filters["deadline_from"] = int(date.today().strftime("%Y%m%d"))
+    return filters
+
+
+def read_facet_index(path: str = FACET_INDEX_PATH) -> Optional[FacetIndex]:
+    """
+    The persisted index, or None when there is none (not cached).
+    """
+    return FacetIndex.load(path) if os.path.exists(path) else None
+
+
+def load_facet_index(path: str = FACET_INDEX_PATH) -> Optional[FacetIndex]:
+    """
+    Loads the persisted index built by ingest_mongo into the module cache.
+    """
+    global _facet_index
+    if not os.path.exists(path):
+        print(f"⚠️ No facet index at {path}. Run ingest_mongo to build it.")
+        return None
+    start = time.perf_counter()
+    _facet_index = FacetIndex.load(path)
+    print(f"✅ Facet Index loaded with {_facet_index.size} postings in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return _facet_index
+
+
+def set_facet_index(index: FacetIndex):
+    """
+    Swaps in a rebuilt index (app/rag/sync.py).
+    """
+    global _facet_index
+    _facet_index = index
+
+
+def get_facet_index() -> Optional[FacetIndex]:
+    return _facet_index
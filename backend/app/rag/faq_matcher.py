@@ -0,0 +1,227 @@
+# backend/app/rag/faq_matcher.py
+"""
+FAQ short-circuit: curated question/answer pairs answered without retrieval or an LLM.
+
+The `faqs` collection is loaded once per process (FastAPI lifespan, after any
+fork) and two representations of every question are precomputed:
+
+- a keyword signature: normalized content words (stopwords dropped, plural "s"
+  folded). The score is the idf-weighted share of the query's words found in
+  the question and of the question's words found in the query, whichever is
+  lower, so a search naming only part of a question does not match it. Exact
+  and reworded-but-same-words questions match here in well under a millisecond.
+- a question embedding (the vector store's embedding function, L2-normalized).
+  A query whose keyword score misses the keyword threshold but reaches
+  FAQ_EMBEDDING_MIN_KEYWORD is embedded once and compared with all of them. The
+  query goes through vector_store.embed_query, so the embedding is cached and
+  reused by dense retrieval if the query falls through.
+
+Matching is blocking (it may run the embedding model): call it from the threadpool.
+
+A match at or above FAQ_KEYWORD_THRESHOLD / FAQ_EMBEDDING_THRESHOLD returns the
+stored answer; Punjabi answers come from the FAQ's `answer_pa` field or are
+translated once and cached. Thresholds can be changed at runtime from the
+admin endpoints (per process), and hits are counted per FAQ and in /metrics.
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core import config, metrics
+from app.nlu.gurmukhi import english_view, tokenize
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "to", "for", "of", "in", "on", "at", "by", "with",
+    "and", "or", "what", "which", "how", "when", "where", "who", "why", "do", "does", "did", "can",
+    "could", "should", "i", "me", "my", "we", "you", "your", "it", "this", "that", "there", "please",
+    "tell", "about", "any", "some", "will", "would", "need", "get",
+}
+
+_matcher: Optional["FaqMatcher"] = None
+_load_lock = threading.Lock()
+
+
+def signature(text: str) -> set:
+    words = set()
+    for token in tokenize(english_view(text or "")):
+        if token in STOPWORDS:
+            continue
+        words.add(token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token)
+    return words
+
+
+class FaqMatcher:
+    def __init__(self, faqs: List[dict], embed: Optional[Callable[[List[str]], list]] = None,
+                 embed_query: Optional[Callable[[str], list]] = None):
+        """
+        :param faqs: FAQ documents (question, answer, optional answer_pa)
+        :param embed: texts -> vectors; None disables the embedding tier
+        :param embed_query: text -> vector for queries (cached); defaults to `embed`
+        """
+        self.faqs = [
+            {"id": str(faq.get("_id", i)), "question": faq["question"], "answer": faq["answer"],
+             "answer_pa": faq.get("answer_pa"), "category": faq.get("category", "")}
+            for i, faq in enumerate(faqs) if faq.get("question") and faq.get("answer")
+        ]
+        self.keyword_threshold = config.FAQ_KEYWORD_THRESHOLD
+        self.embedding_threshold = config.FAQ_EMBEDDING_THRESHOLD
+        self.min_keyword_score = config.FAQ_EMBEDDING_MIN_KEYWORD
+        self.enabled = config.FAQ_MATCH_ENABLED
+        self.hits: Dict[str, int] = {}
+        self._translations: Dict[tuple, str] = {}
+        self._embed = embed
+        self._embed_query = embed_query or (lambda text: embed([text])[0])
+
+        self._signatures = [signature(faq["question"]) for faq in self.faqs]
+        # Smoothed idf over the FAQ questions; words no FAQ uses get the highest weight
+        n = len(self.faqs)
+        df: Dict[str, int] = {}
+        for words in self._signatures:
+            for word in words:
+                df[word] = df.get(word, 0) + 1
+        self._idf = {word: math.log((n + 1) / (count + 1)) + 1 for word, count in df.items()}
+        self._unseen_idf = math.log(n + 1) + 1
+        self._weights = [sum(self._idf[w] ** 2 for w in words) for words in self._signatures]
+
+        self._vectors = None
+        if embed is not None and self.faqs:
+            vectors = np.asarray(embed([faq["question"] for faq in self.faqs]), dtype=np.float32)
+            self._vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    # --- Matching ---
+    def keyword_scores(self, words: set) -> np.ndarray:
+        scores = np.zeros(len(self.faqs), dtype=np.float32)
+        if not words:
+            return scores
+        query_weight = sum(self._idf.get(w, self._unseen_idf) ** 2 for w in words)
+        for i, (faq_words, weight) in enumerate(zip(self._signatures, self._weights)):
+            shared = words & faq_words
+            if shared and weight:
+                # Both ways: a query that only names part of the question ("government
+                # jobs in Punjab" vs "How to apply for government jobs in Punjab?") is a search
+                covered = sum(self._idf[w] ** 2 for w in shared)
+                scores[i] = min(covered / query_weight, covered / weight)
+        return scores
+
+    def embedding_scores(self, text: str) -> Optional[np.ndarray]:
+        if self._vectors is None:
+            return None
+        vector = np.asarray(self._embed_query(english_view(text)), dtype=np.float32)
+        return self._vectors @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+
+    def match(self, text: str, record: bool = True) -> Optional[dict]:
+        """
+        Best FAQ for the query above a threshold: {"faq", "score", "method"}, or None.
+        """
+        if not self.enabled or not self.faqs:
+            return None
+        start = time.perf_counter()
+        result = None
+        words = signature(text)
+        keyword = self.keyword_scores(words)
+        best = int(np.argmax(keyword))
+        if keyword[best] >= self.keyword_threshold:
+            result = {"faq": self.faqs[best], "score": float(keyword[best]), "method": "keyword"}
+        elif keyword[best] >= self.min_keyword_score and self.embedding_threshold > 0:
+            # Only queries already close to some FAQ by their words pay for an embedding
+            dense = self.embedding_scores(text)
+            if dense is not None:
+                best = int(np.argmax(dense))
+                # Rewordings only: a query using a strict subset of the question's words
+                # misses what the question asks and scores high on embeddings anyway
+                if dense[best] >= self.embedding_threshold and not words < self._signatures[best]:
+                    result = {"faq": self.faqs[best], "score": float(dense[best]), "method": "embedding"}
+        if record:
+            metrics.observe("faq.match_ms", (time.perf_counter() - start) * 1000)
+            if result is None:
+                metrics.incr("faq.misses")
+            else:
+                metrics.incr(f"faq.hits.{result['method']}")
+                self.hits[result["faq"]["id"]] = self.hits.get(result["faq"]["id"], 0) + 1
+        return result
+
+    def explain(self, text: str, top: int = 3) -> List[dict]:
+        """
+        Top FAQs with both scores, for tuning thresholds.
+        """
+        keyword = self.keyword_scores(signature(text))
+        dense = self.embedding_scores(text)
+        order = np.argsort(-(dense if dense is not None else keyword))[:top]
+        return [{"id": self.faqs[i]["id"], "question": self.faqs[i]["question"],
+                 "keyword_score": round(float(keyword[i]), 4),
+                 "embedding_score": round(float(dense[i]), 4) if dense is not None else None}
+                for i in order]
+
+    # --- Answers ---
+    def answer(self, faq: dict, language: str, translate: Callable[[str, str, str], str]) -> str:
+        """
+        The stored answer in the user's language; translations are made once and kept.
+        `translate(text, source, target)` returns the text unchanged on failure.
+        """
+        if language != "pa":
+            return faq["answer"]
+        if faq.get("answer_pa"):
+            return faq["answer_pa"]
+        key = (faq["answer"], language)  # an edited answer is translated again
+        cached = self._translations.get(key)
+        if cached is not None:
+            metrics.incr("faq.translation_cached")
+            return cached
+        translated = translate(faq["answer"], "en-IN", "pa-IN")
+        if translated and translated != faq["answer"]:
+            self._translations[key] = translated
+        return translated or faq["answer"]
+
+    # --- Admin ---
+    def configure(self, keyword_threshold: float = None, embedding_threshold: float = None,
+                  enabled: bool = None, min_keyword_score: float = None):
+        if keyword_threshold is not None:
+            self.keyword_threshold = keyword_threshold
+        if embedding_threshold is not None:
+            self.embedding_threshold = embedding_threshold
+        if min_keyword_score is not None:
+            self.min_keyword_score = min_keyword_score
+        if enabled is not None:
+            self.enabled = enabled
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "faqs": len(self.faqs),
+            "embeddings": self._vectors is not None,
+            "keyword_threshold": self.keyword_threshold,
+            "embedding_threshold": self.embedding_threshold,
+            "min_keyword_score": self.min_keyword_score,
+            "cached_translations": len(self._translations),
+            "hits": {faq["question"]: self.hits.get(faq["id"], 0) for faq in self.faqs},
+        }
+
+
+def load_faq_matcher() -> FaqMatcher:
+    """
+    (Re)loads the FAQs from MongoDB and precomputes their signatures and embeddings.
+    Thresholds changed at runtime carry over to the new matcher.
+    """
+    global _matcher
+    from app.rag.retriever import faq_collection
+    embed, embed_query = None, None
+    if config.FAQ_EMBEDDING_THRESHOLD > 0:
+        from app.rag.vector_store import emb_fn, embed_query
+        embed = emb_fn
+    with _load_lock:
+        matcher = FaqMatcher(list(faq_collection.find()), embed, embed_query)
+        if _matcher is not None:
+            matcher.configure(_matcher.keyword_threshold, _matcher.embedding_threshold, _matcher.enabled,
+                              _matcher.min_keyword_score)
+            matcher.hits = dict(_matcher.hits)
+            matcher._translations = dict(_matcher._translations)
+        _matcher = matcher
+    metrics.set_gauge("faq.loaded", len(matcher.faqs))
+    return matcher
+
+
+def get_faq_matcher() -> Optional[FaqMatcher]:
+    return _matcher
@@ -0,0 +1,165 @@
+# backend/app/rag/fast_path.py
+"""
+LLM-free answer path for fully structured job searches.
+
+When every content word of a `search_job` query is accounted for by extracted
+entities ("govt clerk jobs in Patiala for 12th pass"), the answer is just a
+listing of matching postings. Those are read straight from the facet index and
+rendered from fixed English/Punjabi templates, skipping retrieval, the Sarvam
+completion and the back-translation.
+
+The same templates render the retrieval-only answer used when a request's
+deadline leaves no time for a completion (see app/core/deadline.py).
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.rag.context_packer import parse_fields
+from app.rag.facet_index import get_facet_index, filters_from_entities
+from app.nlu.gurmukhi import english_view
+
+MAX_LISTED = 5
+
+FILTER_LABELS = {"city", "qualification", "age", "job_type"}
+
+# Words that carry no constraint beyond what the entities already express
+FILLER_WORDS = {
+    "a", "an", "the", "any", "all", "some", "me", "my", "i", "am", "is", "are", "there",
+    "show", "find", "list", "get", "give", "search", "tell", "about", "please", "want", "need",
+    "looking", "available", "latest", "new", "current", "open", "jobs", "job", "vacancy",
+    "vacancies", "openings", "opening", "posts", "post", "recruitment", "hiring", "employment",
+    "work", "career", "position", "positions", "in", "at", "near", "for", "of", "with", "and",
+    "or", "to", "from", "pass", "passed", "holder", "holders", "qualified", "candidates",
+    "candidate", "freshers", "government", "govt", "sarkari", "private", "sector", "punjab",
+    "district", "city", "what", "which", "do", "you", "have",
+}
+
+# Age wording, only accounted for when an age entity was extracted: the extractor
+# only reads "NN years", so "under 30" alone would otherwise lose its limit
+AGE_WORDS = {"under", "below", "upto", "up", "age", "aged", "old", "year", "years", "yrs", "yr"}
+
+TEMPLATES = {
+    "en": {
+        "header": "I found {total} open jobs matching your search. Here are the top {shown}:",
+        "item": "{n}. {role}{employer}{location}{deadline}{link}",
+        "employer": " at {value}",
+        "location": ", {value}",
+        "deadline": ". Last date to apply: {value}",
+        "link": ". Apply: {value}",
+        "footer": "You can see all matching jobs on the PGRKAM portal (pgrkam.com).",
+        "retrieval_header": "Here are the closest matches I found:",
+        "retrieval_empty": "I couldn't find matching jobs right now. Please try again or visit the PGRKAM portal (pgrkam.com).",
+    },
+    "pa": {
+        "header": "ਤੁਹਾਡੀ ਖੋਜ ਨਾਲ ਮੇਲ ਖਾਂਦੀਆਂ {total} ਨੌਕਰੀਆਂ ਮਿਲੀਆਂ। ਇਹ ਰਹੀਆਂ ਪਹਿਲੀਆਂ {shown}:",
+        "item": "{n}. {role}{employer}{location}{deadline}{link}",
+        "employer": " - {value}",
+        "location": ", {value}",
+        "deadline": "। ਅਰਜ਼ੀ ਦੀ ਆਖਰੀ ਮਿਤੀ: {value}",
+        "link": "। ਅਰਜ਼ੀ ਦਿਓ: {value}",
+        "footer": "ਸਾਰੀਆਂ ਨੌਕਰੀਆਂ PGRKAM ਪੋਰਟਲ (pgrkam.com) 'ਤੇ ਵੇਖੋ।",
+        "retrieval_header": "ਇਹ ਸਭ ਤੋਂ ਨੇੜਲੇ ਨਤੀਜੇ ਮਿਲੇ ਹਨ:",
+        "retrieval_empty": "ਇਸ ਸਮੇਂ ਮੇਲ ਖਾਂਦੀਆਂ ਨੌਕਰੀਆਂ ਨਹੀਂ ਮਿਲੀਆਂ। ਕਿਰਪਾ ਕਰਕੇ ਦੁਬਾਰਾ ਕੋਸ਼ਿਸ਼ ਕਰੋ ਜਾਂ PGRKAM ਪੋਰਟਲ (pgrkam.com) ਵੇਖੋ।",
+    },
+}
+
+
+def is_structured_query(query: str, intent: str, entities: List[Dict[str, str]]) -> bool:
+    """
+    True when the query is a job search fully described by its entities.
+    """
+    if intent != "search_job" or not any(e.get("label") in FILTER_LABELS for e in entities):
+        return False
+
+    covered = set(FILLER_WORDS)
+    if any(e.get("label") == "age" for e in entities):
+        covered.update(AGE_WORDS)
+    for entity in entities:
+        covered.update(entity.get("text", "").lower().split())
+
+    # Punjabi words are glossed; any left in Gurmukhi are unknown content words.
+    # Numbers count too: one no entity consumed is a constraint the filters would drop
+    for word in re.findall(r"[a-z0-9.+]+|[\u0A00-\u0A7F]+", english_view(query).lower()):
+        word = word.strip(".")
+        if word and word not in covered and word.rstrip("s") not in covered:
+            return False
+    return True
+
+
+# Retrieved-document fields (ingest_mongo.format_job_to_text) -> listing row keys
+DOC_FIELDS = {
+    "ROLE": "name_of_post",
+    "ORGANIZATION": "name_of_employer",
+    "LOCATION": "place_of_posting",
+    "DEADLINE": "last_apply_date",
+    "APPLY LINK": "apply_link",
+}
+
+
+def render_job_listing(rows: List[Dict[str, str]], total: int, language: str = "en",
+                       header: Optional[str] = None) -> str:
+    """
+    Renders postings (role, employer, location, deadline, apply link) as plain text.
+    """
+    t = TEMPLATES["pa" if language == "pa" else "en"]
+
+    def part(key: str, value: Optional[str]) -> str:
+        return t[key].format(value=value) if value else ""
+
+    lines = [header or t["header"].format(total=total, shown=len(rows))]
+    for n, row in enumerate(rows, start=1):
+        lines.append(t["item"].format(
+            n=n,
+            role=row.get("name_of_post") or "Job",
+            employer=part("employer", row.get("name_of_employer")),
+            location=part("location", row.get("place_of_posting")),
+            deadline=part("deadline", row.get("last_apply_date")),
+            link=part("link", row.get("apply_link")),
+        ))
+    lines.append(t["footer"])
+    return "\n".join(lines)
+
+
+def try_fast_path(query: str, intent: str, entities: List[Dict[str, str]],
+                  language: str = "en") -> Optional[Tuple[str, List[Dict[str, str]]]]:
+    """
+    Returns (answer already in `language`, listed rows), or None to fall back to the LLM.
+    """
+    facet_index = get_facet_index()
+    if facet_index is None or not is_structured_query(query, intent, entities):
+        return None
+
+    filters = filters_from_entities(entities)
+    roles = [e["text"].lower() for e in entities if e.get("label") == "job_role"]
+    if roles:
+        # Roles are not a facet; narrow the structured matches by post name
+        rows = [
+            r for r in facet_index.search(limit=facet_index.size, **filters)
+            if any(role in (r.get("name_of_post") or "").lower() for role in roles)
+        ]
+        total = len(rows)
+    else:
+        rows = facet_index.search(limit=MAX_LISTED, **filters)
+        total = facet_index.count(**filters)
+
+    if not rows:
+        # Nothing matches exactly; let the LLM suggest alternatives from retrieval
+        return None
+    rows = rows[:MAX_LISTED]
+    return render_job_listing(rows, total, language), rows
+
+
+def render_retrieval_answer(docs: List[dict], language: str = "en") -> str:
+    """
+    Lists retrieved job documents with the fixed templates, without an LLM call
+    or translation (field values stay as stored).
+    """
+    t = TEMPLATES["pa" if language == "pa" else "en"]
+    rows = []
+    for doc in docs[:MAX_LISTED]:
+        row = {DOC_FIELDS[key]: value for key, value in parse_fields(doc.get("content", "")) if key in DOC_FIELDS}
+        if row.get("name_of_post"):
+            rows.append(row)
+    if not rows:
+        return t["retrieval_empty"]
+    return render_job_listing(rows, len(rows), language, header=t["retrieval_header"])
@@ -0,0 +1,394 @@
+# backend/app/rag/flat_index.py
+"""
+Quantized flat vector index: an alternative to Chroma for the job corpus.
+
+At a few thousand to a few hundred thousand postings a brute-force scan is
+fast enough, so there is no graph to build or keep in memory. Each collection
+is a directory of raw row-major arrays opened with mmap:
+
+    vectors.f16        float16, L2-normalized embeddings (used for rescoring)
+    codes_int8.i8      int8 codes, with one float32 scale per row in scales.f32
+                       (FLAT_INDEX_CODES=int8)
+    codes_binary.u8    sign bits packed 8 per byte      (FLAT_INDEX_CODES=binary)
+    records.json       dim, ids, documents and metadatas, one entry per row
+
+The array files are append-only: an upsert appends the new rows and a replaced
+or deleted row only becomes a null entry in records.json, which is rewritten
+last and is what commits a write. Once more than COMPACT_DEAD_FRACTION of the
+rows are dead, the arrays are rewritten with the live rows only. Batched
+ingestion therefore writes each vector once instead of rewriting the index
+per batch.
+
+A query scans the compact codes in chunks (one BLAS matrix-vector product per
+chunk for int8, XOR + popcount for binary), takes the best k * rescore_factor
+rows (4x more for binary) and reranks those with the float vectors. Pages are only read on access
+and shared between processes through the page cache.
+
+Readers never take the lock: all arrays and records of one version live in an
+immutable _Snapshot that writers replace with a single assignment.
+
+FlatCollection mirrors the subset of the Chroma collection API the app uses
+(upsert, get, query, count, delete), so vector_store.get_collection can return
+either one.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.rag.job_fields import matches_where
+
+SCAN_CHUNK = 4096
+# 1-bit codes rank far more coarsely than int8, so they need a longer shortlist
+BINARY_SHORTLIST_BOOST = 4
+# Rewrite the arrays once this share of the rows are replaced or deleted ones
+COMPACT_DEAD_FRACTION = 0.25
+# Number of set bits for every byte value, for Hamming distances on packed codes
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+VECTORS_FILE = "vectors.f16"
+SCALES_FILE = "scales.f32"
+CODES_FILES = {"int8": "codes_int8.i8", "binary": "codes_binary.u8"}
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric per-row int8 quantization: vectors ~= codes * scales[:, None].
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    return np.packbits(vectors > 0, axis=1)
+
+
+class _Snapshot:
+    """
+    One committed version of a collection. Never mutated after construction
+    (apart from the where-mask cache), so a reader holding it sees consistent
+    arrays and records while writers publish the next version.
+    """
+    __slots__ = ("dim", "ids", "documents", "metadatas", "positions", "live", "dead",
+                 "vectors", "codes", "scales", "where_masks")
+
+    def __init__(self, dim: int, ids: list, documents: list, metadatas: list,
+                 vectors: np.ndarray, codes: np.ndarray, scales: Optional[np.ndarray]):
+        self.dim = dim
+        self.ids, self.documents, self.metadatas = ids, documents, metadatas  # None for dead rows
+        self.positions = {doc_id: i for i, doc_id in enumerate(ids) if doc_id is not None}
+        self.live = np.fromiter((doc_id is not None for doc_id in ids), dtype=bool, count=len(ids))
+        self.dead = len(ids) - len(self.positions)
+        self.vectors, self.codes, self.scales = vectors, codes, scales
+        self.where_masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class FlatCollection:
+    def __init__(self, path: str, embedding_function, codes: str = "int8", rescore_factor: int = 4):
+        if codes not in CODES_FILES:
+            raise ValueError(f"Unknown flat index codes: {codes}")
+        self.path = path
+        self.embedding_function = embedding_function
+        self.codes_kind = codes
+        self.rescore_factor = max(1, rescore_factor)
+        self._lock = threading.Lock()  # serializes writers; readers use self._snapshot
+        os.makedirs(path, exist_ok=True)
+        self._snapshot = self._load()
+
+    # --- Persistence ---
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _code_width(self, dim: int) -> int:
+        return dim if self.codes_kind == "int8" else (dim + 7) // 8
+
+    def _map(self, name: str, dtype, rows: int, width: int = None) -> np.ndarray:
+        shape = (rows, width) if width is not None else (rows,)
+        if rows == 0:
+            return np.zeros(shape if width is not None else 0, dtype=dtype)
+        # Trailing rows of an append that was never committed are ignored
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def _rows_on_disk(self, name: str, dtype, width: int = 1) -> int:
+        try:
+            return os.path.getsize(self._file(name)) // (np.dtype(dtype).itemsize * width)
+        except OSError:
+            return 0
+
+    def _load(self) -> _Snapshot:
+        records_path = self._file("records.json")
+        if not os.path.exists(records_path):
+            return _Snapshot(0, [], [], [], np.zeros((0, 0), dtype=np.float16),
+                             np.zeros((0, 0), dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        with open(records_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        dim, rows = records["dim"], len(records["ids"])
+        vectors = self._map(VECTORS_FILE, np.float16, rows, dim)
+
+        code_dtype = np.int8 if self.codes_kind == "int8" else np.uint8
+        codes_file = CODES_FILES[self.codes_kind]
+        if self._rows_on_disk(codes_file, code_dtype, self._code_width(dim)) < rows:
+            # Codes of the other kind were built or appended; derive these from the float vectors
+            self._write_codes(np.asarray(vectors, dtype=np.float32))
+        codes = self._map(codes_file, code_dtype, rows, self._code_width(dim))
+        scales = np.array(self._map(SCALES_FILE, np.float32, rows)) if self.codes_kind == "int8" else None
+        return _Snapshot(dim, records["ids"], records["documents"], records["metadatas"], vectors, codes, scales)
+
+    def _write_file(self, name: str, array: np.ndarray):
+        tmp = self._file(f".{name}.tmp")
+        array.tofile(tmp)
+        os.replace(tmp, self._file(name))
+
+    def _append_file(self, name: str, array: np.ndarray, committed_rows: int):
+        row_bytes = array.dtype.itemsize * (array.shape[1] if array.ndim == 2 else 1)
+        with open(self._file(name), "ab") as f:
+            # Drop rows of an earlier append that crashed before records.json was written
+            f.truncate(committed_rows * row_bytes)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def _codes_of(self, vectors: np.ndarray):
+        if self.codes_kind == "int8":
+            return quantize_int8(vectors)
+        return quantize_binary(vectors), None
+
+    def _write_codes(self, vectors: np.ndarray):
+        codes, scales = self._codes_of(vectors)
+        if scales is not None:
+            self._write_file(SCALES_FILE, scales)
+        self._write_file(CODES_FILES[self.codes_kind], codes)
+
+    def _write_records(self, dim: int, ids: list, documents: list, metadatas: list):
+        tmp = self._file(".records.tmp.json")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "ids": ids, "documents": documents, "metadatas": metadatas}, f, ensure_ascii=False)
+        os.replace(tmp, self._file("records.json"))
+
+    def _save(self, ids: List[str], documents: List[str], metadatas: List[dict], vectors: np.ndarray):
+        """
+        Rewrites the whole collection with the given (live) rows.
+        """
+        # Arrays first, records last: records.json is what marks a complete index
+        for stale in CODES_FILES.values():
+            if os.path.exists(self._file(stale)):
+                os.remove(self._file(stale))
+        self._write_file(VECTORS_FILE, vectors.astype(np.float16))
+        self._write_codes(vectors)
+        self._write_records(vectors.shape[1], ids, documents, metadatas)
+
+    def _commit(self, snap: _Snapshot, ids: list, documents: list, metadatas: list,
+                appended: Optional[np.ndarray]):
+        """
+        Persists a new version derived from `snap` (dead rows set to None, new rows
+        appended) and publishes it. Compacts instead when too many rows are dead.
+        """
+        dim = appended.shape[1] if appended is not None and len(appended) else snap.dim
+        dead = sum(doc_id is None for doc_id in ids)
+        if ids and dead > COMPACT_DEAD_FRACTION * len(ids):
+            keep = [i for i, doc_id in enumerate(ids) if doc_id is not None]
+            old_keep = [i for i in keep if i < len(snap)]
+            vectors = np.asarray(snap.vectors[old_keep], dtype=np.float32).reshape(len(old_keep), dim)
+            if appended is not None and len(appended):
+                vectors = np.vstack([vectors, appended])
+            self._save([ids[i] for i in keep], [documents[i] for i in keep], [metadatas[i] for i in keep], vectors)
+        else:
+            if appended is not None and len(appended):
+                committed = len(snap)
+                self._append_file(VECTORS_FILE, appended.astype(np.float16), committed)
+                codes, scales = self._codes_of(appended)
+                self._append_file(CODES_FILES[self.codes_kind], codes, committed)
+                if scales is not None:
+                    self._append_file(SCALES_FILE, scales, committed)
+            self._write_records(dim, ids, documents, metadatas)
+        self._snapshot = self._load()
+
+    # --- Chroma-compatible API ---
+    def count(self) -> int:
+        return len(self._snapshot.positions)
+
+    def upsert(self, documents: List[str], metadatas: Optional[List[dict]] = None,
+               ids: Optional[List[str]] = None, embeddings=None):
+        """
+        Inserts or replaces documents; embeddings are computed if not given.
+        New versions are appended, the replaced rows are marked dead.
+        """
+        metadatas = metadatas or [{} for _ in documents]
+        new_vectors = _normalize(embeddings if embeddings is not None else self.embedding_function(documents))
+        batch = {}  # the last entry of an id in the batch wins
+        for doc_id, document, meta, vector in zip(ids, documents, metadatas, new_vectors):
+            batch[doc_id] = (document, meta, vector)
+        if not batch:
+            return
+        with self._lock:
+            snap = self._snapshot
+            if snap.dim and new_vectors.shape[1] != snap.dim:
+                raise ValueError(f"Embedding dimension {new_vectors.shape[1]} does not match the index ({snap.dim})")
+            all_ids, all_docs, all_metas = list(snap.ids), list(snap.documents), list(snap.metadatas)
+            for doc_id in batch:
+                i = snap.positions.get(doc_id)
+                if i is not None:
+                    all_ids[i] = all_docs[i] = all_metas[i] = None
+            for doc_id, (document, meta, _) in batch.items():
+                all_ids.append(doc_id)
+                all_docs.append(document)
+                all_metas.append(meta)
+            appended = np.asarray([vector for _, _, vector in batch.values()], dtype=np.float32)
+            self._commit(snap, all_ids, all_docs, all_metas, appended)
+
+    add = upsert
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[dict] = None):
+        with self._lock:
+            snap = self._snapshot
+            drop = {snap.positions[i] for i in ids or [] if i in snap.positions}
+            if where:
+                drop.update(np.flatnonzero(self._where_mask(snap, where)).tolist())
+            if not drop:
+                return
+            all_ids, all_docs, all_metas = list(snap.ids), list(snap.documents), list(snap.metadatas)
+            for i in drop:
+                all_ids[i] = all_docs[i] = all_metas[i] = None
+            self._commit(snap, all_ids, all_docs, all_metas, None)
+
+    def compact(self):
+        """
+        Rewrites the arrays with the live rows only.
+        """
+        with self._lock:
+            snap = self._snapshot
+            if not snap.dead:
+                return
+            keep = np.flatnonzero(snap.live).tolist()
+            self._save([snap.ids[i] for i in keep], [snap.documents[i] for i in keep],
+                       [snap.metadatas[i] for i in keep],
+                       np.asarray(snap.vectors[keep], dtype=np.float32).reshape(len(keep), snap.dim))
+            self._snapshot = self._load()
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[dict] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None, include: Optional[List[str]] = None) -> dict:
+        include = include or ["documents", "metadatas"]
+        snap = self._snapshot
+        if ids is not None:
+            rows = [snap.positions[i] for i in ids if i in snap.positions]
+        elif where:
+            rows = np.flatnonzero(self._where_mask(snap, where)).tolist()
+        else:
+            rows = np.flatnonzero(snap.live).tolist()
+        start = offset or 0
+        rows = rows[start:start + limit] if limit is not None else rows[start:]
+
+        result = {"ids": [snap.ids[i] for i in rows]}
+        result["documents"] = [snap.documents[i] for i in rows] if "documents" in include else None
+        result["metadatas"] = [snap.metadatas[i] for i in rows] if "metadatas" in include else None
+        result["embeddings"] = np.asarray(snap.vectors[rows], dtype=np.float32) if "embeddings" in include else None
+        return result
+
+    def query(self, query_texts: Optional[List[str]] = None, query_embeddings=None,
+              n_results: int = 10, where: Optional[dict] = None, include: Optional[List[str]] = None) -> dict:
+        """
+        Cosine search; returns Chroma-shaped nested lists (one list per query) and cosine distances.
+        """
+        include = include or ["documents", "metadatas", "distances"]
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = _normalize(query_embeddings)
+        snap = self._snapshot
+        if where:
+            mask = self._where_mask(snap, where)
+        else:
+            mask = snap.live if snap.dead else None
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for q in queries:
+            rows, similarities = self._search(snap, q, n_results, mask)
+            result["ids"].append([snap.ids[i] for i in rows])
+            result["documents"].append([snap.documents[i] for i in rows])
+            result["metadatas"].append([snap.metadatas[i] for i in rows])
+            result["distances"].append([float(1.0 - s) for s in similarities])
+        for key in ("documents", "metadatas", "distances"):
+            if key not in include:
+                result[key] = None
+        return result
+
+# --- Search ---
+    @staticmethod
+    def _where_mask(snap: _Snapshot, where: dict) -> np.ndarray:
+        key = json.dumps(where, sort_keys=True)
+        mask = snap.where_masks.get(key)
+        if mask is None:
+            mask = np.fromiter((m is not None and matches_where(m, where) for m in snap.metadatas),
+                               dtype=bool, count=len(snap.metadatas))
+            if len(snap.where_masks) > 256:
+                snap.where_masks.clear()
+            snap.where_masks[key] = mask
+        return mask
+
+    def approximate_scores(self, q: np.ndarray, snap: _Snapshot = None) -> np.ndarray:
+        """
+        Scores every row (dead ones included) from the quantized codes (higher is closer).
+        """
+        snap = snap or self._snapshot
+        n = len(snap)
+        scores = np.empty(n, dtype=np.float32)
+        if self.codes_kind == "int8":
+            for start in range(0, n, SCAN_CHUNK):
+                chunk = snap.codes[start:start + SCAN_CHUNK]
+                scores[start:start + len(chunk)] = chunk.astype(np.float32) @ q
+            scores *= snap.scales
+        else:
+            q_bits = quantize_binary(q[None, :])[0]
+            for start in range(0, n, SCAN_CHUNK):
+                chunk = snap.codes[start:start + SCAN_CHUNK]
+                hamming = _POPCOUNT[np.bitwise_xor(chunk, q_bits)].sum(axis=1, dtype=np.int32)
+                scores[start:start + len(chunk)] = -hamming
+        return scores
+
+    def _search(self, snap: _Snapshot, q: np.ndarray, k: int, mask: Optional[np.ndarray]):
+        n = len(snap)
+        if n == 0 or k <= 0:
+            return [], []
+        scores = self.approximate_scores(q, snap)
+        if mask is not None:
+            scores[~mask] = -np.inf
+            n = int(mask.sum())
+            if n == 0:
+                return [], []
+
+        factor = self.rescore_factor * (BINARY_SHORTLIST_BOOST if self.codes_kind == "binary" else 1)
+        shortlist = min(n, k * factor)
+        candidates = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        candidates = np.sort(candidates[np.isfinite(scores[candidates])])  # sorted rows read the memmap in order
+        exact = snap.vectors[candidates].astype(np.float32) @ q
+        order = np.argsort(-exact)[:k]
+        return candidates[order].tolist(), exact[order].tolist()
+
+
+_collections: Dict[str, FlatCollection] = {}
+
+
+def get_flat_collection(name: str, embedding_function, root: str, codes: str = "int8",
+                        rescore_factor: int = 4) -> FlatCollection:
+    """
+    One FlatCollection per name per process.
+    """
+    collection = _collections.get(name)
+    if collection is None:
+        collection = FlatCollection(os.path.join(root, name), embedding_function, codes, rescore_factor)
+        _collections[name] = collection
+    return collection
@@ -1,23 +1,15 @@
-import os
 import logging
+import time
 from typing import List, Dict, Optional
-from sarvamai import SarvamAI
-from dotenv import load_dotenv
-
-load_dotenv()
+from app.core.config import HISTORY_TURN_TOKENS, SARVAM_CHAT_TIMEOUT, DEADLINE_FULL_COMPLETION, DEGRADED_MAX_TOKENS
+from app.core import sarvam_client, tracing
+from app.core.deadline import Deadline
+from app.rag.context_packer import pack_context, truncate_to_tokens, count_message_tokens, tokenizer_name
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Load and validate API Key
-SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
-if not SARVAM_API_KEY:
-    logger.error("SARVAM_API_KEY environment variable is not set")
-    raise ValueError("SARVAM_API_KEY is required but not found in environment variables")
-
-client = SarvamAI(api_subscription_key=SARVAM_API_KEY)
-
-def generate_response(query: str, context_docs: List[dict], intent: str, language: str = "en", history: Optional[List[Dict[str, str]]] = None) -> str:
+def generate_response(query: str, context_docs: List[dict], intent: str, language: str = "en", history: Optional[List[Dict[str, str]]] = None, summary: Optional[str] = None, stats: Optional[dict] = None, deadline: Optional[Deadline] = None) -> str:
     """
     Generates a response using Sarvam AI (Llama-3/Sarvam models) with RAG context and Chat History.
     
@@ -25,10 +17,17 @@ def generate_response(query: str, context_docs: List[dict], intent: str, languag
     :param context_docs: Retrieved documents from Hybrid Search.
     :param intent: The detected intent (e.g., 'search_job').
     :param history: List of previous messages [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
+    :param summary: Compact summary of older turns from the session store.
+    :param stats: Optional dict filled with prompt/context token counts for this request
+        (and llm_failed when the completion call failed).
+    :param deadline: Request latency budget; caps the completion timeout and shortens it when time is short.
     """
     
-    # 1. Format the Retrieved Context (expanded for better context)
-    grounding_text = "\n".join([d['content'][:300] for d in context_docs[:3]])
+    # 1. Pack the Retrieved Context into the token budget (best fields of the best docs, no empty fields)
+    prompt_start = time.perf_counter()
+    grounding_text, context_stats = pack_context(context_docs[:3])
+    if stats is not None:
+        stats.update(context_stats)
     
     # 2. Define the System Persona with language support
     if language == "pa":
@@ -83,6 +82,10 @@ def generate_response(query: str, context_docs: List[dict], intent: str, languag
         else:
             system_instruction += " Provide information about how to apply for jobs, required documents, and application process."
 
+    # Older turns arrive as a bounded summary instead of raw messages
+    if summary:
+        system_instruction += f"\n\nEarlier in this conversation:\n{summary}"
+
     # 3. Handle simple queries early (skip AI call for efficiency)
     if intent in ["off_topic", "general_query"]:
         # Return early without calling Sarvam AI
@@ -106,7 +109,7 @@ def generate_response(query: str, context_docs: List[dict], intent: str, languag
                 if msg['role'] == expected_role:
                     messages.append({
                         "role": msg['role'],
-                        "content": msg['content'][:150]  # Truncate for token limit
+                        "content": truncate_to_tokens(msg['content'], HISTORY_TURN_TOKENS)
                     })
     
     # Add current query as final user message
@@ -120,18 +123,43 @@ Current Question: {query}"""
         messages.append({"role": "assistant", "content": "I'm ready to help."})
     
     messages.append({"role": "user", "content": current_query})
+    
+    prompt_tokens = count_message_tokens(messages)
+    logger.info(f"Prompt tokens: {prompt_tokens}")
+    tracing.record("prompt_build", prompt_start, prompt_tokens=prompt_tokens, context_docs=len(context_docs[:3]),
+                   messages=len(messages))
+    if stats is not None:
+        stats["prompt_tokens"] = prompt_tokens
+        stats["tokenizer"] = tokenizer_name()
+
+    # 4. Fit the completion into what is left of the request budget
+    max_tokens = 400  # Increased to prevent response breaking
+    timeout = None
+    if deadline is not None:
+        if deadline.remaining() < DEADLINE_FULL_COMPLETION:
+            deadline.degrade("short_completion")
+            max_tokens = DEGRADED_MAX_TOKENS
+        timeout = deadline.timeout(SARVAM_CHAT_TIMEOUT)
 
-    # 4. Call Sarvam AI API with increased token limit
+    # 5. Call Sarvam AI API (shared pooled client with deadline and circuit breaker)
     try:
-        response = client.chat.completions(
-            messages=messages,
-            temperature=0.1,
-            max_tokens=400  # Increased to prevent response breaking
-        )
+        with tracing.span("llm", prompt_tokens=prompt_tokens, max_tokens=max_tokens) as span:
+            response = sarvam_client.chat_completion(
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                timeout=timeout
+            )
+            span.set(completion_chars=len(response.choices[0].message.content or ""))
         return response.choices[0].message.content
         
     except Exception as e:
         logger.error(f"Sarvam AI API Error: {e}")
+        # Reported as a degradation so the apology is never cached or pre-warmed
+        if stats is not None:
+            stats["llm_failed"] = True
+        if deadline is not None:
+            deadline.degrade("llm_failed")
         if language == "pa":
             return "ਮਾਫ਼ ਕਰਨਾ, ਮੈਂ ਇਸ ਸਮੇਂ ਸਰਵਰ ਕਨੈਕਸ਼ਨ ਦੀ ਸਮੱਸਿਆ ਕਾਰਨ ਜਵਾਬ ਨਹੀਂ ਦੇ ਸਕਦਾ।"
         else:
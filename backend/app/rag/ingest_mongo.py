@@ -2,7 +2,11 @@
 import os
 from pymongo import MongoClient
 from dotenv import load_dotenv
-from app.rag.vector_store import add_documents
+from app.rag.vector_store import add_documents, get_collection
+from app.rag.job_fields import expiry_cutoff, is_expired, job_metadata
+from app.rag.facet_index import FacetIndex
+from app.rag.dedup import NearDuplicateIndex, set_dedup_index
+from app.core.config import DEDUP_ENABLED
 
 # Load environment variables
 load_dotenv()
@@ -38,6 +42,48 @@ def format_job_to_text(job: dict, job_type: str) -> str:
     
     return text
 
+# Mongo collection -> (format_job_to_text label, metadata type, source tag)
+JOB_TYPES = {
+    COLL_PRIVATE: ("Private Sector", "private", "pgrkam_private"),
+    COLL_GOVT: ("Government", "govt", "pgrkam_govt"),
+}
+
+def job_document(job: dict, collection: str, alternates: list = None):
+    """
+    (id, text chunk, metadata) of one job record, as indexed in ChromaDB and BM25.
+    `alternates` are posting_info dicts of near-duplicate postings folded into this one (app/rag/dedup.py).
+    """
+    label, job_type, source = JOB_TYPES[collection]
+    doc_id = str(job["_id"])
+    metadata = {
+        "source": source,
+        "job_id": doc_id,
+        "type": job_type,
+        **job_metadata(job, job_type)
+    }
+    text = format_job_to_text(job, label)
+    links = [f"{alt['apply_link']} ({alt['employer']})" for alt in alternates or [] if alt.get("apply_link")]
+    if links:
+        text += f"ALTERNATE APPLY LINKS: {' | '.join(links)}\n"
+        metadata["alternate_apply_links"] = " | ".join(alt["apply_link"] for alt in alternates if alt.get("apply_link"))
+        metadata["duplicates"] = len(alternates)
+    return doc_id, text, metadata
+
+def posting_info(job: dict, collection: str) -> dict:
+    """
+    What a canonical posting keeps of a near-duplicate folded into it.
+    """
+    return {
+        "collection": collection,
+        "apply_link": job.get("apply_link") or "",
+        "employer": job.get("name_of_employer") or "N/A",
+    }
+
+def _scrape_order(item):
+    job = item[1]
+    scraped_at = job.get("scraped_at")
+    return (scraped_at is not None, str(scraped_at or ""), str(job["_id"]))
+
 def ingest_from_mongo():
     print("🚀 Connecting to MongoDB to fetch jobs...")
     
@@ -48,44 +94,57 @@ def ingest_from_mongo():
         documents = []
         metadatas = []
         ids = []
+        facet_records = []
         
-        # 1. Fetch Private Jobs
-        private_cursor = db[COLL_PRIVATE].find()
-        count_p = 0
-        for job in private_cursor:
-            text_chunk = format_job_to_text(job, "Private Sector")
-            doc_id = str(job["_id"])
-            
-            documents.append(text_chunk)
-            metadatas.append({
-                "source": "pgrkam_private", 
-                "job_id": doc_id, 
-                "type": "private"
-            })
-            ids.append(doc_id)
-            count_p += 1
-            
-        # 2. Fetch Govt Jobs
-        govt_cursor = db[COLL_GOVT].find()
-        count_g = 0
-        for job in govt_cursor:
-            text_chunk = format_job_to_text(job, "Government")
+        # Jobs scraped after this point are picked up by the sync daemon (app/rag/sync.py)
+        from app.rag.sync import current_watermarks, save_state
+        watermarks = current_watermarks(db)
+        
+        # 1. Fetch Private and Govt Jobs (expired postings stay out of the indexes;
+        # with EXPIRY_MONGO_MODE=keep they are still in Mongo)
+        jobs = []
+        counts = {}
+        expired = 0
+        cutoff = expiry_cutoff()
+        for coll_name in (COLL_PRIVATE, COLL_GOVT):
+            job_type = JOB_TYPES[coll_name][1]
+            counts[job_type] = 0
+            for job in db[coll_name].find():
+                if is_expired(job, cutoff):
+                    expired += 1
+                    continue
+                jobs.append((coll_name, job))
+                counts[job_type] += 1
+        count_p, count_g = counts["private"], counts["govt"]
+        
+        # 2. Fold near-duplicate postings; the earliest scraped one is indexed
+        dedup = NearDuplicateIndex() if DEDUP_ENABLED else None
+        if dedup is not None:
+            jobs.sort(key=_scrape_order)
+            for coll_name, job in jobs:
+                doc_id, text_chunk, _ = job_document(job, coll_name)
+                dedup.assign(doc_id, text_chunk, posting_info(job, coll_name))
+        
+        folded = []
+        for coll_name, job in jobs:
             doc_id = str(job["_id"])
-            
+            if dedup is not None and dedup.is_duplicate(doc_id):
+                folded.append(doc_id)
+                continue
+            alternates = dedup.alternates(doc_id) if dedup is not None else None
+            doc_id, text_chunk, metadata = job_document(job, coll_name, alternates)
             documents.append(text_chunk)
-            metadatas.append({
-                "source": "pgrkam_govt", 
-                "job_id": doc_id,
-                "type": "govt"
-            })
+            metadatas.append(metadata)
             ids.append(doc_id)
-            count_g += 1
+            facet_records.append((doc_id, job, JOB_TYPES[coll_name][1]))
 
         if not documents:
             print("⚠️ No jobs found in MongoDB. Did you run the scraper?")
             return
 
-        print(f"📦 Found {count_p} Private and {count_g} Govt jobs.")
+        print(f"📦 Found {count_p} Private and {count_g} Govt jobs ({expired} expired skipped).")
+        if dedup is not None:
+            print(f"🧬 {len(folded)} near-duplicate postings folded into {dedup.stats()['clusters']} canonical ones.")
         
         # 3. Batch Insert into ChromaDB
         # We process in batches of 100 to be safe
@@ -98,7 +157,21 @@ def ingest_from_mongo():
             add_documents(batch_docs, batch_meta, batch_ids)
             print(f"   Processed batch {i} to {i+len(batch_docs)}")
 
+        # Duplicates indexed by an earlier run
+        for i in range(0, len(folded), BATCH_SIZE):
+            get_collection().delete(ids=folded[i:i+BATCH_SIZE])
+
         print("🎉 Successfully synced MongoDB to ChromaDB!")
+        
+        # 4. Build the facet/range index for structured lookups
+        facet_index = FacetIndex.build(facet_records)
+        facet_index.save()
+        print(f"🗂️ Facet index saved with {facet_index.size} postings.")
+        
+        if dedup is not None:
+            dedup.save()
+            set_dedup_index(dedup)
+        save_state({"watermarks": watermarks})
 
     except Exception as e:
         print(f"❌ Error during ingestion: {e}")
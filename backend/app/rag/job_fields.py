@@ -0,0 +1,262 @@
+# backend/app/rag/job_fields.py
+"""
+Normalization of raw scraped job fields into structured, filterable values.
+
+The same helpers are used at ingestion time (to write Chroma metadata) and at
+query time (to turn extracted entities into `where` filters), so both sides
+always agree on spelling and units.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core import config
+
+# Punjab districts (plus Chandigarh) with common alternate spellings
+PUNJAB_DISTRICTS = [
+    "amritsar", "barnala", "bathinda", "faridkot", "fatehgarh sahib", "fazilka",
+    "ferozepur", "gurdaspur", "hoshiarpur", "jalandhar", "kapurthala", "ludhiana",
+    "malerkotla", "mansa", "moga", "mohali", "muktsar", "nawanshahr", "pathankot",
+    "patiala", "rupnagar", "sangrur", "tarn taran", "chandigarh",
+]
+
+DISTRICT_ALIASES = {
+    "sas nagar": "mohali",
+    "sahibzada ajit singh nagar": "mohali",
+    "firozpur": "ferozepur",
+    "ferozpur": "ferozepur",
+    "bhatinda": "bathinda",
+    "ropar": "rupnagar",
+    "shahid bhagat singh nagar": "nawanshahr",
+    "sbs nagar": "nawanshahr",
+    "sri muktsar sahib": "muktsar",
+    "tarntaran": "tarn taran",
+    "jallandhar": "jalandhar",
+}
+
+# Ordinal education levels: a job requiring level N is open to anyone holding >= N
+QUALIFICATION_LEVELS = {
+    "8th": 1, "10th": 1, "matric": 1, "matriculation": 1,
+    "12th": 2, "+2": 2, "intermediate": 2, "senior secondary": 2,
+    "iti": 3, "diploma": 3, "polytechnic": 3,
+    "graduate": 4, "graduation": 4, "ba": 4, "b.a": 4, "bsc": 4, "b.sc": 4, "bcom": 4,
+    "b.com": 4, "bca": 4, "btech": 4, "b.tech": 4, "b.e": 4, "bba": 4, "bed": 4, "b.ed": 4,
+    "post graduate": 5, "postgraduate": 5, "ma": 5, "m.a": 5, "msc": 5, "m.sc": 5, "mcom": 5,
+    "m.com": 5, "mba": 5, "mca": 5, "mtech": 5, "m.tech": 5,
+    "phd": 6, "ph.d": 6,
+}
+
+DATE_FORMATS = [
+    "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d",
+    "%d %b %Y", "%d %B %Y", "%d-%b-%Y", "%b %d, %Y", "%B %d, %Y",
+]
+
+_QUAL_PATTERN = re.compile(
+    r"(?<![a-z0-9])(" + "|".join(
+        re.escape(k) for k in sorted(QUALIFICATION_LEVELS, key=len, reverse=True)
+    ) + r")(?![a-z0-9])"
+)
+
+
+def normalize_district(text: Optional[str]) -> str:
+    """
+    Maps a free-text place ('Distt. Ludhiana, Punjab') to a district name, or '' if unknown.
+    """
+    if not text:
+        return ""
+    text_lower = text.lower()
+    for alias, district in DISTRICT_ALIASES.items():
+        if alias in text_lower:
+            return district
+    for district in PUNJAB_DISTRICTS:
+        if district in text_lower:
+            return district
+    return ""
+
+
+def normalize_job_type(job_type: Optional[str]) -> str:
+    """
+    Returns 'govt' or 'private' ('' if unknown).
+    """
+    if not job_type:
+        return ""
+    text_lower = job_type.lower()
+    if any(word in text_lower for word in ["gov", "sarkari"]):
+        return "govt"
+    if "private" in text_lower:
+        return "private"
+    return ""
+
+
+def qualification_level(text: Optional[str], highest: bool = False) -> int:
+    """
+    Returns the ordinal education level mentioned in text (0 if none).
+
+    Job requirements like '10th/12th/Graduate' take the lowest level (the entry bar);
+    a user's own qualifications take the highest (`highest=True`).
+    """
+    if not text:
+        return 0
+    levels = [QUALIFICATION_LEVELS[m] for m in _QUAL_PATTERN.findall(text.lower())]
+    if not levels:
+        return 0
+    return max(levels) if highest else min(levels)
+
+
+def parse_max_age(text: Optional[str]) -> int:
+    """
+    Extracts the upper age limit from '37 Years' or '18-37' (0 if unknown).
+    """
+    if not text:
+        return 0
+    ages = [int(n) for n in re.findall(r"\d{2}", str(text)) if 14 <= int(n) <= 70]
+    return max(ages) if ages else 0
+
+
+def parse_deadline(text: Optional[str]) -> Optional[datetime]:
+    """
+    Parses a deadline ('15-01-2027', '15 Jan 2027', ...) into a datetime at midnight (None if unparseable).
+    """
+    if not text:
+        return None
+    if isinstance(text, datetime):
+        return datetime(text.year, text.month, text.day)
+    cleaned = re.sub(r"\s+", " ", str(text)).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def expiry_cutoff(today: datetime = None) -> datetime:
+    """
+    Postings whose last apply date is before this have expired.
+    """
+    today = today or datetime.now(timezone.utc).replace(tzinfo=None)
+    return datetime(today.year, today.month, today.day) - timedelta(days=config.EXPIRY_GRACE_DAYS)
+
+
+def is_expired(job: dict, cutoff: datetime) -> bool:
+    """
+    Whether a raw job record expired before `cutoff` (unknown deadlines never expire).
+    """
+    deadline = parse_deadline(job.get("deadline_at") or job.get("last_apply_date"))
+    return deadline is not None and deadline < cutoff
+
+
+def parse_date(text: Optional[str]) -> int:
+    """
+    Parses a deadline into a sortable YYYYMMDD integer (0 if unparseable).
+    """
+    deadline = parse_deadline(text)
+    return int(deadline.strftime("%Y%m%d")) if deadline else 0
+
+
+def job_metadata(job: dict, job_type: str) -> Dict[str, object]:
+    """
+    Structured, Chroma-safe metadata (no None values) for one scraped job record.
+    """
+    return {
+        "district": normalize_district(job.get("place_of_posting")),
+        "job_type": normalize_job_type(job_type),
+        "qualification_level": qualification_level(job.get("required_qualification")),
+        "max_age": parse_max_age(job.get("maximum_applicable_age")),
+        "deadline": parse_date(job.get("last_apply_date")),
+    }
+
+
+def entity_filters(entities: Optional[List[Dict[str, str]]]) -> Dict[str, object]:
+    """
+    Collects the structured constraints implied by extracted entities:
+    districts, job_type, the user's qualification level and age.
+    """
+    filters = {"districts": [], "job_type": "", "qualification_level": 0, "age": 0}
+    job_types = set()
+    for entity in entities or []:
+        label, text = entity.get("label"), entity.get("text", "")
+        if label == "city":
+            district = normalize_district(text)
+            if district and district not in filters["districts"]:
+                filters["districts"].append(district)
+        elif label == "job_type":
+            job_type = normalize_job_type(text)
+            if job_type:
+                job_types.add(job_type)
+        elif label == "qualification":
+            filters["qualification_level"] = max(filters["qualification_level"], qualification_level(text, highest=True))
+        elif label == "age":
+            try:
+                filters["age"] = int(text)
+            except ValueError:
+                pass
+    if len(job_types) == 1:
+        filters["job_type"] = job_types.pop()
+    return filters
+
+
+def build_where(entities: Optional[List[Dict[str, str]]]) -> Optional[dict]:
+    """
+    Converts extracted entities into a Chroma `where` filter (None when nothing applies).
+    """
+    filters = entity_filters(entities)
+    districts = filters["districts"]
+
+    clauses = []
+    if districts:
+        clauses.append({"district": {"$in": sorted(districts)}} if len(districts) > 1
+                       else {"district": districts[0]})
+    if filters["job_type"]:
+        clauses.append({"job_type": filters["job_type"]})
+    if filters["qualification_level"]:
+        # Unknown requirements are stored as 0, so they stay visible
+        clauses.append({"qualification_level": {"$lte": filters["qualification_level"]}})
+    if filters["age"]:
+        clauses.append({"$or": [{"max_age": {"$eq": 0}}, {"max_age": {"$gte": filters["age"]}}]})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_where(meta: Optional[dict], where: Optional[dict]) -> bool:
+    """
+    Evaluates a Chroma-style `where` filter against one metadata dict in Python,
+    so the in-memory sparse index applies exactly the same filter as the vector store.
+    """
+    if not where:
+        return True
+    meta = meta or {}
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(matches_where(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_where(meta, c) for c in cond):
+                return False
+        else:
+            value = meta.get(key)
+            if not isinstance(cond, dict):
+                cond = {"$eq": cond}
+            for op, target in cond.items():
+                if op == "$eq" and value != target:
+                    return False
+                if op == "$ne" and value == target:
+                    return False
+                if op == "$in" and value not in target:
+                    return False
+                if op == "$nin" and value in target:
+                    return False
+                if op in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is None:
+                        return False
+                    if op == "$gt" and not value > target:
+                        return False
+                    if op == "$gte" and not value >= target:
+                        return False
+                    if op == "$lt" and not value < target:
+                        return False
+                    if op == "$lte" and not value <= target:
+                        return False
+    return True
@@ -0,0 +1,173 @@
+# backend/app/rag/reranker.py
+"""
+Reranking between hybrid search and generation.
+
+Hybrid search returns a wide candidate set (RERANK_CANDIDATES); only the best
+RERANK_TOP_N go into the prompt. Every candidate gets a cheap feature score:
+the fused retrieval score plus agreement of its metadata with the extracted
+entities (district, job type, qualification, age), how fresh its deadline is,
+overlap with the asked-for role and a small per-source prior. If
+RERANKER_MODEL names a cross-encoder, the best candidates are additionally
+scored by it on CPU, in batches, until RERANK_MAX_MS is spent.
+"""
+import math
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from app.core import config, metrics
+from app.core.logger import logger
+from app.rag.context_packer import parse_fields
+from app.nlu.gurmukhi import english_view
+from app.rag.job_fields import entity_filters
+
+FEATURE_WEIGHTS = {
+    "retrieval": 1.0,
+    "district": 0.6,
+    "job_type": 0.4,
+    "qualification": 0.4,
+    "age": 0.3,
+    "freshness": 0.5,
+    "role": 0.6,
+    "source": 1.0,
+}
+SOURCE_PRIOR = {"pgrkam_govt": 0.05, "pgrkam_private": 0.0, "system": -1.0}
+CROSS_ENCODER_WEIGHT = 1.5
+SOON_DAYS = 3  # postings closing sooner than this are harder to act on
+
+_model = None
+_model_name = None
+
+
+def _get_model():
+    """
+    Loads the cross-encoder once (int8-quantized Linear layers if RERANKER_QUANTIZE);
+    None when no model is configured or it cannot be loaded.
+    """
+    global _model, _model_name
+    if _model_name is None:
+        _model_name = "features"
+        if config.RERANKER_MODEL:
+            try:
+                from sentence_transformers import CrossEncoder
+                model = CrossEncoder(config.RERANKER_MODEL, max_length=256, device="cpu")
+                if config.RERANKER_QUANTIZE:
+                    import torch
+                    model.model = torch.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8)
+                _model = model
+                _model_name = config.RERANKER_MODEL
+            except Exception as e:
+                logger.warning(f"Reranker {config.RERANKER_MODEL} unavailable, using feature scores only: {e}")
+    return _model
+
+
+def reranker_name() -> str:
+    _get_model()
+    return _model_name
+
+
+def _days_until(deadline: int) -> Optional[int]:
+    try:
+        return (datetime.strptime(str(deadline), "%Y%m%d").date() - date.today()).days
+    except ValueError:
+        return None
+
+
+def _match(expected, actual) -> float:
+    # 1 agrees, -1 contradicts, 0 when either side is unknown
+    if not expected or not actual:
+        return 0.0
+    return 1.0 if actual in expected else -1.0
+
+
+def feature_scores(doc: dict, filters: Dict[str, object], roles: List[str], max_retrieval: float) -> Dict[str, float]:
+    """
+    Per-feature scores in [-1, 1] for one candidate.
+    """
+    meta = doc.get("meta") or {}
+    features = {
+        "retrieval": doc.get("score", 0.0) / max_retrieval if max_retrieval else 0.0,
+        "district": _match(filters["districts"], meta.get("district")),
+        "job_type": _match([filters["job_type"]] if filters["job_type"] else [], meta.get("job_type")),
+        "qualification": 0.0,
+        "age": 0.0,
+        "freshness": 0.0,
+        "role": 0.0,
+        "source": SOURCE_PRIOR.get(meta.get("source") or doc.get("source"), 0.0),
+    }
+    required = meta.get("qualification_level") or 0
+    if filters["qualification_level"] and required:
+        features["qualification"] = 1.0 if required <= filters["qualification_level"] else -1.0
+    max_age = meta.get("max_age") or 0
+    if filters["age"] and max_age:
+        features["age"] = 1.0 if filters["age"] <= max_age else -1.0
+    if meta.get("deadline"):
+        days = _days_until(meta["deadline"])
+        if days is not None:
+            features["freshness"] = -1.0 if days < 0 else (0.5 if days < SOON_DAYS else 1.0)
+    if roles:
+        role_text = " ".join(v for k, v in parse_fields(doc.get("content", "")) if k == "ROLE").lower()
+        if role_text:
+            features["role"] = 1.0 if any(role in role_text for role in roles) else -0.5
+    return features
+
+
+def _doc_text(doc: dict) -> str:
+    # Cross-encoder input: the populated fields, in stored order
+    return "\n".join(f"{k}: {v}" if k else v for k, v in parse_fields(doc.get("content", "")))
+
+
+def _cross_encode(model, query: str, docs: List[dict], max_ms: float) -> List[Optional[float]]:
+    """
+    Scores docs (already ordered best-first) in batches until the latency cap is spent.
+    """
+    scores: List[Optional[float]] = [None] * len(docs)
+    start = time.perf_counter()
+    batch = max(1, config.RERANK_BATCH_SIZE)
+    for i in range(0, len(docs), batch):
+        if (time.perf_counter() - start) * 1000 >= max_ms:
+            metrics.incr("rerank.cross_encoder_capped")
+            break
+        logits = model.predict([(query, _doc_text(d)) for d in docs[i:i + batch]], batch_size=batch)
+        for j, logit in enumerate(logits):
+            scores[i + j] = 1.0 / (1.0 + math.exp(-float(logit)))
+    metrics.observe("rerank.cross_encoder_seconds", time.perf_counter() - start)
+    return scores
+
+
+def rerank(query: str, docs: List[dict], entities: Optional[List[Dict[str, str]]] = None,
+           top_n: Optional[int] = None, max_ms: Optional[float] = None) -> List[dict]:
+    """
+    Reorders retrieval candidates and returns the best `top_n`, each with a "rerank_score".
+
+    :param max_ms: cross-encoder budget for this call; 0 uses the feature scorer only
+    """
+    top_n = config.RERANK_TOP_N if top_n is None else top_n
+    max_ms = config.RERANK_MAX_MS if max_ms is None else max_ms
+    if len(docs) <= 1:
+        return docs[:top_n]
+
+    start = time.perf_counter()
+    filters = entity_filters(entities)
+    roles = [e["text"].lower() for e in entities or [] if e.get("label") == "job_role"]
+    max_retrieval = max(d.get("score", 0.0) for d in docs)
+
+    scored = []
+    for doc in docs:
+        features = feature_scores(doc, filters, roles, max_retrieval)
+        scored.append((sum(FEATURE_WEIGHTS[k] * v for k, v in features.items()), doc))
+    scored.sort(key=lambda x: x[0], reverse=True)
+
+    model = _get_model() if max_ms > 0 else None
+    if model is not None:
+        ce_scores = _cross_encode(model, english_view(query), [doc for _, doc in scored], max_ms)
+        floor = min((s for s in ce_scores if s is not None), default=0.0)
+        scored = [
+            (score + CROSS_ENCODER_WEIGHT * (ce if ce is not None else floor), doc)
+            for (score, doc), ce in zip(scored, ce_scores)
+        ]
+        scored.sort(key=lambda x: x[0], reverse=True)
+
+    results = [{**doc, "rerank_score": round(score, 4)} for score, doc in scored[:top_n]]
+    metrics.observe("rerank.seconds", time.perf_counter() - start)
+    return results
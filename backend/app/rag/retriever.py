@@ -1,6 +1,17 @@
 import numpy as np
-from rank_bm25 import BM25Okapi
-from app.rag.vector_store import get_collection
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+from app.rag.sparse_index import SparseIndex
+from app.rag.doc_store import DocStore
+from app.rag.content_index import format_content, get_content_index, load_content_index, loaded_version
+from app.rag.vector_store import embed_query, get_collection
+from app.core.config import CORPUS_PAGE_SIZE, EMBEDDING_MULTILINGUAL, PREFETCH_TTL_SECONDS
+from app.core import metrics, tracing
+from app.core.singleflight import normalize_text
+from app.nlu.gurmukhi import tokenize, query_terms, english_view
+from app.rag.job_fields import build_where
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
@@ -14,33 +25,69 @@ faq_collection = db["faqs"]
 schemes_collection = db["schemes"]
 training_collection = db["training_programs"]
 news_collection = db["news_updates"]
+CONTENT_COLLECTIONS = {
+    "faq": faq_collection,
+    "scheme": schemes_collection,
+    "training": training_collection,
+    "news": news_collection,
+}
+
+# Content searched next to the jobs, per intent (the classifier has no news
+# intent: "news" is an off-topic keyword)
+INTENT_CONTENT = {
+    "search_scheme": ("scheme", "training"),
+    "scheme_application": ("scheme", "training"),
+}
 
 # Global cache for BM25 index (so we don't rebuild it on every query)
 _bm25_index = None
-_bm25_corpus = []
-_doc_map = {} # Maps index to actual document data
+_doc_store = None # Compact id/content/meta columns, addressed by BM25 index position
+_index_generation = 0 # Bumped whenever the searchable corpus changes
+_index_swap_lock = threading.Lock() # Index and doc store are replaced together
+_index_update_lock = threading.Lock() # One apply_index_changes at a time
+
+# Results of searches run ahead of the request that needs them (speech partials)
+_prefetched = OrderedDict() # key -> (expires_at, results)
+_prefetch_lock = threading.Lock()
+PREFETCH_MAX_ENTRIES = 256
 
-def initialize_bm25():
+def iter_corpus_pages(page_size: int = None):
     """
-    Fetches all documents from ChromaDB and builds the BM25 Index in RAM.
+    Streams the job corpus from the vector store `page_size` documents at a time.
+    """
+    page_size = page_size or CORPUS_PAGE_SIZE
+    collection = get_collection()
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+        if page['ids']:
+            yield page
+        if len(page['ids']) < page_size:
+            break
+        offset += page_size
+
+def initialize_bm25(pages: Iterable[dict] = None):
+    """
+    Builds the BM25 Index in RAM from the ChromaDB documents, one page at a time.
     Also creates text index for FAQs.
+    `pages` (ids/documents/metadatas dicts) can be passed in when the corpus is read elsewhere.
+    Only the inverted index and a compact DocStore of id/content/meta are kept.
     """
-    global _bm25_index, _bm25_corpus, _doc_map
+    global _bm25_index, _doc_store, _index_generation
     
     # Initialize job data BM25
-    collection = get_collection()
-    results = collection.get() 
+    index = SparseIndex()
+    store = DocStore()
+    for page in (iter_corpus_pages() if pages is None else pages):
+        index.add(tokenize(doc) for doc in page['documents'])
+        store.add(page['ids'], page['documents'], page['metadatas'])
     
-    documents = results['documents']
-    ids = results['ids']
-    metadatas = results['metadatas']
-    
-    if documents:
-        tokenized_corpus = [doc.lower().split() for doc in documents]
-        _bm25_index = BM25Okapi(tokenized_corpus)
-        _bm25_corpus = documents
-        _doc_map = {i: {"id": ids[i], "content": documents[i], "meta": metadatas[i]} for i in range(len(documents))}
-        print(f"✅ BM25 Index built with {len(documents)} documents.")
+    if index.size:
+        index, store = index.finalize(), store.finalize()
+        with _index_swap_lock:
+            _bm25_index, _doc_store = index, store
+            _index_generation += 1
+        print(f"✅ BM25 Index built with {index.size} documents ({index.vocabulary_size()} terms).")
     
     # Create text indexes for all collections
     try:
@@ -52,6 +99,86 @@ def initialize_bm25():
     except Exception:
         pass
 
+def initialize_content_index():
+    """
+    Loads FAQs, schemes, training programs and news into memory for search_content.
+    """
+    content_index = load_content_index(db)
+    print(f"✅ Content index loaded (version {content_index.version}, {content_index.size()} documents).")
+
+def apply_index_changes(ids: list, documents: list, metadatas: list, deleted_ids: Iterable[str] = ()) -> int:
+    """
+    Upserts and deletes documents in the live keyword index (app/rag/sync.py).
+    Existing versions of the given ids and the deleted ids are dropped, the new
+    versions appended; the next index is built aside and swapped in atomically.
+    Returns the number of documents removed from the previous index.
+    """
+    global _bm25_index, _doc_store, _index_generation
+    changed = set(ids) | set(deleted_ids)
+    with _index_update_lock:
+        index, store = _bm25_index, _doc_store
+        if index is None:
+            if not ids:
+                return 0
+            index, store = SparseIndex(), DocStore()
+            index.add(tokenize(doc) for doc in documents)
+            store.add(ids, documents, metadatas)
+            index, store, removed = index.finalize(), store.finalize(), 0
+        else:
+            stale = store.id_mask(changed)
+            removed = int(stale.sum())
+            if not removed and not ids:
+                return 0
+            index = index.updated(~stale, (tokenize(doc) for doc in documents))
+            store = store.updated(~stale, ids, documents, metadatas)
+        with _index_swap_lock:
+            _bm25_index, _doc_store = index, store
+            _index_generation += 1
+    return removed
+
+def indexed_ids(where: dict = None) -> set:
+    """
+    Ids of the documents in the live keyword index (matching `where`, if given).
+    """
+    store = _doc_store
+    if store is None:
+        return set()
+    positions = np.flatnonzero(store.mask(where)) if where else range(len(store))
+    return {store.id(int(i)) for i in positions}
+
+def keyword_index_stats() -> dict:
+    """
+    Size of the live keyword index: documents, terms and approximate bytes (index + doc store).
+    """
+    with _index_swap_lock:
+        index, store = _bm25_index, _doc_store
+    if index is None:
+        return {"documents": 0, "terms": 0, "bytes": 0}
+    return {"documents": index.size, "terms": index.vocabulary_size(), "bytes": index.nbytes() + store.nbytes()}
+
+def indexed_documents(ids: Iterable[str]) -> dict:
+    """
+    id -> (content, meta) for those of `ids` present in the live keyword index.
+    """
+    store = _doc_store
+    if store is None:
+        return {}
+    found = (store.get(int(i)) for i in np.flatnonzero(store.id_mask(set(ids))))
+    return {doc["id"]: (doc["content"], doc["meta"]) for doc in found}
+
+def index_generation() -> tuple:
+    """
+    Version of the searchable corpus (job index, static content); cached or
+    coalesced answers keyed on it go stale on rebuild.
+    """
+    return (_index_generation, loaded_version())
+
+def check_content_version():
+    """
+    Starts the background content version check (content index and FAQ matcher) when one is due.
+    """
+    get_content_index(db)
+
 def reciprocal_rank_fusion(results_dict, k=60):
     """
     Reciprocal Rank Fusion (RRF) algorithm.
@@ -78,7 +205,17 @@ def reciprocal_rank_fusion(results_dict, k=60):
     return sorted_docs
 
 def search_content(query: str, content_type: str, collection, top_k: int = 2):
-    """Generic content search function"""
+    """
+    Generic content search function.
+    Served from the in-memory content index (app/rag/content_index.py);
+    the Mongo $text query on `collection` is the fallback while it is cold.
+    """
+    content_index = get_content_index(db)
+    if content_index is not None and content_index.has(content_type):
+        metrics.incr("content_index.served")
+        return content_index.search(query, content_type, top_k)
+    
+    metrics.incr("content_index.fallback")
     try:
         results = collection.find(
             {"$text": {"$search": query}},
@@ -87,18 +224,9 @@ def search_content(query: str, content_type: str, collection, top_k: int = 2):
         
         formatted_results = []
         for r in results:
-            if content_type == "faq":
-                content = f"Q: {r['question']}\nA: {r['answer']}"
-            elif content_type == "scheme":
-                content = f"Scheme: {r['name']}\nDescription: {r['description']}\nBenefits: {r['benefits']}\nEligibility: {r['eligibility']}"
-            elif content_type == "training":
-                content = f"Training: {r['name']}\nDescription: {r['description']}\nDuration: {r['duration']}\nEligibility: {r['eligibility']}"
-            elif content_type == "news":
-                content = f"News: {r['title']}\nContent: {r['content']}\nDate: {r['date']}"
-            
             formatted_results.append({
                 "id": str(r["_id"]),
-                "content": content,
+                "content": format_content(r, content_type),
                 "source": content_type,
                 "score": r.get("score", 0)
             })
@@ -106,26 +234,129 @@ def search_content(query: str, content_type: str, collection, top_k: int = 2):
     except Exception:
         return []
 
-def hybrid_search(query: str, top_k: int = 3):
+def content_search(query: str, intent: str, top_k: int = 2):
+    """
+    Best scheme/training documents for the intent, best first ([] for other intents).
+    """
+    hits = []
+    for content_type in INTENT_CONTENT.get(intent, ()):
+        hits.extend(search_content(query, content_type, CONTENT_COLLECTIONS[content_type], top_k))
+    hits.sort(key=lambda doc: doc.get("score", 0), reverse=True)
+    return hits[:top_k]
+
+def sparse_search(query: str, top_k: int = 10, where: dict = None):
+    """
+    BM25 keyword search over the in-memory job index.
+    Punjabi queries also search with the English glosses of their words.
+    Documents failing the `where` filter are dropped before ranking;
+    only the returned top_k are materialized from the doc store.
+    """
+    with _index_swap_lock:
+        index, store = _bm25_index, _doc_store
+    if index is None:
+        return []
+    
+    start = time.perf_counter()
+    scores = index.get_scores(query_terms(query))
+    if where:
+        scores = np.where(store.mask(where), scores, -np.inf)
+    
+    top_indices = np.argsort(scores)[::-1][:top_k]
+    hits = [store.get(i) for i in top_indices if scores[i] > 0]
+    tracing.record("bm25", start, hits=len(hits), filtered=bool(where))
+    return hits
+
+def dense_search(query: str, top_k: int = 10, where: dict = None):
+    """
+    Vector search in ChromaDB, with the `where` filter applied inside the query.
+    Punjabi queries are embedded as glossed English unless the embeddings are multilingual.
+    """
+    collection = get_collection()
+    query_embedding = embed_query(query if EMBEDDING_MULTILINGUAL else english_view(query))
+    with tracing.span("chroma_query", n_results=top_k, filtered=bool(where)) as span:
+        dense_results = collection.query(
+            query_embeddings=[query_embedding],
+            n_results=top_k,
+            where=where or None
+        )
+        span.set(hits=len(dense_results['ids'][0]))
+    metadatas = dense_results.get('metadatas') or [[]]
+    return [
+        {
+            "id": doc_id,
+            "content": dense_results['documents'][0][i],
+            "meta": metadatas[0][i] if i < len(metadatas[0]) else {}
+        }
+        for i, doc_id in enumerate(dense_results['ids'][0])
+    ]
+
+def _prefetch_key(query: str, top_k: int, entities: list, candidates: int):
+    entity_key = tuple(sorted((e.get("label", ""), e.get("text", "").lower()) for e in entities or []))
+    return (normalize_text(query), top_k, candidates, entity_key, _index_generation)
+
+def prefetch_search(query: str, top_k: int = 3, entities: list = None, candidates: int = None):
+    """
+    Runs hybrid_search now and keeps the results for PREFETCH_TTL_SECONDS, so the
+    identical hybrid_search call expected shortly (e.g. once a spoken utterance
+    ends on the words of its last partial transcript) is answered from memory, once.
+    """
+    results = hybrid_search(query, top_k, entities, candidates)
+    key = _prefetch_key(query, top_k, entities, candidates)
+    with _prefetch_lock:
+        _prefetched[key] = (time.monotonic() + PREFETCH_TTL_SECONDS, results)
+        _prefetched.move_to_end(key)
+        while len(_prefetched) > PREFETCH_MAX_ENTRIES:
+            _prefetched.popitem(last=False)
+    metrics.incr("prefetch.stored")
+
+def _take_prefetched(query: str, top_k: int, entities: list, candidates: int):
+    with _prefetch_lock:
+        if not _prefetched:
+            return None
+        entry = _prefetched.pop(_prefetch_key(query, top_k, entities, candidates), None)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+def hybrid_search(query: str, top_k: int = 3, entities: list = None, candidates: int = None):
     """
     Fast retrieval focusing on job data only.
+    Dense and BM25 results are fused with RRF. Extracted entities (city, job type,
+    qualification, age) become metadata filters applied before ranking; if the
+    filter leaves nothing, the search is retried unfiltered.
+    `candidates` overrides how many hits each retriever contributes to the fusion.
+    Results stored by prefetch_search for the same arguments are used instead.
     """
+    prefetched = _take_prefetched(query, top_k, entities, candidates)
+    if prefetched is not None:
+        metrics.incr("prefetch.hit")
+        return prefetched
+    
     all_results = []
+    where = build_where(entities)
     
     # Search job data only for speed
     try:
-        collection = get_collection()
-        dense_results = collection.query(
-            query_texts=[query],
-            n_results=top_k
-        )
+        candidates = max(top_k, candidates or 10)
+        dense_hits = dense_search(query, candidates, where)
+        sparse_hits = sparse_search(query, candidates, where)
+        if where and not dense_hits and not sparse_hits:
+            dense_hits = dense_search(query, candidates)
+            sparse_hits = sparse_search(query, candidates)
+        
+        results_dict, docs = {}, {}
+        for source, hits in (("dense", dense_hits), ("sparse", sparse_hits)):
+            for rank, hit in enumerate(hits, start=1):
+                results_dict.setdefault(hit["id"], {})[source] = {"rank": rank}
+                docs.setdefault(hit["id"], hit)
         
-        for i, doc_id in enumerate(dense_results['ids'][0]):
+        for doc_id, score in reciprocal_rank_fusion(results_dict):
             all_results.append({
                 "id": doc_id,
-                "content": dense_results['documents'][0][i],
+                "content": docs[doc_id]["content"],
+                "meta": docs[doc_id]["meta"],
                 "source": "jobs",
-                "score": 1.0 - (i * 0.1)
+                "score": score
             })
     except Exception:
         # Fallback with minimal content
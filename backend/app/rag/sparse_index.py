@@ -0,0 +1,118 @@
+# backend/app/rag/sparse_index.py
+"""
+Incrementally built BM25 (Okapi) keyword index.
+
+rank_bm25.BM25Okapi needs the whole tokenized corpus up front and keeps a
+term-frequency dict per document. This index is fed one page of documents at a
+time and keeps only an inverted index: for every term, the documents that
+contain it and how often, in compact arrays. Scores match BM25Okapi (same
+k1, b, epsilon and idf floor), computed by touching only the postings of the
+query terms.
+
+A finalized index is immutable; updated() derives the next version for a batch
+of upserts/deletes by filtering and renumbering the existing postings, so only
+the changed documents are tokenized again.
+"""
+import math
+from array import array
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class SparseIndex:
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.size = 0
+        self._doc_lengths = array("I")
+        # Build-time postings: term -> (doc indices, term frequencies)
+        self._building: Dict[str, tuple] = {}
+        # Query-time postings, filled by finalize()
+        self._postings: Dict[str, tuple] = {}
+        self._idf: Dict[str, float] = {}
+        self._norm = None
+        self._lengths = None
+
+    def add(self, tokenized_docs: Iterable[List[str]]):
+        """
+        Appends documents (already tokenized); their indices continue from the previous call.
+        """
+        for tokens in tokenized_docs:
+            doc = self.size
+            frequencies: Dict[str, int] = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            for token, tf in frequencies.items():
+                postings = self._building.get(token)
+                if postings is None:
+                    postings = self._building[token] = (array("I"), array("H"))
+                postings[0].append(doc)
+                postings[1].append(min(tf, 65535))
+            self._doc_lengths.append(len(tokens))
+            self.size += 1
+
+    def finalize(self) -> "SparseIndex":
+        """
+        Freezes postings into NumPy arrays and computes idf and length norms.
+        """
+        self._lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).copy()
+        lengths = self._lengths.astype(np.float32)
+        avgdl = float(lengths.mean()) if self.size else 0.0
+        # Per-document part of the BM25 denominator: k1 * (1 - b + b * dl / avgdl)
+        self._norm = (self.k1 * (1 - self.b + self.b * lengths / avgdl)).astype(np.float32) if avgdl else lengths
+
+        idf_sum, negative = 0.0, []
+        for term, (docs, tfs) in self._building.items():
+            idf = math.log(self.size - len(docs) + 0.5) - math.log(len(docs) + 0.5)
+            self._idf[term] = idf
+            idf_sum += idf
+            if idf < 0:
+                negative.append(term)
+            self._postings[term] = (np.frombuffer(docs, dtype=np.uint32), np.frombuffer(tfs, dtype=np.uint16))
+        if self._idf:
+            floor = self.epsilon * idf_sum / len(self._idf)
+            for term in negative:
+                self._idf[term] = floor
+        self._building = {}
+        self._doc_lengths = None
+        return self
+
+    def updated(self, keep: np.ndarray, tokenized_docs: Iterable[List[str]]) -> "SparseIndex":
+        """
+        New finalized index: the documents where `keep` is True, renumbered in
+        order, followed by `tokenized_docs`. Idf and length norms are recomputed.
+        """
+        new = SparseIndex(self.k1, self.b, self.epsilon)
+        keep = np.asarray(keep, dtype=bool)
+        renumber = (np.cumsum(keep) - 1).astype(np.uint32)
+        new._doc_lengths = array("I", self._lengths[keep].tobytes())
+        new.size = int(keep.sum())
+        for term, (docs, tfs) in self._postings.items():
+            kept = keep[docs]
+            if kept.any():
+                new._building[term] = (array("I", renumber[docs[kept]].tobytes()), array("H", tfs[kept].tobytes()))
+        new.add(tokenized_docs)
+        return new.finalize()
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float64)
+        for token in query_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            tf = tfs.astype(np.float32)
+            scores[docs] += self._idf[token] * (tf * (self.k1 + 1) / (tf + self._norm[docs]))
+        return scores
+
+    def vocabulary_size(self) -> int:
+        return len(self._postings) or len(self._building)
+
+    def nbytes(self) -> int:
+        """
+        Approximate footprint of a finalized index: posting arrays and per-document norms.
+        """
+        total = sum(docs.nbytes + tfs.nbytes for docs, tfs in self._postings.values())
+        return total + sum(a.nbytes for a in (self._norm, self._lengths) if a is not None)
@@ -0,0 +1,496 @@
+# backend/app/rag/sync.py
+"""
+Continuous sync from the Mongo job collections into the live search indexes.
+
+Newly scraped or re-scraped jobs become searchable without re-running
+ingest_mongo.py and restarting the API:
+
+- Source: each job collection is read past a (scraped_at, _id) watermark in
+  batches of SYNC_BATCH_SIZE. On a replica set a change stream is followed
+  instead (after a watermark catch-up), which also sees deletes. Polling
+  cannot, so every SYNC_RECONCILE_SECONDS the indexed ids are compared with
+  the ids in Mongo and the missing ones are deleted.
+- Sinks: documents are built exactly like ingest_mongo (job_document) and only
+  those whose text or metadata changed are written: upserted/deleted in Chroma,
+  applied to the in-process keyword index (retriever.apply_index_changes) and
+  to the facet index (FacetIndex.updated; Mongo is only scanned to rebuild it
+  when there is none yet). Postings whose deadline is before expiry_cutoff()
+  are deleted instead of indexed, as in ingest_mongo.
+- Near-duplicates: changes go through the persisted dedup index first, so a
+  re-posted vacancy only updates the alternate apply links of its canonical
+  posting instead of being indexed itself.
+
+Runs inside the API process (SYNC_ENABLED, started from the lifespan) or
+standalone. With several API workers, run one standalone writer and set
+SYNC_VECTOR_WRITES=false in the API so workers only update their in-memory indexes:
+
+    python -m app.rag.sync            # follow changes until interrupted
+    python -m app.rag.sync --once     # one catch-up pass
+
+Freshness lag (scraped_at -> searchable) is recorded as sync.freshness_lag_seconds.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core import config, metrics
+from app.core.logger import logger
+from app.rag import retriever
+from app.rag.dedup import get_dedup_index
+from app.rag.facet_index import FacetIndex, get_facet_index, read_facet_index, set_facet_index
+from app.rag.ingest_mongo import DB_NAME, JOB_TYPES, MONGODB_URI, job_document, posting_info
+from app.rag.job_fields import expiry_cutoff, is_expired
+from app.rag.vector_store import add_documents, get_collection
+
+VECTOR_BATCH_SIZE = 100
+
+_pinned_state: Optional[dict] = None
+_sync: Optional["JobSync"] = None
+
+
+# ------------------ STATE ------------------
+def load_state(path: str = None) -> dict:
+    path = path or config.SYNC_STATE_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault("watermarks", {})
+    return state
+
+
+def save_state(state: dict, path: str = None):
+    path = path or config.SYNC_STATE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def pin_state():
+    """
+    Reads the sync state before the keyword index is built from the vector store,
+    so in-process sync resumes from a watermark the index already covers.
+    """
+    global _pinned_state
+    _pinned_state = load_state()
+    get_dedup_index()
+
+
+def _watermark(job: dict) -> dict:
+    return {"scraped_at": job["scraped_at"].isoformat(), "id": str(job["_id"])}
+
+
+def _watermark_key(mark: Optional[dict]) -> Tuple[str, str]:
+    return (mark["scraped_at"], mark["id"]) if mark else ("", "")
+
+
+def _drop_expired(upserts: Dict[str, Tuple[str, dict]], deletes: set, cutoff: datetime):
+    """
+    Moves expired postings from `upserts` to `deletes`.
+    """
+    expired = {doc_id for doc_id, (_, job) in upserts.items() if is_expired(job, cutoff)}
+    if not expired:
+        return upserts, deletes
+    metrics.incr("sync.expired_skipped", len(expired))
+    return {doc_id: item for doc_id, item in upserts.items() if doc_id not in expired}, set(deletes) | expired
+
+
+def current_watermarks(db) -> Dict[str, dict]:
+    """
+    Watermark of the newest scraped job in each collection.
+    """
+    marks = {}
+    for coll_name in JOB_TYPES:
+        newest = db[coll_name].find_one({"scraped_at": {"$type": "date"}},
+                                        sort=[("scraped_at", -1), ("_id", -1)])
+        if newest:
+            marks[coll_name] = _watermark(newest)
+    return marks
+
+
+def freshness_lag(job: dict) -> Optional[float]:
+    scraped_at = job.get("scraped_at")
+    if not isinstance(scraped_at, datetime):
+        return None
+    if scraped_at.tzinfo is None:
+        scraped_at = scraped_at.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC
+    return max(0.0, (datetime.now(timezone.utc) - scraped_at).total_seconds())
+
+
+# ------------------ SYNC ------------------
+class JobSync:
+    def __init__(self, db=None, write_vectors: bool = True, update_keyword_index: bool = True,
+                 batch_size: int = None):
+        self.db = db if db is not None else MongoClient(MONGODB_URI)[DB_NAME]
+        self.write_vectors = write_vectors
+        self.update_keyword_index = update_keyword_index
+        self.batch_size = batch_size or config.SYNC_BATCH_SIZE
+        # The process that writes the vector store owns the persisted watermarks
+        self.persist = write_vectors
+        self.state = dict(_pinned_state) if _pinned_state is not None else load_state()
+        self.state["watermarks"] = dict(self.state.get("watermarks", {}))
+        self.use_change_streams = config.SYNC_CHANGE_STREAMS
+        self.mode = "poll"
+        self._last_reconcile = 0.0
+        self._facets: Optional[FacetIndex] = None  # when this process serves no facet index itself
+        self._apply_lock = threading.Lock()  # the sync loop and compaction (app/rag/compaction.py) both apply
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Source ---
+    def _poll_query(self, coll_name: str) -> dict:
+        mark = self.state["watermarks"].get(coll_name)
+        if not mark:
+            return {"scraped_at": {"$type": "date"}}
+        scraped_at, last_id = datetime.fromisoformat(mark["scraped_at"]), ObjectId(mark["id"])
+        return {"$or": [{"scraped_at": {"$gt": scraped_at}},
+                        {"scraped_at": scraped_at, "_id": {"$gt": last_id}}]}
+
+    def catch_up(self) -> dict:
+        """
+        Applies everything past the watermarks, one batch per collection at a time.
+        """
+        totals = {"upserted": 0, "unchanged": 0, "deleted": 0, "folded": 0}
+        for coll_name in JOB_TYPES:
+            while not self._stop.is_set():
+                jobs = list(self.db[coll_name].find(self._poll_query(coll_name))
+                            .sort([("scraped_at", ASCENDING), ("_id", ASCENDING)]).limit(self.batch_size))
+                if not jobs:
+                    break
+                stats = self.apply({str(job["_id"]): (coll_name, job) for job in jobs}, set())
+                for key in totals:
+                    totals[key] += stats[key]
+                if len(jobs) < self.batch_size:
+                    break
+        return totals
+
+    def reconcile(self) -> int:
+        """
+        Deletes indexed jobs that no longer exist in Mongo.
+        """
+        self._last_reconcile = time.monotonic()
+        live = set()
+        for coll_name in JOB_TYPES:
+            live.update(str(doc["_id"]) for doc in self.db[coll_name].find({}, {"_id": 1}))
+        indexed = self._vector_ids() if self.write_vectors else retriever.indexed_ids()
+        dedup = get_dedup_index()
+        if dedup is not None:
+            indexed |= dedup.known_ids()  # folded postings aren't indexed themselves
+        gone = indexed - live
+        if gone:
+            self.apply({}, gone)
+        return len(gone)
+
+    def _vector_ids(self) -> set:
+        collection, ids, offset = get_collection(), set(), 0
+        while True:
+            page = collection.get(limit=config.CORPUS_PAGE_SIZE, offset=offset, include=[])
+            ids.update(page["ids"])
+            if len(page["ids"]) < config.CORPUS_PAGE_SIZE:
+                return ids
+            offset += config.CORPUS_PAGE_SIZE
+
+    # --- Sinks ---
+    def _current(self, ids: list) -> Dict[str, tuple]:
+        """
+        id -> (text, metadata) as currently indexed, to skip unchanged re-scrapes.
+        """
+        if not ids:
+            return {}
+        if self.write_vectors:
+            found = get_collection().get(ids=ids, include=["documents", "metadatas"])
+            metadatas = found.get("metadatas") or [None] * len(found["ids"])
+            return {i: (d, m) for i, d, m in zip(found["ids"], found["documents"], metadatas)}
+        return retriever.indexed_documents(ids)
+
+    def _fetch(self, ids_by_coll: Dict[str, set]) -> Dict[str, Tuple[str, dict]]:
+        found = {}
+        for coll_name, ids in ids_by_coll.items():
+            object_ids = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+            for job in self.db[coll_name].find({"_id": {"$in": object_ids}}):
+                found[str(job["_id"])] = (coll_name, job)
+        return found
+
+    def _fold_duplicates(self, dedup, upserts: Dict[str, Tuple[str, dict]], deletes: set):
+        """
+        Updates the dedup index with a batch. Returns the canonical postings to
+        (re)index, including those whose alternates changed, the deletes, and the
+        postings folded into a canonical one (dropped in case they were indexed).
+        """
+        touched, orphans = set(), []
+        for doc_id in list(deletes) + list(upserts):
+            canonical, left = dedup.remove(doc_id)
+            if canonical is not None:
+                touched.add(canonical)
+            orphans.extend(i for i in left if i not in upserts and i not in deletes)
+        # Postings left without a canonical are re-assigned after the new versions
+        pending = dict(upserts)
+        orphan_ids: Dict[str, set] = {}
+        for doc_id in orphans:
+            coll_name = dedup.info.pop(doc_id, {}).get("collection")
+            if coll_name in JOB_TYPES:
+                orphan_ids.setdefault(coll_name, set()).add(doc_id)
+        fetched = self._fetch(orphan_ids)
+        pending.update((i, fetched[i]) for i in orphans if i in fetched)
+
+        folded = set()
+        for doc_id, (coll_name, job) in pending.items():
+            canonical = dedup.assign(doc_id, job_document(job, coll_name)[1], posting_info(job, coll_name))
+            if canonical != doc_id:
+                touched.add(canonical)
+                folded.add(doc_id)
+        touched = {i for i in touched if i in dedup.members}
+
+        canonicals = {i: job for i, job in pending.items() if not dedup.is_duplicate(i)}
+        missing: Dict[str, set] = {}
+        for doc_id in touched - set(canonicals):
+            missing.setdefault(dedup.info.get(doc_id, {}).get("collection"), set()).add(doc_id)
+        missing.pop(None, None)
+        canonicals.update(self._fetch(missing))
+        stats = dedup.stats()
+        metrics.set_gauge("dedup.duplicates", stats["duplicates"])
+        metrics.set_gauge("dedup.clusters", stats["clusters"])
+        return canonicals, set(deletes), folded
+
+    def apply(self, upserts: Dict[str, Tuple[str, dict]], deletes: set) -> dict:
+        """
+        :param upserts: id -> (collection name, job record)
+        :param deletes: ids to remove
+        """
+        with self._apply_lock:
+            return self._apply(upserts, deletes)
+
+    def _apply(self, upserts: Dict[str, Tuple[str, dict]], deletes: set) -> dict:
+        start = time.perf_counter()
+        received, folded = upserts, set()
+        # Expired postings are removed rather than (re)indexed, so a catch-up
+        # from an old watermark doesn't undo the last compaction
+        cutoff = expiry_cutoff()
+        upserts, deletes = _drop_expired(upserts, deletes, cutoff)
+        dedup = get_dedup_index()
+        if dedup is not None:
+            upserts, deletes, folded = self._fold_duplicates(dedup, upserts, deletes)
+            # Canonicals promoted from Mongo may have expired too
+            upserts, deletes = _drop_expired(upserts, deletes, cutoff)
+        documents = {doc_id: job_document(job, coll_name, dedup.alternates(doc_id) if dedup is not None else None)
+                     for doc_id, (coll_name, job) in upserts.items()}
+        current = self._current(list(documents))
+        changed = [doc for doc_id, doc in documents.items()
+                   if current.get(doc_id) != (doc[1], doc[2])]
+        ids = [doc[0] for doc in changed]
+        texts = [doc[1] for doc in changed]
+        metas = [doc[2] for doc in changed]
+        deletes = set(deletes) - set(documents)
+        dropped = deletes | folded
+
+        if self.write_vectors:
+            for i in range(0, len(ids), VECTOR_BATCH_SIZE):
+                add_documents(texts[i:i + VECTOR_BATCH_SIZE], metas[i:i + VECTOR_BATCH_SIZE], ids[i:i + VECTOR_BATCH_SIZE])
+            if dropped:
+                get_collection().delete(ids=sorted(dropped))
+        if self.update_keyword_index and (ids or dropped):
+            retriever.apply_index_changes(ids, texts, metas, dropped)
+        if ids or dropped:
+            self.update_facets(upserts, dropped)
+
+        # Watermarks only move forward, and only after the batch is applied
+        for coll_name, job in received.values():
+            if isinstance(job.get("scraped_at"), datetime):
+                mark = _watermark(job)
+                if _watermark_key(mark) > _watermark_key(self.state["watermarks"].get(coll_name)):
+                    self.state["watermarks"][coll_name] = mark
+        if self.persist:
+            save_state(self.state)
+            if dedup is not None:
+                dedup.save()
+
+        lags = [lag for lag in (freshness_lag(received[i][1]) for i in ids if i in received) if lag is not None]
+        for lag in lags:
+            metrics.observe("sync.freshness_lag_seconds", lag)
+        if lags:
+            metrics.set_gauge("sync.lag_seconds", max(lags))
+        metrics.incr("sync.batches")
+        metrics.incr("sync.upserted", len(ids))
+        metrics.incr("sync.unchanged", len(documents) - len(ids))
+        metrics.incr("sync.deleted", len(deletes))
+        metrics.incr("sync.folded", len(folded))
+        metrics.observe("sync.apply_seconds", time.perf_counter() - start)
+        metrics.set_gauge("sync.last_applied_unix", time.time())
+        if ids or dropped:
+            logger.info(f"Sync: {len(ids)} upserted, {len(documents) - len(ids)} unchanged, {len(deletes)} deleted, "
+                        f"{len(folded)} folded into near-duplicates")
+        return {"upserted": len(ids), "unchanged": len(documents) - len(ids), "deleted": len(deletes),
+                "folded": len(folded)}
+
+    def update_facets(self, upserts: Dict[str, Tuple[str, dict]], removed: set):
+        """
+        Applies a batch (canonical postings, dropped ids) to the facet index.
+        """
+        facet_index = get_facet_index() if self.update_keyword_index else self._facets
+        if facet_index is None:
+            facet_index = read_facet_index()
+        if facet_index is None:
+            self.refresh_facets()
+            return
+        records = [(doc_id, job, JOB_TYPES[coll_name][1]) for doc_id, (coll_name, job) in upserts.items()]
+        self._publish_facets(facet_index.updated(removed, records))
+
+    def refresh_facets(self):
+        """
+        Rebuilds the facet index from every job in Mongo.
+        """
+        records = []
+        dedup = get_dedup_index()
+        for coll_name, (_, job_type, _) in JOB_TYPES.items():
+            records.extend((str(job["_id"]), job, job_type) for job in self.db[coll_name].find()
+                           if dedup is None or not dedup.is_duplicate(str(job["_id"])))
+        self._publish_facets(FacetIndex.build(records))
+
+    def _publish_facets(self, facet_index: FacetIndex):
+        self._facets = facet_index
+        if self.write_vectors:
+            facet_index.save()
+        if self.update_keyword_index:
+            set_facet_index(facet_index)
+
+    # --- Loop ---
+    def run_once(self) -> dict:
+        stats = self.catch_up()
+        if time.monotonic() - self._last_reconcile >= config.SYNC_RECONCILE_SECONDS:
+            stats["deleted"] += self.reconcile()
+        return stats
+
+    def _follow_change_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(JOB_TYPES)},
+                                "operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        try:
+            stream = self.db.watch(pipeline, full_document="updateLookup",
+                                   resume_after=self.state.get("resume_token"), max_await_time_ms=1000)
+        except OperationFailure as e:
+            # Standalone servers have no oplog to stream from
+            logger.info(f"Sync: change streams unavailable ({e.code}), polling every {config.SYNC_INTERVAL_SECONDS}s")
+            self.use_change_streams = False
+            self.state.pop("resume_token", None)
+            return
+        with stream:
+            # The stream is open before catching up, so nothing falls in between
+            self.run_once()
+            self.mode = "change_stream"
+            upserts, deletes = {}, set()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is not None:
+                    doc_id = str(change["documentKey"]["_id"])
+                    job = change.get("fullDocument")
+                    if change["operationType"] == "delete" or job is None:
+                        upserts.pop(doc_id, None)
+                        deletes.add(doc_id)
+                    else:
+                        deletes.discard(doc_id)
+                        upserts[doc_id] = (change["ns"]["coll"], job)
+                # Flush when the stream goes idle or a batch is full
+                if (upserts or deletes) and (change is None or len(upserts) + len(deletes) >= self.batch_size):
+                    token = stream.resume_token
+                    self.apply(upserts, deletes)
+                    # Only past the batch once it is applied: a failed one is streamed again
+                    self.state["resume_token"] = token
+                    upserts, deletes = {}, set()
+                elif change is None and stream.resume_token:
+                    self.state["resume_token"] = stream.resume_token
+
+    def run(self):
+        if self.write_vectors:
+            for coll_name in JOB_TYPES:
+                try:
+                    self.db[coll_name].create_index([("scraped_at", ASCENDING), ("_id", ASCENDING)])
+                except PyMongoError:
+                    pass
+        while not self._stop.is_set():
+            try:
+                if self.use_change_streams:
+                    self._follow_change_stream()
+                if not self.use_change_streams:
+                    self.mode = "poll"
+                    self.run_once()
+            except PyMongoError as e:
+                metrics.incr("sync.errors")
+                logger.warning(f"Sync failed, retrying in {config.SYNC_INTERVAL_SECONDS}s: {e}")
+            except Exception as e:
+                metrics.incr("sync.errors")
+                logger.error(f"Sync failed, retrying in {config.SYNC_INTERVAL_SECONDS}s: {e}")
+            self._stop.wait(config.SYNC_INTERVAL_SECONDS)
+
+    def start(self) -> "JobSync":
+        self._thread = threading.Thread(target=self.run, name="job-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        return {"mode": self.mode, "watermarks": self.state["watermarks"],
+                "vector_writes": self.write_vectors}
+
+
+def start_sync() -> Optional[JobSync]:
+    """
+    Starts the in-process sync thread (FastAPI lifespan) when SYNC_ENABLED.
+    """
+    global _sync
+    if not config.SYNC_ENABLED or _sync is not None:
+        return _sync
+    _sync = JobSync(write_vectors=config.SYNC_VECTOR_WRITES).start()
+    print(f"🔄 Job sync started (every {config.SYNC_INTERVAL_SECONDS}s, vector writes "
+          f"{'on' if config.SYNC_VECTOR_WRITES else 'off'}).")
+    return _sync
+
+
+def stop_sync():
+    global _sync
+    if _sync is not None:
+        _sync.stop()
+        _sync = None
+
+
+def sync_status() -> Optional[dict]:
+    return _sync.status() if _sync is not None else None
+
+
+def running_sync() -> Optional[JobSync]:
+    return _sync
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Sync scraped jobs from MongoDB into ChromaDB")
+    parser.add_argument("--once", action="store_true", help="One catch-up pass (with delete reconciliation), then exit")
+    args = parser.parse_args()
+
+    sync = JobSync(update_keyword_index=False)
+    if args.once:
+        stats = sync.run_once()
+        print(f"🎉 Sync pass done: {stats}")
+        return
+    print(f"🔄 Syncing {', '.join(JOB_TYPES)} into ChromaDB (Ctrl+C to stop)...")
+    try:
+        sync.run()
+    except KeyboardInterrupt:
+        print("\n🛑 Sync stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,56 @@
 import chromadb
 from chromadb.utils import embedding_functions
 import os
+from app.core import config, tracing
+from app.core.caches import embedding_cache
+from app.rag.flat_index import get_flat_collection
 
 # Use a local folder for the database
 PERSIST_DIRECTORY = "./data/vector_db"
 
-# Initialize ChromaDB Client
-client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+# ChromaDB Client, created on first use in each process: its SQLite handles and
+# background threads must not be inherited by pre-forked workers (scripts/serve_prefork.py)
+client = None
+_client_pid = None
+
+def get_client():
+    global client, _client_pid
+    if client is None or _client_pid != os.getpid():
+        client = chromadb.PersistentClient(path=PERSIST_DIRECTORY)
+        _client_pid = os.getpid()
+    return client
 
 # Use BAAI/bge-m3 (or a smaller alternative like all-MiniLM-L6-v2 for speed)
-# We use the default SentenceTransformer embedding function provided by Chroma
-emb_fn = embedding_functions.DefaultEmbeddingFunction()
+# We use the default SentenceTransformer embedding function provided by Chroma,
+# unless EMBEDDING_MODEL names another (e.g. multilingual) sentence-transformers model
+if config.EMBEDDING_MODEL:
+    emb_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=config.EMBEDDING_MODEL)
+else:
+    emb_fn = embedding_functions.DefaultEmbeddingFunction()
+
+def embed_query(text: str) -> list:
+    """
+    Query embedding, cached per text (hot queries are pre-warmed from scripts/build_hot_queries.py).
+    """
+    vector = embedding_cache.get(text)
+    if vector is None:
+        with tracing.span("embedding", chars=len(text)):
+            vector = [float(x) for x in emb_fn([text])[0]]
+        embedding_cache.put(text, vector)
+    return vector
 
 def get_collection():
     """
     Returns the ChromaDB collection for PGRKAM documents.
     Creates it if it doesn't exist.
+    With VECTOR_BACKEND=flat, returns the quantized flat index with the same API.
     """
-    return client.get_or_create_collection(
+    if config.VECTOR_BACKEND == "flat":
+        return get_flat_collection(
+            "pgrkam_docs", emb_fn, config.FLAT_INDEX_DIR,
+            codes=config.FLAT_INDEX_CODES, rescore_factor=config.FLAT_RESCORE_FACTOR
+        )
+    return get_client().get_or_create_collection(
         name="pgrkam_docs",
         embedding_function=emb_fn,
         metadata={"hnsw:space": "cosine"} # Cosine similarity is best for text
@@ -26,9 +59,10 @@ def get_collection():
 def add_documents(documents: list, metadatas: list, ids: list):
     """
     Adds text chunks to the vector database.
+    Upserts, so re-running ingestion refreshes metadata of existing jobs.
     """
     collection = get_collection()
-    collection.add(
+    collection.upsert(
         documents=documents,
         metadatas=metadatas,
         ids=ids
@@ -0,0 +1,263 @@
+# backend/app/services/session_store.py
+"""
+Server-side conversation memory keyed by session_id.
+
+Each session keeps the last few turns verbatim plus a rolling, bounded summary
+of everything older (what the user asked about and the details they gave, e.g.
+city or qualification). Clients only need to send their session_id, and the
+prompt built from a session stays the same size however long it runs.
+
+Sessions live in an LRU dict capped by count and approximate bytes, expire
+after a TTL, and can optionally be written through to MongoDB so they survive
+restarts and are shared between workers. With the Mongo backend every read goes
+to Mongo (the local copy is only used while it is unreachable), and a turn is
+saved with a compare-and-set on the session's version: when another worker
+wrote in between, the turn is re-applied to its version instead of overwriting it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+
+from app.core import config
+from app.core.logger import logger, MONGODB_URI, DB_NAME
+
+SESSION_COLLECTION = "chat_sessions"
+SAVE_ATTEMPTS = 5  # compare-and-set retries when workers append to one session at once
+
+# Entity labels remembered across the whole session
+PROFILE_LABELS = ["city", "qualification", "age", "job_role", "job_type"]
+
+# Rough per-session overhead (dicts, lists, floats) on top of the text itself
+_BASE_SESSION_BYTES = 600
+_NOTE_CHARS = 90
+
+
+def _new_session() -> dict:
+    return {"notes": [], "turns": [], "profile": {}, "version": 0, "updated_at": time.time(),
+            "bytes": _BASE_SESSION_BYTES}
+
+
+def _estimate_bytes(session: dict) -> int:
+    size = _BASE_SESSION_BYTES
+    size += sum(len(n.encode("utf-8")) + 60 for n in session["notes"])
+    size += sum(len(m["content"].encode("utf-8")) + 120 for m in session["turns"])
+    size += sum(len(k) + len(v) + 100 for k, v in session["profile"].items())
+    return size
+
+
+def render_summary(session: dict) -> str:
+    """
+    Compact summary: remembered details first, then one line per older question.
+    """
+    lines = []
+    if session["profile"]:
+        lines.append("Known details: " + "; ".join(f"{k}={v}" for k, v in session["profile"].items()))
+    lines.extend(session["notes"])
+    return "\n".join(lines)
+
+
+class MongoSessionBackend:
+    """
+    Write-through persistence in the `chat_sessions` collection, expired by a TTL index.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=2000)
+        self.collection = client[DB_NAME][SESSION_COLLECTION]
+        self.ttl_seconds = ttl_seconds
+        try:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.error(f"Could not create session TTL index: {e}")
+
+    def load(self, session_id: str) -> Optional[dict]:
+        doc = self.collection.find_one({"_id": session_id})
+        if not doc:
+            return None
+        session = _new_session()
+        session.update({k: doc.get(k, session[k]) for k in ("notes", "turns", "profile", "version")})
+        return session
+
+    def save(self, session_id: str, snapshot: dict, version: int) -> bool:
+        """
+        Writes the snapshot if the stored session is still at `version` (0: not stored yet)
+        and bumps it; False when another worker saved in between.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        update = {"$set": {**snapshot, "expires_at": expires_at}, "$inc": {"version": 1}}
+        try:
+            if version:
+                result = self.collection.update_one({"_id": session_id, "version": version}, update)
+            else:
+                result = self.collection.update_one({"_id": session_id, "version": {"$exists": False}},
+                                                    update, upsert=True)
+        except DuplicateKeyError:
+            return False  # created by another worker
+        return result.matched_count > 0 or result.upserted_id is not None
+
+    def delete(self, session_id: str):
+        self.collection.delete_one({"_id": session_id})
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: int = 3600, recent_turns: int = 2, summary_chars: int = 600,
+                 backend: Optional[MongoSessionBackend] = None):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.recent_messages = recent_turns * 2
+        self.summary_chars = summary_chars
+        self.backend = backend
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    # ------------------ INTERNALS ------------------
+    def _expired(self, session: dict) -> bool:
+        return time.time() - session["updated_at"] > self.ttl_seconds
+
+    def _put(self, session_id: str, session: dict):
+        self._drop(session_id)
+        session["bytes"] = _estimate_bytes(session)
+        self._sessions[session_id] = session
+        self._bytes += session["bytes"]
+
+    def _drop(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session["bytes"]
+
+    def _enforce_limits(self):
+        # Oldest first: expired sessions, then LRU until under both caps
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            over_cap = len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+            if not (over_cap or self._expired(oldest)):
+                break
+            self._drop(oldest_id)
+            self.evictions += 1
+
+    def _load(self, session_id: str) -> Optional[dict]:
+        if self.backend is not None:
+            # Other workers write to the same sessions: the backend has the current version
+            try:
+                session = self.backend.load(session_id)
+            except Exception as e:
+                logger.error(f"Session backend load failed: {e}")
+            else:
+                if session is None:
+                    self._drop(session_id)
+                    return None
+                self._put(session_id, session)
+                return session
+        session = self._sessions.get(session_id)
+        if session is not None and self._expired(session):
+            self._drop(session_id)
+            session = None
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _fold(self, session: dict, user_turn: dict):
+        """
+        Replaces a turn that left the verbatim window with a one-line note.
+        """
+        snippet = " ".join(user_turn["content"].split())[:_NOTE_CHARS]
+        intent = user_turn.get("intent")
+        session["notes"].append(f"Asked about {intent.replace('_', ' ')}: {snippet}" if intent else f"Asked: {snippet}")
+        while session["notes"] and len(render_summary(session)) > self.summary_chars:
+            session["notes"].pop(0)
+
+    # ------------------ PUBLIC API ------------------
+    def get_context(self, session_id: str) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Returns (summary, recent turns as role/content dicts); empty for unknown sessions.
+        """
+        with self._lock:
+            session = self._load(session_id)
+            if session is None:
+                return "", []
+            turns = [{"role": m["role"], "content": m["content"]} for m in session["turns"]]
+            return render_summary(session), turns
+
+    def append_turn(self, session_id: str, user_msg: str, assistant_msg: str,
+                    intent: Optional[str] = None, entities: Optional[List[Dict[str, str]]] = None):
+        """
+        Records one exchange, folding turns older than the verbatim window into the summary.
+        """
+        for _ in range(SAVE_ATTEMPTS):
+            with self._lock:
+                session = self._load(session_id) or _new_session()
+
+                for entity in entities or []:
+                    if entity.get("label") in PROFILE_LABELS:
+                        session["profile"][entity["label"]] = entity["text"]
+
+                turns = session["turns"]
+                turns.append({"role": "user", "content": user_msg, "intent": intent or ""})
+                turns.append({"role": "assistant", "content": assistant_msg})
+                while len(turns) > self.recent_messages:
+                    user_turn = turns.pop(0)
+                    turns.pop(0)
+                    self._fold(session, user_turn)
+
+                session["updated_at"] = time.time()
+                self._put(session_id, session)
+                self._enforce_limits()
+                if self.backend is None:
+                    return
+                version = session["version"]
+                snapshot = {k: session[k] for k in ("notes", "turns", "profile")}
+
+            try:
+                saved = self.backend.save(session_id, snapshot, version)
+            except Exception as e:
+                logger.error(f"Session backend save failed: {e}")
+                return
+            if saved:
+                session["version"] = version + 1
+                return
+            # Another worker appended first: reload its version and apply this turn on top
+            with self._lock:
+                self._drop(session_id)
+        logger.error(f"Session {session_id}: gave up saving a turn after {SAVE_ATTEMPTS} conflicting writes")
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._drop(session_id)
+        if self.backend is not None:
+            try:
+                self.backend.delete(session_id)
+            except Exception as e:
+                logger.error(f"Session backend delete failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "bytes": self._bytes, "evictions": self.evictions}
+
+
+def _create_store() -> SessionStore:
+    backend = None
+    if config.SESSION_BACKEND == "mongo":
+        try:
+            backend = MongoSessionBackend(config.SESSION_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"Mongo session backend unavailable, using memory only: {e}")
+    return SessionStore(
+        max_sessions=config.SESSION_MAX_SESSIONS,
+        max_bytes=config.SESSION_MAX_BYTES,
+        ttl_seconds=config.SESSION_TTL_SECONDS,
+        recent_turns=config.SESSION_RECENT_TURNS,
+        summary_chars=config.SESSION_SUMMARY_CHARS,
+        backend=backend,
+    )
+
+
+session_store = _create_store()
@@ -0,0 +1,285 @@
+# backend/app/services/speech.py
+"""
+Streaming speech input.
+
+Clients stream 16-bit mono PCM frames over a WebSocket (see /speech/stream in
+app/api/endpoints.py). Each connection has a SpeechSession:
+
+- Audio goes into a fixed-size RingBuffer (SPEECH_MAX_UTTERANCE_SECONDS), never
+  a growing whole-file buffer; older audio is overwritten.
+- An energy detector finds the start of an utterance and its end
+  (SPEECH_END_SILENCE_MS of silence).
+- While the user is still speaking, the audio so far is transcribed every
+  SPEECH_PARTIAL_INTERVAL_MS by a pluggable SpeechBackend. Each new partial
+  transcript is pushed to the client and handed to a prefetch callback that
+  runs NLU and retrieval ahead of time (retriever.prefetch_search), at most one
+  at a time per connection; partials arriving meanwhile are not prefetched.
+- At the end of speech, a partial that already covers all voiced audio is
+  reused as the final transcript, saving the final speech-to-text call.
+  Otherwise the utterance is transcribed once more. The final text is then
+  answered through the regular chat pipeline.
+
+The time from the last voiced frame to the answer is recorded as
+speech.end_to_answer_seconds in GET /metrics.
+"""
+import asyncio
+import io
+import time
+import wave
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core import config, metrics
+from app.core.logger import logger
+
+BYTES_PER_SAMPLE = 2  # 16-bit PCM
+
+
+class RingBuffer:
+    """
+    Fixed-capacity byte ring addressed by absolute stream position
+    (bytes written since the connection opened).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self.total = 0
+
+    def write(self, data: bytes):
+        start = self.total
+        self.total += len(data)
+        if len(data) > self.capacity:
+            # Only the newest `capacity` bytes survive anyway
+            start += len(data) - self.capacity
+            data = data[-self.capacity:]
+        i = start % self.capacity
+        first = min(len(data), self.capacity - i)
+        self._buf[i:i + first] = data[:first]
+        self._buf[:len(data) - first] = data[first:]
+
+    def read(self, start: int, end: Optional[int] = None) -> bytes:
+        """
+        Bytes between absolute positions [start, end), clipped to what is still buffered.
+        """
+        end = self.total if end is None else min(end, self.total)
+        start = max(start, self.total - self.capacity)
+        if start >= end:
+            return b""
+        i, length = start % self.capacity, end - start
+        if i + length <= self.capacity:
+            return bytes(self._buf[i:i + length])
+        return bytes(self._buf[i:]) + bytes(self._buf[:length - (self.capacity - i)])
+
+
+def frame_rms(frame: bytes) -> float:
+    samples = np.frombuffer(frame[:len(frame) - len(frame) % BYTES_PER_SAMPLE], dtype="<i2")
+    if not samples.size:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(BYTES_PER_SAMPLE)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return out.getvalue()
+
+
+# ------------------ BACKENDS ------------------
+class SpeechBackend:
+    """
+    Speech-to-text for one utterance's audio so far. Blocking; called from the threadpool.
+    """
+    name = "base"
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str, script: str = "") -> str:
+        raise NotImplementedError
+
+
+class SarvamSpeechBackend(SpeechBackend):
+    name = "sarvam"
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str, script: str = "") -> str:
+        from app.core import sarvam_client
+        return sarvam_client.transcribe(pcm_to_wav(pcm, sample_rate), "pa-IN" if language == "pa" else "en-IN")
+
+
+class ScriptedSpeechBackend(SpeechBackend):
+    """
+    Local stand-in for tests and load runs: the client sends the words it is
+    "saying" as `script`, and they are revealed in proportion to the audio
+    received (SCRIPT_WORDS_PER_SECOND), like a recognizer catching up.
+    """
+    name = "scripted"
+    SCRIPT_WORDS_PER_SECOND = 2.5
+
+    def transcribe(self, pcm: bytes, sample_rate: int, language: str, script: str = "") -> str:
+        words = script.split()
+        seconds = len(pcm) / (BYTES_PER_SAMPLE * sample_rate)
+        return " ".join(words[:int(seconds * self.SCRIPT_WORDS_PER_SECOND) + 1]) if words else ""
+
+
+SPEECH_BACKENDS = {b.name: b for b in (SarvamSpeechBackend, ScriptedSpeechBackend)}
+
+
+def get_speech_backend(name: Optional[str] = None) -> SpeechBackend:
+    name = name or config.SPEECH_BACKEND
+    if name not in SPEECH_BACKENDS:
+        raise ValueError(f"Unknown SPEECH_BACKEND '{name}' (expected one of {sorted(SPEECH_BACKENDS)})")
+    return SPEECH_BACKENDS[name]()
+
+
+# ------------------ SESSION ------------------
+class _Utterance:
+    def __init__(self, number: int, start: int):
+        self.number = number
+        self.start = start             # ring position incl. pre-roll
+        self.last_voiced = start       # ring position after the last voiced frame
+        self.last_voiced_at = time.monotonic()
+        self.silence = 0               # bytes of silence since then
+        self.next_partial = start
+        self.partial_text: Optional[str] = None
+        self.partial_end = -1          # audio covered by partial_text
+        self.partial_task: Optional[asyncio.Task] = None
+        self.partial_task_end = -1
+        self.prefetched = set()
+
+
+class SpeechSession:
+    def __init__(self, backend: SpeechBackend,
+                 send: Callable[[dict], Awaitable[None]],
+                 answer: Callable[[str, str], Awaitable[dict]],
+                 prefetch: Optional[Callable[[str, str], Awaitable[None]]] = None,
+                 language: str = "en", sample_rate: Optional[int] = None, script: str = ""):
+        self.backend = backend
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self.answer = answer
+        self.prefetch = prefetch
+        self.language = language
+        self.sample_rate = sample_rate or config.SPEECH_SAMPLE_RATE
+        self.script = script
+        bytes_per_ms = self.sample_rate * BYTES_PER_SAMPLE / 1000
+        self.ring = RingBuffer(int(config.SPEECH_MAX_UTTERANCE_SECONDS * 1000 * bytes_per_ms))
+        self.pre_roll = int(config.SPEECH_PRE_ROLL_MS * bytes_per_ms)
+        self.end_silence = int(config.SPEECH_END_SILENCE_MS * bytes_per_ms)
+        self.partial_every = int(config.SPEECH_PARTIAL_INTERVAL_MS * bytes_per_ms)
+        self.utterance: Optional[_Utterance] = None
+        self._count = 0
+        self._tasks = set()
+        self._prefetch_task: Optional[asyncio.Task] = None
+
+    async def send(self, message: dict):
+        async with self._send_lock:
+            await self._send(message)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def feed(self, frame: bytes):
+        """
+        One chunk of PCM audio from the client.
+        """
+        self.ring.write(frame)
+        voiced = frame_rms(frame) >= config.SPEECH_VAD_THRESHOLD
+        u = self.utterance
+        if u is None:
+            if not voiced:
+                return
+            self._count += 1
+            u = self.utterance = _Utterance(self._count, max(0, self.ring.total - len(frame) - self.pre_roll))
+            u.next_partial = self.ring.total + self.partial_every
+            metrics.incr("speech.utterances")
+            await self.send({"type": "speech_start", "utterance": u.number})
+
+        if voiced:
+            u.last_voiced, u.last_voiced_at, u.silence = self.ring.total, time.monotonic(), 0
+        else:
+            u.silence += len(frame)
+            if u.silence >= self.end_silence:
+                self.end_utterance()
+                return
+
+        if (self.ring.total >= u.next_partial and u.last_voiced > u.partial_task_end
+                and (u.partial_task is None or u.partial_task.done())):
+            u.next_partial = self.ring.total + self.partial_every
+            u.partial_task_end = u.last_voiced
+            u.partial_task = self._spawn(self._partial(u, u.last_voiced))
+
+    def end_utterance(self):
+        """
+        Ends the current utterance (silence detected, or the client released push-to-talk).
+        """
+        u, self.utterance = self.utterance, None
+        if u is not None:
+            self._spawn(self._finish(u))
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def _transcribe(self, u: _Utterance, end: int) -> Optional[str]:
+        pcm = self.ring.read(u.start, end)
+        start = time.perf_counter()
+        try:
+            text = await run_in_threadpool(self.backend.transcribe, pcm, self.sample_rate, self.language, self.script)
+        except Exception as e:
+            metrics.incr("speech.stt.errors")
+            logger.warning(f"Speech-to-text failed: {e}")
+            return None
+        metrics.observe("speech.stt.seconds", time.perf_counter() - start)
+        return (text or "").strip()
+
+    async def _partial(self, u: _Utterance, end: int):
+        text = await self._transcribe(u, end)
+        if text is None or end <= u.partial_end:
+            return
+        changed = text != u.partial_text
+        u.partial_text, u.partial_end = text, end
+        if not changed:
+            return
+        metrics.incr("speech.partials")
+        await self.send({"type": "partial", "utterance": u.number, "text": text})
+        key = " ".join(text.lower().split())
+        if self.prefetch and len(key.split()) >= config.SPEECH_PREFETCH_MIN_WORDS and key not in u.prefetched:
+            if self._prefetch_task is not None and not self._prefetch_task.done():
+                metrics.incr("speech.prefetch_skipped")
+                return
+            # Warm NLU + retrieval for this text; the final answer reuses it if the words don't change
+            u.prefetched.add(key)
+            self._prefetch_task = self._spawn(self.prefetch(text, self.language))
+
+    async def _finish(self, u: _Utterance):
+        try:
+            if u.partial_task is not None and not u.partial_task.done() and u.partial_task_end >= u.last_voiced:
+                await u.partial_task
+            if u.partial_text and u.partial_end >= u.last_voiced:
+                # Nothing was said after the last partial: it is the final transcript
+                text = u.partial_text
+                metrics.incr("speech.final_from_partial")
+            else:
+                text = await self._transcribe(u, u.last_voiced)
+            metrics.observe("speech.final_seconds", time.monotonic() - u.last_voiced_at)
+            await self.send({"type": "final", "utterance": u.number, "text": text or ""})
+            if not text:
+                return
+
+            response = await self.answer(text, self.language)
+            elapsed = time.monotonic() - u.last_voiced_at
+            metrics.observe("speech.end_to_answer_seconds", elapsed)
+            await self.send({"type": "answer", "utterance": u.number,
+                             "end_to_answer_ms": round(elapsed * 1000), **response})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Speech utterance failed: {e}")
+            await self.send({"type": "error", "utterance": u.number, "detail": str(e)})
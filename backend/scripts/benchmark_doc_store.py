@@ -0,0 +1,138 @@
+# backend/scripts/benchmark_doc_store.py
+"""
+Memory per document of the sparse-search document table: the old dict-per-doc
+map ({"id", "content", "meta"} + a metadata dict per job) vs the columnar
+DocStore (app/rag/doc_store.py).
+
+Builds both from the same synthetic job corpus (formatted and tagged exactly
+like app/rag/ingest_mongo.py does), measures the Python heap they hold with
+tracemalloc, checks that a filtered lookup returns the same documents, and
+times the filter and top-k materialization.
+
+Usage (from backend/):
+
+    python scripts/benchmark_doc_store.py --jobs 100000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.rag.doc_store import DocStore
+from app.rag.ingest_mongo import format_job_to_text
+from app.rag.job_fields import PUNJAB_DISTRICTS, build_where, job_metadata, matches_where
+
+POSTS = ["Clerk", "Teacher", "Driver", "Staff Nurse", "Accountant", "Data Entry Operator",
+         "Electrician", "Security Guard", "Sales Executive", "Lab Assistant", "Constable", "Peon"]
+QUALIFICATIONS = ["8th", "10th", "12th", "ITI", "Diploma", "Graduate", "B.Tech", "MBA", "Post Graduate", ""]
+PAGE_SIZE = 1000
+
+
+# ------------------ DATA ------------------
+def synthetic_pages(jobs: int, seed: int = 3):
+    """
+    collection.get()-shaped pages of synthetic jobs.
+    """
+    rng = random.Random(seed)
+    for start in range(0, jobs, PAGE_SIZE):
+        page = {"ids": [], "documents": [], "metadatas": []}
+        for n in range(start, min(start + PAGE_SIZE, jobs)):
+            job_type = "govt" if rng.random() < 0.4 else "private"
+            job = {
+                "name_of_post": rng.choice(POSTS),
+                "name_of_employer": f"Employer {rng.randrange(5000)} Pvt Ltd",
+                "place_of_posting": f"{rng.choice(PUNJAB_DISTRICTS).title()}, Punjab",
+                "required_qualification": rng.choice(QUALIFICATIONS),
+                "last_apply_date": f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-2027",
+                "maximum_applicable_age": rng.choice(["30 Years", "37 Years", "45 Years", None]),
+                "salary": f"{rng.randrange(10, 60) * 1000} per month",
+                "vacancies": str(rng.randint(1, 50)),
+                "apply_link": f"https://www.pgrkam.com/jobs/{n}",
+            }
+            doc_id = f"{0x65a000000000000000000000 + n:024x}"  # Mongo ObjectId-like
+            page["ids"].append(doc_id)
+            page["documents"].append(format_job_to_text(job, "Government" if job_type == "govt" else "Private Sector"))
+            page["metadatas"].append({"source": f"pgrkam_{job_type}", "job_id": doc_id, "type": job_type,
+                                      **job_metadata(job, job_type)})
+        yield page
+
+
+# ------------------ BUILD ------------------
+def build_dict_map(pages) -> dict:
+    # The previous retriever layout
+    doc_map = {}
+    for page in pages:
+        for doc_id, document, meta in zip(page["ids"], page["documents"], page["metadatas"]):
+            doc_map[len(doc_map)] = {"id": doc_id, "content": document, "meta": meta}
+    return doc_map
+
+
+def build_doc_store(pages) -> DocStore:
+    store = DocStore()
+    for page in pages:
+        store.add(page["ids"], page["documents"], page["metadatas"])
+    return store.finalize()
+
+
+def measure(build, jobs: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(synthetic_pages(jobs))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, peak, elapsed
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per document: dict map vs DocStore")
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    text_bytes = sum(len(d.encode("utf-8")) for p in synthetic_pages(args.jobs) for d in p["documents"])
+    print(f"📦 {args.jobs} synthetic jobs, {text_bytes / args.jobs:.0f} bytes of UTF-8 text per job")
+
+    doc_map, map_held, map_peak, map_time = measure(build_dict_map, args.jobs)
+    store, store_held, store_peak, store_time = measure(build_doc_store, args.jobs)
+
+    where = build_where([{"label": "city", "text": "Ludhiana"}, {"label": "qualification", "text": "12th"},
+                         {"label": "age", "text": "32"}])
+    scores = np.random.default_rng(0).random(args.jobs)
+
+    start = time.perf_counter()
+    map_mask = np.array([matches_where(doc_map[i]["meta"], where) for i in range(args.jobs)])
+    map_filter_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    store_mask = store.mask(where)
+    store_filter_ms = (time.perf_counter() - start) * 1000
+    assert (map_mask == store_mask).all(), "filter results differ"
+
+    top = np.argsort(np.where(store_mask, scores, -np.inf))[::-1][:args.top_k]
+    start = time.perf_counter()
+    materialized = [store.get(i) for i in top]
+    materialize_ms = (time.perf_counter() - start) * 1000
+    assert all(doc == doc_map[i] for doc, i in zip(materialized, top)), "documents differ"
+
+    print(f"\n{'layout':<10} {'bytes/doc':>10} {'held MB':>9} {'peak MB':>9} {'build s':>8} {'filter ms':>10}")
+    print(f"{'dict map':<10} {map_held / args.jobs:>10.0f} {map_held / 2**20:>9.1f} {map_peak / 2**20:>9.1f} "
+          f"{map_time:>8.1f} {map_filter_ms:>10.1f}")
+    print(f"{'DocStore':<10} {store_held / args.jobs:>10.0f} {store_held / 2**20:>9.1f} {store_peak / 2**20:>9.1f} "
+          f"{store_time:>8.1f} {store_filter_ms:>10.1f}")
+    print(f"\n✅ {int(store_mask.sum())} filtered matches identical; top-{args.top_k} materialized in {materialize_ms:.2f} ms "
+          f"({map_held / max(store_held, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
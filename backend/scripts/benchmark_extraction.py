@@ -0,0 +1,234 @@
+# backend/scripts/benchmark_extraction.py
+"""
+Offline extraction benchmark for the pgrkam.com scrapers.
+
+Replays a fixture archive (scripts/scraper_fixtures.py) through every
+extraction strategy and reports cards/sec and pages/sec:
+
+    handles    job_scraper.py as it scrapes live: one element-handle round trip
+               per field, a modal click per government card (Playwright routing)
+    evaluate   one page.evaluate() per listing page, modals still clicked (Playwright routing)
+    html       BeautifulSoup over the recorded listing and modal snapshots, no
+               browser, once per installed BeautifulSoup parser
+    content    pgrkam_content_scraper.extract_content_links over every recorded
+               HTML page, once per installed BeautifulSoup parser
+
+Rates are over extraction time only; "wall s" for the browser strategies also
+includes launching Chromium and the replayed page loads. Records from each job
+strategy are compared field by field (whitespace-normalized) against the first one.
+
+Usage (from backend/):
+
+    python scripts/job_scraper.py --record data/fixtures/pgrkam.zip --no-db
+    python scripts/benchmark_extraction.py --archive data/fixtures/pgrkam.zip
+    python scripts/benchmark_extraction.py --synthetic 2000 --strategies html,content   # no recording needed
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from scraper_fixtures import DEFAULT_ARCHIVE, FixtureArchive
+from job_scraper import PGRKAM_URL_GOVT, PGRKAM_URL_PRIVATE, extract_cards_html, scrape_list_page
+from pgrkam_content_scraper import extract_content_links
+
+STRATEGIES = ["handles", "evaluate", "html", "content"]
+CARDS_PER_PAGE = 20
+
+
+# ------------------ DATA ------------------
+def listing_job_type(url: str) -> int:
+    return int(parse_qs(urlsplit(url).query).get("job_type", ["1"])[0])
+
+
+def synthetic_card(rng: random.Random, n: int, job_type: int) -> str:
+    post = rng.choice(["Clerk", "Teacher", "Driver", "Staff Nurse", "Accountant", "Electrician"])
+    place = rng.choice(["Ludhiana", "Amritsar", "Patiala", "Jalandhar", "Mohali", "Bathinda"])
+    qualification = rng.choice(["10th", "12th", "ITI", "Graduate", "B.Tech"])
+    cells = [f"<div>Vacancies <span class='date-clr'>{rng.randint(1, 50)}</span></div>"]
+    if job_type == 1:
+        cells += [f"<div>Min Age <span class='date-clr'>{rng.randint(18, 25)} Years</span></div>",
+                  f"<div>Experience <span class='date-clr'>{rng.randint(0, 5)} Years</span></div>",
+                  "<div>Gender <span class='date-clr'>Any</span></div>"]
+        extra = (f"<p>Salary: <span class='date-clr'>{rng.randrange(10, 60) * 1000} per month</span></p>"
+                 f"<a class='date-clr' href='/job-details-home/{n}'>Apply</a>")
+        posted = ""
+    else:
+        cells += [f"<div>Last Date <span class='date-clr'>{rng.randint(1, 28):02d}-11-2026</span></div>",
+                  "<div>Max Age <span class='date-clr'>37 Years</span></div>",
+                  "<div>Experience <span class='date-clr'>Fresher</span></div>",
+                  "<div>Gender <span class='date-clr'>Any</span></div>",
+                  f"<div><a href='https://punjab.gov.in/apply/{n}'>Apply</a></div>",
+                  f"<div><a href='https://punjab.gov.in/notice/{n}.pdf'>Notification</a></div>",
+                  "<div>Where <span class='date-clr'>Online</span></div>"]
+        extra = ""
+        posted = f"<span>Posted on {rng.randint(1, 28):02d}-10-2026</span>"
+    return (f"<div class='first-job'><h4 class='company-name'><a>Name Of Post: {post}</a></h4>"
+            f"<h6 class='company-name2'>Employer <span class='date-clr'>Employer {n} Pvt Ltd</span></h6>"
+            f"<ul class='nav'><li><span class='date-clr'>{place}, Punjab</span></li></ul>"
+            f"<p>Required Qualification: <span class='date-clr'>{qualification}</span></p>{extra}"
+            f"<div class='bgLightOrange'>{''.join(cells)}</div>{posted}</div>")
+
+
+def write_synthetic_archive(path: str, cards: int, seed: int = 7):
+    """
+    Listing pages in the card markup the extractors expect, one page per
+    listing URL (no pagination, no modals).
+    """
+    rng = random.Random(seed)
+    archive = FixtureArchive(path, "w")
+    for url, job_type in ((PGRKAM_URL_PRIVATE, 1), (PGRKAM_URL_GOVT, 2)):
+        body = "".join(synthetic_card(rng, n, job_type) for n in range(cards // 2))
+        html = (f"<html><head><title>Search Results</title></head><body>"
+                f"<nav><a href='/schemes/'>Punjab Ghar Ghar Rozgar Scheme</a>"
+                f"<a href='/skill-development/'>Skill Development Training</a>"
+                f"<a href='/latest-news/'>Latest News and Updates</a></nav>{body}</body></html>")
+        archive.put_response("GET", url, None, 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8"))
+        # One snapshot per "page" of CARDS_PER_PAGE cards, as a paginated recording would have
+        chunks = body.split("<div class='first-job'>")[1:]
+        for page_no, start in enumerate(range(0, len(chunks), CARDS_PER_PAGE), 1):
+            cards_html = "".join("<div class='first-job'>" + c for c in chunks[start:start + CARDS_PER_PAGE])
+            archive.put_snapshot("listing", f"{url}#page-{page_no}", f"<html><body>{cards_html}</body></html>")
+    archive.save()
+
+
+# ------------------ STRATEGIES ------------------
+def run_browser(archive: FixtureArchive, listings: List[str], strategy: str) -> Tuple[Dict, Dict[str, list]]:
+    from playwright.sync_api import sync_playwright
+
+    totals = defaultdict(float)
+    records = {}
+    start = time.perf_counter()
+    with sync_playwright() as play:
+        for url in listings:
+            stats = {}
+            records[url] = scrape_list_page(play, url, listing_job_type(url), archive, strategy, stats=stats)
+            for key, value in stats.items():
+                totals[key] += value
+    totals["wall_seconds"] = time.perf_counter() - start
+    return totals, records
+
+
+def available_parsers() -> List[str]:
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        pass
+    return parsers
+
+
+def run_html(archive: FixtureArchive, listings: List[str], parser: str, repeat: int) -> Tuple[Dict, Dict[str, list]]:
+    pages = archive.snapshots("listing")
+    modals = defaultdict(dict)  # page key -> {card index: html}
+    for key, html in archive.snapshots("modal"):
+        page_key, _, card = key.rpartition("#card-")
+        modals[page_key][int(card)] = html
+
+    records = {url: [] for url in listings}
+    start = time.perf_counter()
+    for round_no in range(repeat):
+        for key, html in pages:
+            url = key.rsplit("#page-", 1)[0]
+            cards = extract_cards_html(html, listing_job_type(url), modals.get(key), parser)
+            if round_no == 0 and url in records:
+                records[url].extend(cards)
+    elapsed = time.perf_counter() - start
+    cards = sum(len(r) for r in records.values())
+    totals = {"pages": len(pages) * repeat, "cards": cards * repeat, "extract_seconds": elapsed, "wall_seconds": elapsed}
+    return totals, records
+
+
+def run_content(archive: FixtureArchive, parser: str, repeat: int) -> Dict:
+    docs = archive.html_documents()
+    links = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in docs:
+            links += sum(len(group) for group in extract_content_links(html, parser=parser))
+    elapsed = time.perf_counter() - start
+    return {"pages": len(docs) * repeat, "cards": links, "extract_seconds": elapsed, "wall_seconds": elapsed}
+
+
+def normalized(records: List[Dict]) -> List[Dict]:
+    skip = {"job_type", "source_url", "scraped_at"}
+    return [{k: " ".join(v.split()) if isinstance(v, str) else v for k, v in r.items() if k not in skip}
+            for r in records]
+
+
+def mismatches(baseline: Dict[str, list], other: Dict[str, list]) -> int:
+    count = 0
+    for url, base in baseline.items():
+        a, b = normalized(base), normalized(other.get(url, []))
+        count += abs(len(a) - len(b)) + sum(1 for x, y in zip(a, b) if x != y)
+    return count
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="cards/sec and pages/sec per scraper extraction strategy")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE)
+    parser.add_argument("--synthetic", type=int, metavar="CARDS",
+                        help="Benchmark a generated archive of this many cards instead")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds for the offline strategies")
+    args = parser.parse_args()
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error(f"Unknown strategies: {', '.join(sorted(unknown))}")
+
+    path = args.archive
+    if args.synthetic:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.zip")
+        write_synthetic_archive(path, args.synthetic)
+    archive = FixtureArchive(path)
+    listings = list(dict.fromkeys(key.rsplit("#page-", 1)[0] for key, _ in archive.snapshots("listing")))
+    print(f"📦 {path}: {len(archive.entries)} entries, {len(listings)} listings, "
+          f"{len(archive.snapshots('listing'))} listing pages")
+
+    rows = []
+    baseline = None
+    for strategy in strategies:
+        if strategy == "content":
+            for name in available_parsers():
+                rows.append((f"content/{name}", run_content(archive, name, args.repeat), None))
+            continue
+        if strategy == "html":
+            runs = [(f"html/{name}", *run_html(archive, listings, name, args.repeat)) for name in available_parsers()]
+        else:
+            runs = [(strategy, *run_browser(archive, listings, strategy))]
+        for name, totals, records in runs:
+            diff = None
+            if baseline is None:
+                if any(records.values()):  # a strategy that failed to run is no reference
+                    baseline = records
+            else:
+                diff = mismatches(baseline, records)
+            rows.append((name, totals, diff))
+
+    print(f"\n{'strategy':<20} {'pages':>6} {'items':>7} {'extract s':>10} {'wall s':>8} "
+          f"{'pages/s':>9} {'items/s':>10} {'mismatches':>11}")
+    for name, t, diff in rows:
+        seconds = max(t["extract_seconds"], 1e-9)
+        print(f"{name:<20} {int(t['pages']):>6} {int(t['cards']):>7} {t['extract_seconds']:>10.3f} "
+              f"{t['wall_seconds']:>8.2f} {t['pages'] / seconds:>9.1f} {t['cards'] / seconds:>10.1f} "
+              f"{'-' if diff is None else diff:>11}")
+    print("\nitems = cards for job strategies, categorized links for content")
+    if archive.misses:
+        print(f"[WARN] {archive.misses} replayed requests were not in the archive")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
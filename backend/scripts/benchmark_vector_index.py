@@ -0,0 +1,186 @@
+# backend/scripts/benchmark_vector_index.py
+"""
+Chroma (HNSW) vs the quantized flat index (app/rag/flat_index.py).
+
+Builds each backend from the same embeddings in a temporary directory, then
+runs the same queries against each one in a fresh subprocess so resident
+memory is measured in isolation. Reports recall@k against exact float32
+search, query latency and RSS (anonymous = private heap, file = mmapped pages
+that the page cache shares between workers).
+
+Usage (from backend/):
+
+    python scripts/benchmark_vector_index.py                      # embeddings from ./data/vector_db
+    python scripts/benchmark_vector_index.py --synthetic 100000 --dim 384 --queries 200 --k 10
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BACKENDS = ["chroma", "flat-int8", "flat-binary"]
+BATCH = 5000
+
+
+# ------------------ DATA ------------------
+def synthetic_vectors(n: int, dim: int, seed: int = 7) -> np.ndarray:
+    # Clustered like real job postings (many near-duplicates of a few roles)
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(8, n // 200), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chroma_vectors() -> np.ndarray:
+    import chromadb
+    client = chromadb.PersistentClient(path=os.path.join(BACKEND_DIR, "data", "vector_db"))
+    collection = client.get_collection("pgrkam_docs")
+    embeddings = collection.get(include=["embeddings"])["embeddings"]
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    scores = queries @ vectors.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+# ------------------ BUILD ------------------
+def build(backend: str, path: str, vectors: np.ndarray):
+    ids = [str(i) for i in range(len(vectors))]
+    documents = [f"doc {i}" for i in ids]
+    metadatas = [{"n": i} for i in range(len(vectors))]
+    if backend == "chroma":
+        import chromadb
+        client = chromadb.PersistentClient(path=path)
+        collection = client.get_or_create_collection("bench", embedding_function=None, metadata={"hnsw:space": "cosine"})
+        for start in range(0, len(vectors), BATCH):
+            end = start + BATCH
+            collection.add(ids=ids[start:end], embeddings=vectors[start:end].tolist(),
+                           documents=documents[start:end], metadatas=metadatas[start:end])
+    else:
+        from app.rag.flat_index import FlatCollection
+        collection = FlatCollection(path, None, codes=backend.split("-")[1])
+        # Batched like the Chroma build, so the build time includes the per-batch appends
+        for start in range(0, len(vectors), BATCH):
+            end = start + BATCH
+            collection.upsert(documents[start:end], metadatas[start:end], ids[start:end], embeddings=vectors[start:end])
+
+
+# ------------------ MEASURE (subprocess) ------------------
+def rss_kb() -> Dict[str, int]:
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def worker(backend: str, path: str, queries_path: str, k: int, rescore_factor: int):
+    queries = np.load(queries_path)
+    before = rss_kb()
+    if backend == "chroma":
+        import chromadb
+        collection = chromadb.PersistentClient(path=path).get_collection("bench", embedding_function=None)
+    else:
+        from app.rag.flat_index import FlatCollection
+        collection = FlatCollection(path, None, codes=backend.split("-")[1], rescore_factor=rescore_factor)
+
+    # Warm-up query loads the index (HNSW into RAM, memmap pages on first touch)
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=k)
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        hits = collection.query(query_embeddings=[q.tolist()], n_results=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([int(i) for i in hits["ids"][0]])
+    after = rss_kb()
+    print(json.dumps({"results": results, "latencies": latencies, "rss_before": before, "rss_after": after}))
+
+
+def run_worker(backend: str, path: str, queries_path: str, k: int, rescore_factor: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", backend, "--path", path,
+         "--queries-file", queries_path, "--k", str(k), "--rescore-factor", str(rescore_factor)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total / 1e6
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Chroma vs the quantized flat vector index")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of ./data/vector_db")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5, help="Query perturbation relative to a stored vector")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--queries-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.path, args.queries_file, args.k, args.rescore_factor)
+        return
+
+    vectors = synthetic_vectors(args.synthetic, args.dim) if args.synthetic else chroma_vectors()
+    queries = make_queries(vectors, args.queries, args.noise)
+    truth = exact_top_k(vectors, queries, args.k)
+    print(f"📦 {len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    workdir = tempfile.mkdtemp(prefix="vecbench_")
+    queries_path = os.path.join(workdir, "queries.npy")
+    np.save(queries_path, queries)
+    try:
+        print(f"{'backend':<12} {'build_s':>8} {'disk_MB':>8} {'recall@k':>9} {'p50_ms':>8} {'p95_ms':>8} "
+              f"{'rss_MB':>8} {'anon_MB':>8} {'file_MB':>8}")
+        for backend in args.backends.split(","):
+            path = os.path.join(workdir, backend)
+            start = time.perf_counter()
+            build(backend, path, vectors)
+            build_s = time.perf_counter() - start
+
+            report = run_worker(backend, path, queries_path, args.k, args.rescore_factor)
+            recall = np.mean([len(set(r) & t) / args.k for r, t in zip(report["results"], truth)])
+            latencies = np.array(report["latencies"])
+            after, before = report["rss_after"], report["rss_before"]
+            print(f"{backend:<12} {build_s:>8.1f} {dir_size_mb(path):>8.1f} {recall:>9.3f} "
+                  f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+                  f"{(after['VmRSS'] - before['VmRSS']) / 1024:>8.1f} "
+                  f"{(after['RssAnon'] - before['RssAnon']) / 1024:>8.1f} "
+                  f"{(after['RssFile'] - before['RssFile']) / 1024:>8.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
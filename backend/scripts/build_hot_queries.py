@@ -0,0 +1,158 @@
+# backend/scripts/build_hot_queries.py
+"""
+Builds the hot-query bundle that warm_up() loads into the answer, translation
+and embedding caches (app/core/caches.py).
+
+Reads the last --days of chat_logs (written by log_interaction when
+CHAT_LOG_ENABLED is set), groups the queries by language, predicted intent and
+keyword signature (the FAQ matcher's: content words, stopwords dropped), so
+"jobs in ludhiana?" and "Jobs in Ludhiana" count as one, and takes the --top
+most frequent groups. Each group's most common wording is then run through the
+same steps as a first-turn /chat request: query translation, intent, entities,
+retrieval and the answer, with a generous deadline. Queries the FAQ
+short-circuit answers are skipped, and so are answers that had to degrade.
+
+Run it against the corpus the server will load, e.g. after each ingestion or
+nightly (bundles older than HOT_BUNDLE_MAX_AGE_HOURS are not loaded).
+
+Usage (from backend/):
+
+    python scripts/build_hot_queries.py --days 14 --top 200
+    python scripts/build_hot_queries.py --dry-run     # only print the groups
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core import config
+from app.core.logger import get_db_collection
+from app.core.singleflight import normalize_text
+from app.rag.faq_matcher import signature
+
+PREWARM_DEADLINE = 60.0  # seconds per query; nothing is waiting on the answer
+
+
+# ------------------ MINING ------------------
+def hot_queries(days: int, top: int, min_count: int) -> list:
+    """
+    Most frequent query groups: [{"query", "language", "intent", "count", "variants"}].
+    """
+    collection = get_db_collection()
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    groups = {}
+    for log in collection.find({"timestamp": {"$gte": since}},
+                               {"user_query": 1, "processed_query": 1, "language": 1, "predicted_intent": 1}):
+        query = normalize_text(log.get("user_query"))
+        if not query:
+            continue
+        language = log.get("language") or "en"
+        words = signature(log.get("processed_query") or log["user_query"])
+        key = (language, log.get("predicted_intent") or "", tuple(sorted(words)) or query)
+        groups.setdefault(key, Counter())[query] += 1
+
+    ranked = sorted(groups.items(), key=lambda item: -sum(item[1].values()))
+    return [
+        {"query": wordings.most_common(1)[0][0], "language": language, "intent": intent,
+         "count": sum(wordings.values()), "variants": len(wordings)}
+        for (language, intent, _), wordings in ranked[:top]
+        if sum(wordings.values()) >= min_count
+    ]
+
+
+# ------------------ PRE-COMPUTING ------------------
+def precompute(entry: dict, faq_matcher) -> tuple:
+    """
+    Runs one query like a first-turn /chat request; fills the translation and
+    embedding caches as a side effect. Returns (report, answer key, answer) with
+    answer None when it should not be cached.
+    """
+    from app.api.endpoints import _history_digest, answer_query, translate_text
+    from app.core.deadline import Deadline
+    from app.nlu.classifier import predict_intent
+    from app.nlu.entity_extractor import extract_entities
+    from app.nlu.gurmukhi import gloss
+    from app.rag.retriever import hybrid_search
+
+    start = time.perf_counter()
+    message, language = entry["query"], entry["language"]
+    query, nlu_text = message, message
+    if language == "pa" and config.PA_QUERY_MODE == "translate":
+        query = nlu_text = translate_text(message, "pa-IN", "en-IN", timeout=config.SARVAM_TRANSLATE_TIMEOUT)
+    elif language == "pa":
+        nlu_text = gloss(message)
+    report = {**entry, "processed_query": query}
+    if query == message and language == "pa" and config.PA_QUERY_MODE == "translate":
+        return {**report, "skipped": "untranslated"}, None, None
+
+    if faq_matcher is not None and faq_matcher.match(nlu_text, record=False) is not None:
+        return {**report, "skipped": "faq"}, None, None
+
+    intent = predict_intent(nlu_text, history=[])
+    entities = extract_entities(nlu_text, use_fast=True)
+    answer = answer_query(query, language, intent, entities, [], "", Deadline(PREWARM_DEADLINE))
+    report.update({
+        "predicted_intent": intent,
+        "entities": [e["text"] for e in entities],
+        "retrieval_ids": [doc["id"] for doc in hybrid_search(query, top_k=config.RERANK_TOP_N, entities=entities)],
+        "answer_path": answer["answer_path"],
+        "seconds": round(time.perf_counter() - start, 2),
+    })
+    if answer["degradations"]:
+        return {**report, "skipped": "degraded"}, None, None
+    key = (normalize_text(query), language, intent, _history_digest("", []))
+    return report, key, answer
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Pre-compute caches for the most frequent logged queries.")
+    parser.add_argument("--days", type=int, default=14, help="chat_logs window")
+    parser.add_argument("--top", type=int, default=200, help="query groups to pre-compute")
+    parser.add_argument("--min-count", type=int, default=3, help="ignore groups asked fewer times")
+    parser.add_argument("--output", default=config.HOT_BUNDLE_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="print the groups without computing anything")
+    args = parser.parse_args()
+
+    entries = hot_queries(args.days, args.top, args.min_count)
+    print(f"🔥 {len(entries)} hot query groups in the last {args.days} days.")
+    if args.dry_run:
+        for entry in entries:
+            print(f"  {entry['count']:>6}  [{entry['language']}/{entry['intent']}]  {entry['query']}  "
+                  f"({entry['variants']} wordings)")
+        return
+
+    from app.core.caches import save_bundle
+    from app.core.warmup import warm_up
+    from app.rag.faq_matcher import load_faq_matcher
+
+    warm_up()
+    try:
+        faq_matcher = load_faq_matcher()
+    except Exception as e:
+        print(f"⚠️ Could not load FAQs, FAQ queries are pre-computed too: {e}")
+        faq_matcher = None
+
+    reports, answers = [], []
+    for entry in entries:
+        try:
+            report, key, answer = precompute(entry, faq_matcher)
+        except Exception as e:
+            report, key, answer = {**entry, "skipped": f"error: {e}"}, None, None
+        reports.append(report)
+        if answer is not None:
+            answers.append((key, answer))
+        print(f"  {'✅' if answer is not None else '⏭️'} {entry['query'][:60]}  {report.get('skipped', '')}")
+
+    bundle = save_bundle(reports, answers, args.output)
+    print(f"💾 {len(bundle['answers'])} answers, {len(bundle['translations'])} translations and "
+          f"{len(bundle['embeddings'])} embeddings written to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -198,6 +198,9 @@ def ingest_content():
     except Exception:
         pass
     
+    # Running APIs reload their in-memory content index (app/rag/content_index.py)
+    db["content_meta"].update_one({"_id": "content"}, {"$inc": {"version": 1}}, upsert=True)
+    
     print(f"Ingested {len(schemes_data)} schemes")
     print(f"Ingested {len(training_data)} training programs")
     print(f"Ingested {len(news_data)} news updates")
@@ -60,6 +60,9 @@ def ingest_faqs():
     except Exception:
         pass
     
+    # Running APIs reload their in-memory content index (app/rag/content_index.py)
+    db["content_meta"].update_one({"_id": "content"}, {"$inc": {"version": 1}}, upsert=True)
+    
     print(f"Ingested {len(faqs)} FAQs")
 
 if __name__ == "__main__":
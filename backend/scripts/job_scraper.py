@@ -1,18 +1,26 @@
 # pgrkam_full_scraper.py
 
+import argparse
 import os
 import sys
 import time
 import signal
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from bs4 import BeautifulSoup
 from pymongo import MongoClient, ASCENDING
 from playwright.sync_api import sync_playwright
 
+from scraper_fixtures import FixtureArchive, install_routes
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from app.rag.job_fields import parse_deadline
+
 # ------------------ CONFIG ------------------
 PGRKAM_URL_PRIVATE = "https://www.pgrkam.com/search-results/?job_type=1"
 PGRKAM_URL_GOVT = "https://www.pgrkam.com/search-results/?job_type=2"
@@ -55,7 +63,7 @@ def extract_modal_text(page):
 
 #-----------------------------------------------------------------
 
-def get_required_qualification_from_modal(card, page, wait_ms=8000):
+def get_required_qualification_from_modal(card, page, wait_ms=8000, snapshot: Optional[Callable[[str], None]] = None):
     # 1) Try to close an already-open modal (it intercepts clicks)
     try:
         if page.locator("#descriptionModal.show").count() or page.is_visible("#descriptionModal.show"):
@@ -84,6 +92,8 @@ def get_required_qualification_from_modal(card, page, wait_ms=8000):
         body = page.query_selector("#descriptionModal.show .modal-body")
         if body:
             text = body.inner_text().strip()
+            if snapshot:
+                snapshot(body.inner_html())
         else:
             text = None
     except Exception:
@@ -156,7 +166,7 @@ def extract_private_card(card):
     }
 
 # ------------------ GOVERNMENT JOB CARD EXTRACTOR ------------------
-def extract_govt_card(card, page):
+def extract_govt_card(card, page, snapshot: Optional[Callable[[str], None]] = None):
     def safe(q):
         el = card.query_selector(q)
         return el.inner_text().strip() if el else None
@@ -171,7 +181,7 @@ def extract_govt_card(card, page):
     # Try modal first
     required_qualification = None
     try:
-        required_qualification = get_required_qualification_from_modal(card, page, wait_ms=8000)
+        required_qualification = get_required_qualification_from_modal(card, page, wait_ms=8000, snapshot=snapshot)
     except Exception as e:
         print(f"[WARN] Modal extraction failed: {e}")
 
@@ -220,49 +230,243 @@ def extract_govt_card(card, page):
     }
 
 
+# ------------------ BATCH EXTRACTION STRATEGIES ------------------
+# The extractors above ("handles") make one browser round trip per field. The
+# same selectors as tables, for extracting a whole page at once:
+#   evaluate  one page.evaluate() call per listing page (modals are still clicked)
+#   html      parse the rendered listing HTML offline (recorded listing + modal snapshots)
+CARD_SELECTOR = ".first-job"
+
+PRIVATE_FIELDS = ["name_of_post", "name_of_employer", "place_of_posting", "required_qualification", "salary",
+                  "vacancies", "minimum_required_age", "experience", "gender", "apply_link"]
+GOVT_FIELDS = ["name_of_post", "name_of_employer", "place_of_posting", "required_qualification", "vacancies",
+               "last_apply_date", "maximum_applicable_age", "experience", "gender", "apply_link",
+               "notification_link", "where_to_apply", "posted_on"]
+
+# field -> CSS selector whose first match's text is the value
+CARD_TEXT = {
+    1: {
+        "name_of_post": "h4.company-name a",
+        "name_of_employer": "h6.company-name2 span.date-clr",
+        "place_of_posting": "ul.nav li span.date-clr",
+        "vacancies": ".bgLightOrange div:nth-child(1) span.date-clr",
+        "minimum_required_age": ".bgLightOrange div:nth-child(2) span.date-clr",
+        "experience": ".bgLightOrange div:nth-child(3) span.date-clr",
+        "gender": ".bgLightOrange div:nth-child(4) span.date-clr",
+    },
+    2: {
+        "name_of_post": "h4.company-name a",
+        "name_of_employer": "h6.company-name2 span.date-clr",
+        "place_of_posting": "ul.nav li span.date-clr",
+        "vacancies": ".bgLightOrange div:nth-child(1) span.date-clr",
+        "last_apply_date": ".bgLightOrange div:nth-child(2) span.date-clr",
+        "maximum_applicable_age": ".bgLightOrange div:nth-child(3) span.date-clr",
+        "experience": ".bgLightOrange div:nth-child(4) span.date-clr",
+        "gender": ".bgLightOrange div:nth-child(5) span.date-clr",
+        "where_to_apply": ".bgLightOrange div:nth-child(8) span.date-clr",
+    },
+}
+# field -> (tag, text it contains, selector inside it or "" for the tag itself), like Playwright's :has-text
+CARD_LABELLED = {
+    1: {
+        "required_qualification": ("p", "Required Qualification", "span.date-clr"),
+        "salary": ("p", "Salary", "span.date-clr"),
+    },
+    2: {
+        "required_qualification": ("p", "Required Qualification", "span.date-clr"),
+        "posted_on": ("span", "Posted on", ""),
+    },
+}
+# field -> CSS selector whose first match's href is the value
+CARD_LINKS = {
+    1: {"apply_link": "a.date-clr[href*='job-details-home']"},
+    2: {"apply_link": ".bgLightOrange div:nth-child(6) a",
+        "notification_link": ".bgLightOrange div:nth-child(7) a"},
+}
+
+_EVALUATE_CARDS_JS = """
+([cardSelector, textFields, labelled, links]) =>
+  Array.from(document.querySelectorAll(cardSelector)).map(card => {
+    const out = {};
+    for (const [field, sel] of Object.entries(textFields)) {
+      const el = card.querySelector(sel);
+      out[field] = el ? el.innerText.trim() : null;
+    }
+    for (const [field, [tag, label, sel]] of Object.entries(labelled)) {
+      out[field] = null;
+      for (const el of card.querySelectorAll(tag)) {
+        if (!el.textContent.toLowerCase().includes(label.toLowerCase())) continue;
+        const target = sel ? el.querySelector(sel) : el;
+        if (target) { out[field] = target.innerText.trim(); break; }
+      }
+    }
+    for (const [field, sel] of Object.entries(links)) {
+      const el = card.querySelector(sel);
+      out[field] = el ? el.getAttribute("href") : null;
+    }
+    return out;
+  })
+"""
+
+
+def finish_card(raw: Dict, job_type: int, modal_text: Optional[str] = None) -> Dict:
+    """
+    The clean-up extract_private_card / extract_govt_card apply, on raw batch-extracted fields.
+    """
+    rec = dict(raw)
+    name_of_post = rec.get("name_of_post")
+    if name_of_post and "Name Of Post:" in name_of_post:
+        rec["name_of_post"] = name_of_post.replace("Name Of Post:", "").strip()
+
+    if job_type == 1:
+        href = rec.get("apply_link")
+        if href and href.startswith("/"):
+            rec["apply_link"] = "https://www.pgrkam.com" + href
+        return {field: rec.get(field) for field in PRIVATE_FIELDS}
+
+    rq = rec.get("required_qualification")
+    rec["required_qualification"] = modal_text or (rq.replace("+ More", "").strip() if rq else None)
+    if rec.get("posted_on"):
+        rec["posted_on"] = rec["posted_on"].replace("Posted on", "").strip()
+    return {field: rec.get(field) for field in GOVT_FIELDS}
+
+
+def extract_cards_evaluate(page, job_type: int, snapshot_for=None) -> List[Dict]:
+    raws = page.evaluate(_EVALUATE_CARDS_JS, [CARD_SELECTOR, CARD_TEXT[job_type],
+                                              CARD_LABELLED[job_type], CARD_LINKS[job_type]])
+    if job_type == 1:
+        return [finish_card(raw, job_type) for raw in raws]
+
+    records = []
+    cards = page.query_selector_all(CARD_SELECTOR)
+    for i, raw in enumerate(raws):
+        modal_text = None
+        if i < len(cards):
+            try:
+                modal_text = get_required_qualification_from_modal(
+                    cards[i], page, wait_ms=8000, snapshot=snapshot_for(i) if snapshot_for else None)
+            except Exception as e:
+                print(f"[WARN] Modal extraction failed: {e}")
+        records.append(finish_card(raw, job_type, modal_text))
+    return records
+
+
+def _soup_text(el) -> str:
+    return " ".join(el.get_text(" ").split())
+
+
+def extract_cards_html(html: str, job_type: int, modal_html: Optional[Dict[int, str]] = None,
+                       parser: str = "html.parser") -> List[Dict]:
+    """
+    Cards of one rendered listing page. modal_html maps card index -> the
+    #descriptionModal body HTML recorded for it (government jobs).
+    """
+    soup = BeautifulSoup(html, parser)
+    records = []
+    for i, card in enumerate(soup.select(CARD_SELECTOR)):
+        raw = {}
+        for field, sel in CARD_TEXT[job_type].items():
+            el = card.select_one(sel)
+            raw[field] = _soup_text(el) if el else None
+        for field, (tag, label, sel) in CARD_LABELLED[job_type].items():
+            raw[field] = None
+            for el in card.find_all(tag):
+                if label.lower() not in el.get_text().lower():
+                    continue
+                target = el.select_one(sel) if sel else el
+                if target:
+                    raw[field] = _soup_text(target)
+                    break
+        for field, sel in CARD_LINKS[job_type].items():
+            el = card.select_one(sel)
+            raw[field] = el.get("href") if el else None
+        modal_text = None
+        if modal_html and i in modal_html:
+            modal_text = _soup_text(BeautifulSoup(modal_html[i], parser)) or None
+        records.append(finish_card(raw, job_type, modal_text))
+    return records
 
 
 # ------------------ SCRAPE LIST PAGE ------------------
-def scrape_list_page(play, url: str, job_type: int) -> List[Dict]:
+def scrape_list_page(play, url: str, job_type: int, archive: Optional[FixtureArchive] = None,
+                     strategy: str = "handles", details: int = 0, stats: Optional[Dict] = None) -> List[Dict]:
+    """
+    archive: record into / replay from a fixture archive (scripts/scraper_fixtures.py)
+    strategy: "handles" (per-field element handles) or "evaluate" (one JS call per page)
+    details: when recording, also visit and snapshot this many job detail pages
+    stats: filled with pages, cards and extract_seconds
+    """
     browser = None
+    replaying = archive is not None and archive.replaying
+    recording = archive is not None and archive.recording
+    stats = stats if stats is not None else {}
+    stats.update(pages=0, cards=0, extract_seconds=0.0)
     try:
         browser = play.chromium.launch(headless=HEADLESS)
         ctx = browser.new_context()
+        if archive is not None:
+            install_routes(ctx, archive)
+        if recording:
+            archive.forget_snapshots(url + "#")
         page = ctx.new_page()
 
         page.goto(url, timeout=PAGE_TIMEOUT)
         page.wait_for_load_state("domcontentloaded")
-        time.sleep(1.5)
+        if not replaying:
+            time.sleep(1.5)
 
         records = []
 
         while True:
-            cards = page.query_selector_all(".first-job")
-
-            for card in cards:
-                try:
-                    if job_type == 1:
-                        rec = extract_private_card(card)
-                        job_name = "private"
-                    else:
-                        rec = extract_govt_card(card,page)
-                        job_name = "government"
-
-                    rec["job_type"] = job_name
-                    rec["source_url"] = url
-                    rec["scraped_at"] = datetime.now(timezone.utc)
-                    records.append(rec)
-                except Exception as e:
-                    print(f"[ERR] Card extraction failed: {e}")
+            stats["pages"] += 1
+            page_key = f"{url}#page-{stats['pages']}"
+            if recording:
+                archive.put_snapshot("listing", page_key, page.content())
+
+            def snapshot_for(i):
+                if not recording:
+                    return None
+                return lambda html: archive.put_snapshot("modal", f"{page_key}#card-{i}", html)
+
+            started = time.perf_counter()
+            if strategy == "evaluate":
+                page_records = extract_cards_evaluate(page, job_type, snapshot_for)
+            else:
+                page_records = []
+                cards = page.query_selector_all(CARD_SELECTOR)
+
+                for i, card in enumerate(cards):
+                    try:
+                        if job_type == 1:
+                            rec = extract_private_card(card)
+                        else:
+                            rec = extract_govt_card(card, page, snapshot=snapshot_for(i))
+                        page_records.append(rec)
+                    except Exception as e:
+                        print(f"[ERR] Card extraction failed: {e}")
+            stats["extract_seconds"] += time.perf_counter() - started
+            stats["cards"] += len(page_records)
+
+            for rec in page_records:
+                rec["job_type"] = "private" if job_type == 1 else "government"
+                rec["source_url"] = url
+                rec["scraped_at"] = datetime.now(timezone.utc)
+                # Typed copy of last_apply_date for the expiry sweep / TTL index (app/rag/compaction.py)
+                rec["deadline_at"] = parse_deadline(rec.get("last_apply_date"))
+                records.append(rec)
 
             next_btn = page.query_selector("a.page-link:has-text('Next')")
             if next_btn and next_btn.is_enabled():
                 next_btn.click()
                 page.wait_for_load_state("domcontentloaded")
-                time.sleep(1.0)
+                if not replaying:
+                    time.sleep(1.0)
             else:
                 break
 
+        if recording and details:
+            record_detail_pages(page, archive, records, details)
+
         return records
     except KeyboardInterrupt:
         print("[INFO] Scraping interrupted by user")
@@ -277,6 +481,22 @@ def scrape_list_page(play, url: str, job_type: int) -> List[Dict]:
             except Exception:
                 pass
 
+
+def record_detail_pages(page, archive: FixtureArchive, records: List[Dict], limit: int):
+    """
+    Visits up to `limit` pgrkam.com apply links; routing saves their responses
+    and the rendered page is kept as a "detail" snapshot.
+    """
+    links = [r["apply_link"] for r in records if r.get("apply_link") and "pgrkam.com" in r["apply_link"]]
+    for link in list(dict.fromkeys(links))[:limit]:
+        try:
+            page.goto(link, timeout=PAGE_TIMEOUT)
+            page.wait_for_load_state("domcontentloaded")
+            archive.put_snapshot("detail", link, page.content())
+        except Exception as e:
+            print(f"[WARN] Detail page {link} failed: {e}")
+        time.sleep(REQUEST_DELAY_SEC)
+
 # ------------------ UPSERT ------------------
 def upsert_records(coll, records):
     c = 0
@@ -291,23 +511,46 @@ def upsert_records(coll, records):
 
 # ------------------ MAIN ------------------
 def main():
+    parser = argparse.ArgumentParser(description="Scrape pgrkam.com job listings into MongoDB")
+    parser.add_argument("--record", metavar="ARCHIVE", help="Also save every page into a fixture archive")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="Scrape from a fixture archive instead of the live site (no DB writes)")
+    parser.add_argument("--details", type=int, default=0, help="With --record: also save this many job detail pages per listing")
+    parser.add_argument("--strategy", choices=["handles", "evaluate"], default="handles")
+    parser.add_argument("--no-db", action="store_true", help="Print counts instead of upserting")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+
     def signal_handler(signum, frame):
         print("\n[INFO] Received interrupt signal, shutting down gracefully...")
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
-    
-    client, db, private_coll, govt_coll = connect_mongo()
+
+    archive = None
+    if args.record:
+        archive = FixtureArchive(args.record, "w")
+    elif args.replay:
+        archive = FixtureArchive(args.replay)
+    use_db = not (args.no_db or args.replay)
+    client = None
+    if use_db:
+        client, db, private_coll, govt_coll = connect_mongo()
 
     try:
         with sync_playwright() as p:
-            private_records = scrape_list_page(p, PGRKAM_URL_PRIVATE, 1)
-            govt_records = scrape_list_page(p, PGRKAM_URL_GOVT, 2)
+            private_records = scrape_list_page(p, PGRKAM_URL_PRIVATE, 1, archive, args.strategy, args.details)
+            govt_records = scrape_list_page(p, PGRKAM_URL_GOVT, 2, archive, args.strategy, args.details)
 
-        up1 = upsert_records(private_coll, private_records)
-        up2 = upsert_records(govt_coll, govt_records)
+        if use_db:
+            up1 = upsert_records(private_coll, private_records)
+            up2 = upsert_records(govt_coll, govt_records)
+        else:
+            up1, up2 = 0, 0
 
         print({
+            "private_records": len(private_records),
+            "govt_records": len(govt_records),
             "private_upserts": up1,
             "govt_upserts": up2,
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -317,7 +560,15 @@ def main():
     except Exception as e:
         print(f"[ERR] Script failed: {e}")
     finally:
-        client.close()
+        if archive is not None:
+            archive.save()
+            archive.close()
+            if archive.recording:
+                print(f"📦 Fixtures saved to {archive.path}")
+            elif archive.misses:
+                print(f"[WARN] {archive.misses} requests were not in the archive")
+        if client:
+            client.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,268 @@
+# backend/scripts/load_test.py
+"""
+Open-loop load test for the chat API.
+
+Starts the mock Sarvam AI server (scripts/mock_sarvam.py) and a single uvicorn
+worker of app.main:app wired to it, then replays a weighted English/Punjabi
+query mix at increasing arrival rates. Requests are fired on a Poisson schedule
+regardless of how many are still outstanding, so queueing shows up as latency
+instead of silently lowering the offered load.
+
+The mix is small and every request comes from 127.0.0.1, so by default the
+worker runs with the answer, translation and embedding caches and single-flight
+coalescing off, and with the per-IP and per-session admission caps above any
+offered concurrency: the curve measures the pipeline, not cache hits and 429s.
+--warm keeps the caches and coalescing on. 429s are reported separately.
+
+Usage (from backend/):
+
+    python scripts/load_test.py --rates 1,2,4,8,16 --duration 30 --csv load_curve.csv
+    python scripts/load_test.py --target http://127.0.0.1:8000 --no-mock   # existing server
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNLIMITED = "1000000"
+
+# (message, language, expected intent, weight)
+QUERY_MIX = [
+    ("government jobs in Ludhiana", "en", "search_job", 14),
+    ("clerk vacancy for 12th pass in Patiala", "en", "search_job", 12),
+    ("private jobs for BTech graduates in Mohali", "en", "search_job", 10),
+    ("teacher recruitment in Amritsar under 30 years", "en", "search_job", 8),
+    ("what is the skill development scheme", "en", "search_scheme", 8),
+    ("training programs for women", "en", "search_scheme", 6),
+    ("how to apply for this scheme", "en", "scheme_application", 5),
+    ("how to apply for a job", "en", "job_application", 6),
+    ("check my application status", "en", "check_status", 4),
+    ("hello", "en", "general_query", 5),
+    ("what is the weather today", "en", "off_topic", 2),
+    ("ਲੁਧਿਆਣਾ ਵਿੱਚ ਸਰਕਾਰੀ ਨੌਕਰੀਆਂ", "pa", "search_job", 8),
+    ("12ਵੀਂ ਪਾਸ ਲਈ ਨੌਕਰੀਆਂ", "pa", "search_job", 6),
+    ("ਹੁਨਰ ਵਿਕਾਸ ਯੋਜਨਾ ਕੀ ਹੈ", "pa", "search_scheme", 4),
+    ("ਅਰਜ਼ੀ ਕਿਵੇਂ ਦੇਣੀ ਹੈ", "pa", "job_application", 3),
+    ("ਸਤ ਸ੍ਰੀ ਅਕਾਲ", "pa", "general_query", 2),
+]
+
+
+# ------------------ PROCESS MANAGEMENT ------------------
+def start_process(cmd: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        cmd,
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_until_up(url: str, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout:.0f}s")
+
+
+def stop_process(proc: Optional[subprocess.Popen]):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ------------------ LOAD GENERATION ------------------
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def fire(client: httpx.AsyncClient, chat_url: str, query: tuple, results: list):
+    message, language, _intent, _weight = query
+    sent = time.perf_counter()
+    status = 0
+    try:
+        resp = await client.post(chat_url, json={"message": message, "language": language})
+        status = resp.status_code
+    except httpx.TimeoutException:
+        status = -1
+    except httpx.HTTPError:
+        status = -2
+    results.append((time.perf_counter() - sent, status, time.perf_counter()))
+
+
+async def run_step(chat_url: str, rate: float, duration: float, timeout: float, rng: random.Random) -> dict:
+    """
+    Offers `rate` requests/sec for `duration` seconds using Poisson arrivals.
+    """
+    weights = [q[3] for q in QUERY_MIX]
+    results: list = []
+    tasks = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        next_at = start
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at - start > duration:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            query = rng.choices(QUERY_MIX, weights=weights, k=1)[0]
+            tasks.append(asyncio.create_task(fire(client, chat_url, query, results)))
+        if tasks:
+            await asyncio.gather(*tasks)
+        end = max((r[2] for r in results), default=time.perf_counter())
+
+    ok = [lat for lat, status, _ in results if status == 200]
+    errors = len(results) - len(ok)
+    elapsed = max(end - start, 1e-9)
+    return {
+        "offered_rps": rate,
+        "sent": len(results),
+        "throughput_rps": len(ok) / elapsed,
+        "error_rate": errors / len(results) if results else 0.0,
+        "rejected_429": sum(1 for _, status, _ in results if status == 429),
+        "timeouts": sum(1 for _, status, _ in results if status == -1),
+        "p50_ms": percentile(ok, 50) * 1000,
+        "p90_ms": percentile(ok, 90) * 1000,
+        "p99_ms": percentile(ok, 99) * 1000,
+        "max_ms": (max(ok) * 1000) if ok else float("nan"),
+    }
+
+
+def print_row(row: dict):
+    print(
+        f"{row['offered_rps']:>8.1f} {row['sent']:>6} {row['throughput_rps']:>9.2f} "
+        f"{row['error_rate'] * 100:>6.1f}% {row['rejected_429']:>6} {row['p50_ms']:>9.0f} {row['p90_ms']:>9.0f} "
+        f"{row['p99_ms']:>9.0f} {row['max_ms']:>9.0f}"
+    )
+
+
+def run_curve(chat_url: str, rates: List[float], duration: float, timeout: float,
+              slo_ms: float, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    rows = []
+    print(f"{'offered':>8} {'sent':>6} {'thruput':>9} {'errors':>7} {'429s':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for rate in rates:
+        row = asyncio.run(run_step(chat_url, rate, duration, timeout, rng))
+        rows.append(row)
+        print_row(row)
+        # Past the knee every further step just measures timeouts
+        if row["error_rate"] > 0.5 or row["p99_ms"] > 5 * slo_ms:
+            print("⚠️ Latency exploded, stopping the sweep.")
+            break
+    return rows
+
+
+def capacity_estimate(rows: List[dict], slo_ms: float, max_error_rate: float = 0.01) -> Optional[dict]:
+    passing = [r for r in rows if r["p99_ms"] <= slo_ms and r["error_rate"] <= max_error_rate]
+    return max(passing, key=lambda r: r["throughput_rps"]) if passing else None
+
+
+# ------------------ MAIN ------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load test for the PGRKAM chat API")
+    parser.add_argument("--rates", default="1,2,4,8,16,32", help="comma separated arrival rates (req/s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per rate step")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request (s)")
+    parser.add_argument("--slo-ms", type=float, default=3000.0, help="p99 latency objective")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="write the throughput/latency curve to this file")
+    parser.add_argument("--target", help="use an already running API instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--warm", action="store_true",
+                        help="keep the response caches and single-flight coalescing on in the started worker")
+    parser.add_argument("--no-mock", action="store_true", help="do not start the mock Sarvam server")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-chat-latency-ms", type=float, default=600.0)
+    parser.add_argument("--mock-token-ms", type=float, default=10.0)
+    parser.add_argument("--mock-translate-latency-ms", type=float, default=250.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rates = [float(r) for r in args.rates.split(",") if r.strip()]
+    mock_proc = app_proc = None
+
+    try:
+        if not args.no_mock:
+            mock_proc = start_process([
+                sys.executable, "scripts/mock_sarvam.py",
+                "--port", str(args.mock_port),
+                "--chat-latency-ms", str(args.mock_chat_latency_ms),
+                "--token-ms", str(args.mock_token_ms),
+                "--translate-latency-ms", str(args.mock_translate_latency_ms),
+                "--error-rate", str(args.mock_error_rate),
+            ])
+            wait_until_up(f"http://127.0.0.1:{args.mock_port}/stats")
+            print(f"🧪 Mock Sarvam AI up on port {args.mock_port}")
+
+        target = args.target
+        if not target:
+            env = {
+                "SARVAM_API_KEY": os.getenv("SARVAM_API_KEY") or "mock-key",
+                # One client IP and no session ids: only the global admission cap applies
+                "ADMISSION_PER_IP": UNLIMITED,
+                "ADMISSION_PER_SESSION": UNLIMITED,
+            }
+            if not args.warm:
+                env.update({"ANSWER_CACHE_SIZE": "0", "TRANSLATION_CACHE_SIZE": "0",
+                            "EMBEDDING_CACHE_SIZE": "0", "SINGLE_FLIGHT_ENABLED": "false"})
+            if not args.no_mock:
+                env["SARVAM_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+            app_proc = start_process([
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(args.app_port),
+                "--workers", "1", "--log-level", "warning",
+            ], env=env)
+            target = f"http://127.0.0.1:{args.app_port}"
+            wait_until_up(f"{target}/")
+            print(f"🚀 API worker up at {target}")
+
+        rows = run_curve(f"{target}/chat", rates, args.duration, args.timeout, args.slo_ms, args.seed)
+
+        if args.csv and rows:
+            with open(args.csv, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+                writer.writerows(rows)
+            print(f"📄 Curve written to {args.csv}")
+
+        best = capacity_estimate(rows, args.slo_ms)
+        if best:
+            print(f"✅ Sustained {best['throughput_rps']:.2f} req/s at p99 {best['p99_ms']:.0f} ms "
+                  f"(offered {best['offered_rps']:.1f} req/s, SLO {args.slo_ms:.0f} ms)")
+        else:
+            print(f"❌ No step met the p99 SLO of {args.slo_ms:.0f} ms")
+    finally:
+        stop_process(app_proc)
+        stop_process(mock_proc)
+
+
+if __name__ == "__main__":
+    main()
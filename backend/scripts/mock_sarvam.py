@@ -0,0 +1,188 @@
+# backend/scripts/mock_sarvam.py
+"""
+Local stand-in for the Sarvam AI API, used by load_test.py.
+
+Speaks the same request/response shapes as the chat completion and translate
+endpoints so the real SarvamAI SDK can talk to it. Point the API at it with:
+
+    SARVAM_BASE_URL=http://127.0.0.1:9100 python -m uvicorn app.main:app
+
+Run standalone:
+
+    python scripts/mock_sarvam.py --port 9100 --chat-latency-ms 800 --token-ms 15
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# ------------------ CONFIG ------------------
+DEFAULTS = {
+    "chat_latency_ms": 600.0,      # time to first token
+    "token_ms": 10.0,              # per generated token
+    "translate_latency_ms": 250.0,
+    "jitter": 0.3,                 # +/- fraction applied to every delay
+    "error_rate": 0.0,             # fraction of requests answered with a 503
+    "completion_tokens": 120,      # tokens generated when max_tokens allows it
+}
+
+CANNED_ANSWER = (
+    "There are several openings that match your query. Clerk posts at the Deputy "
+    "Commissioner office, Ludhiana accept applications until the end of the month. "
+    "Candidates should be 12th pass and below 37 years of age. Apply online through "
+    "the PGRKAM portal with your Aadhaar card and educational certificates."
+)
+
+# Punjabi -> English lookups so translated queries still exercise the intent mix
+TRANSLATIONS = {
+    "ਲੁਧਿਆਣਾ ਵਿੱਚ ਸਰਕਾਰੀ ਨੌਕਰੀਆਂ": "government jobs in Ludhiana",
+    "12ਵੀਂ ਪਾਸ ਲਈ ਨੌਕਰੀਆਂ": "jobs for 12th pass",
+    "ਹੁਨਰ ਵਿਕਾਸ ਯੋਜਨਾ ਕੀ ਹੈ": "what is the skill development scheme",
+    "ਅਰਜ਼ੀ ਕਿਵੇਂ ਦੇਣੀ ਹੈ": "how to apply for a job",
+    "ਸਤ ਸ੍ਰੀ ਅਕਾਲ": "hello",
+}
+
+
+def _delay(ms: float, jitter: float) -> float:
+    spread = ms * jitter
+    return max(0.0, ms + random.uniform(-spread, spread)) / 1000.0
+
+
+def create_app(settings: dict) -> FastAPI:
+    app = FastAPI(title="Mock Sarvam AI")
+    stats = {"chat": 0, "chat_stream": 0, "translate": 0, "errors": 0}
+
+    def maybe_fail():
+        if settings["error_rate"] and random.random() < settings["error_rate"]:
+            stats["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": {"message": "mock upstream overloaded"}})
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        failure = maybe_fail()
+        if failure is not None:
+            return failure
+
+        max_tokens = body.get("max_tokens") or settings["completion_tokens"]
+        n_tokens = min(int(max_tokens), settings["completion_tokens"])
+        words = CANNED_ANSWER.split()
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model") or "sarvam-m"
+
+        await asyncio.sleep(_delay(settings["chat_latency_ms"], settings["jitter"]))
+
+        if body.get("stream"):
+            stats["chat_stream"] += 1
+
+            async def event_stream():
+                for i in range(n_tokens):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"role": "assistant", "content": words[i % len(words)] + " "},
+                            "finish_reason": None,
+                        }],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(_delay(settings["token_ms"], settings["jitter"]))
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+        stats["chat"] += 1
+        await asyncio.sleep(n_tokens * _delay(settings["token_ms"], settings["jitter"]))
+        content = " ".join(words[i % len(words)] for i in range(n_tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": n_tokens,
+                "total_tokens": prompt_tokens + n_tokens,
+            },
+        }
+
+    @app.post("/translate")
+    async def translate(request: Request):
+        body = await request.json()
+        failure = maybe_fail()
+        if failure is not None:
+            return failure
+
+        stats["translate"] += 1
+        text = body.get("input", "")
+        await asyncio.sleep(_delay(settings["translate_latency_ms"], settings["jitter"]))
+        if body.get("target_language_code") == "en-IN":
+            translated = TRANSLATIONS.get(text.strip(), text)
+        else:
+            translated = f"[pa] {text}"
+        return {
+            "request_id": uuid.uuid4().hex,
+            "translated_text": translated,
+            "source_language_code": body.get("source_language_code", "auto"),
+        }
+
+    @app.get("/stats")
+    def get_stats():
+        return {**stats, "settings": settings}
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Sarvam AI server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--chat-latency-ms", type=float, default=DEFAULTS["chat_latency_ms"])
+    parser.add_argument("--token-ms", type=float, default=DEFAULTS["token_ms"])
+    parser.add_argument("--translate-latency-ms", type=float, default=DEFAULTS["translate_latency_ms"])
+    parser.add_argument("--jitter", type=float, default=DEFAULTS["jitter"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULTS["error_rate"])
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULTS["completion_tokens"])
+    return parser.parse_args(argv)
+
+
+def settings_from_args(args) -> dict:
+    return {
+        "chat_latency_ms": args.chat_latency_ms,
+        "token_ms": args.token_ms,
+        "translate_latency_ms": args.translate_latency_ms,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "completion_tokens": args.completion_tokens,
+    }
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"🧪 Mock Sarvam AI listening on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -1,11 +1,75 @@
+import argparse
 import requests
 from bs4 import BeautifulSoup
 import json
 from urllib.parse import urljoin, urlparse
 import time
 
-def scrape_pgrkam_content():
-    base_url = "https://www.pgrkam.com"
+from scraper_fixtures import FixtureArchive, RecordingSession, serve
+
+BASE_URL = "https://www.pgrkam.com"
+
+def extract_content_links(html, base_url=BASE_URL, parser='html.parser'):
+    soup = BeautifulSoup(html, parser)
+    
+    schemes = []
+    training_programs = []
+    news_updates = []
+    
+    # Look for scheme-related links
+    scheme_keywords = ['scheme', 'yojana', 'benefit', 'subsidy', 'welfare']
+    training_keywords = ['training', 'skill', 'course', 'program', 'development']
+    news_keywords = ['news', 'update', 'announcement', 'notification', 'latest']
+    
+    # Find all links on the page
+    all_links = soup.find_all('a', href=True)
+    
+    for link in all_links:
+        href = link.get('href', '').lower()
+        text = link.get_text(strip=True).lower()
+        
+        # Categorize based on keywords
+        if any(keyword in href or keyword in text for keyword in scheme_keywords):
+            full_url = urljoin(base_url, link['href'])
+            schemes.append({
+                'title': link.get_text(strip=True),
+                'url': full_url,
+                'type': 'scheme'
+            })
+        
+        elif any(keyword in href or keyword in text for keyword in training_keywords):
+            full_url = urljoin(base_url, link['href'])
+            training_programs.append({
+                'title': link.get_text(strip=True),
+                'url': full_url,
+                'type': 'training'
+            })
+        
+        elif any(keyword in href or keyword in text for keyword in news_keywords):
+            full_url = urljoin(base_url, link['href'])
+            news_updates.append({
+                'title': link.get_text(strip=True),
+                'url': full_url,
+                'type': 'news'
+            })
+    
+    # Remove duplicates and empty titles
+    schemes = [s for s in schemes if s['title'] and len(s['title']) > 3]
+    training_programs = [t for t in training_programs if t['title'] and len(t['title']) > 3]
+    news_updates = [n for n in news_updates if n['title'] and len(n['title']) > 3]
+    
+    # Limit to 20 each and remove duplicates
+    schemes = list({s['title']: s for s in schemes}.values())[:20]
+    training_programs = list({t['title']: t for t in training_programs}.values())[:20]
+    news_updates = list({n['title']: n for n in news_updates}.values())[:20]
+    
+    return schemes, training_programs, news_updates
+
+def scrape_pgrkam_content(session=None, fetch_url=None):
+    # session: a requests.Session (e.g. RecordingSession); fetch_url: where to
+    # fetch the main page from instead of base_url (a local replay server)
+    base_url = BASE_URL
+    session = session or requests.Session()
     
     # URLs to scrape for different content types
     urls_to_check = [
@@ -30,55 +94,8 @@ def scrape_pgrkam_content():
     
     # First, get the main page to find actual links
     try:
-        response = requests.get(base_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Look for scheme-related links
-        scheme_keywords = ['scheme', 'yojana', 'benefit', 'subsidy', 'welfare']
-        training_keywords = ['training', 'skill', 'course', 'program', 'development']
-        news_keywords = ['news', 'update', 'announcement', 'notification', 'latest']
-        
-        # Find all links on the page
-        all_links = soup.find_all('a', href=True)
-        
-        for link in all_links:
-            href = link.get('href', '').lower()
-            text = link.get_text(strip=True).lower()
-            
-            # Categorize based on keywords
-            if any(keyword in href or keyword in text for keyword in scheme_keywords):
-                full_url = urljoin(base_url, link['href'])
-                schemes.append({
-                    'title': link.get_text(strip=True),
-                    'url': full_url,
-                    'type': 'scheme'
-                })
-            
-            elif any(keyword in href or keyword in text for keyword in training_keywords):
-                full_url = urljoin(base_url, link['href'])
-                training_programs.append({
-                    'title': link.get_text(strip=True),
-                    'url': full_url,
-                    'type': 'training'
-                })
-            
-            elif any(keyword in href or keyword in text for keyword in news_keywords):
-                full_url = urljoin(base_url, link['href'])
-                news_updates.append({
-                    'title': link.get_text(strip=True),
-                    'url': full_url,
-                    'type': 'news'
-                })
-        
-        # Remove duplicates and empty titles
-        schemes = [s for s in schemes if s['title'] and len(s['title']) > 3]
-        training_programs = [t for t in training_programs if t['title'] and len(t['title']) > 3]
-        news_updates = [n for n in news_updates if n['title'] and len(n['title']) > 3]
-        
-        # Limit to 20 each and remove duplicates
-        schemes = list({s['title']: s for s in schemes}.values())[:20]
-        training_programs = list({t['title']: t for t in training_programs}.values())[:20]
-        news_updates = list({n['title']: n for n in news_updates}.values())[:20]
+        response = session.get(fetch_url or base_url, headers=headers, timeout=10)
+        schemes, training_programs, news_updates = extract_content_links(response.content, base_url)
         
     except Exception as e:
         print(f"Error scraping main page: {e}")
@@ -152,8 +169,24 @@ def scrape_pgrkam_content():
     }
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape schemes, training and news links from pgrkam.com")
+    parser.add_argument("--record", metavar="ARCHIVE", help="Also save fetched pages into a fixture archive")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="Fetch from a fixture archive through a local server")
+    args = parser.parse_args()
+
     print("Scraping PGRKAM content...")
-    content = scrape_pgrkam_content()
+    if args.record:
+        archive = FixtureArchive(args.record, "w")
+        content = scrape_pgrkam_content(session=RecordingSession(archive))
+        archive.save()
+        print(f"Fixtures saved to {args.record}")
+    elif args.replay:
+        archive = FixtureArchive(args.replay)
+        server = serve(archive, origin=BASE_URL)
+        content = scrape_pgrkam_content(fetch_url=f"http://127.0.0.1:{server.server_address[1]}/")
+        server.shutdown()
+    else:
+        content = scrape_pgrkam_content()
     
     print(f"\nFound {len(content['schemes'])} schemes:")
     for i, scheme in enumerate(content['schemes'][:10], 1):
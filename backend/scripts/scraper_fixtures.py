@@ -0,0 +1,319 @@
+# backend/scripts/scraper_fixtures.py
+"""
+Record/replay fixtures for the pgrkam.com scrapers.
+
+A fixture archive is a single deflate-compressed zip:
+
+    manifest.json   one entry per recorded item (kind, url, status, headers, body name)
+    bodies/<sha1>   response bodies and HTML snapshots, stored once per distinct content
+
+Entries come in two kinds:
+
+    response   a network response, keyed by method + URL (+ POST body), as the
+               browser or `requests` received it
+    listing /  rendered DOM snapshots taken by job_scraper.py while recording:
+    modal /    each listing page after it loaded, the #descriptionModal body
+    detail     after each "+ More" click, and job detail pages
+
+Recording goes through Playwright routing (job_scraper.py --record) or a
+RecordingSession (pgrkam_content_scraper.py --record). Recording into an existing
+archive merges with it, so both scrapers can share one file.
+
+Replay never touches the network:
+
+    - Playwright: install_routes() fulfills every request from the archive
+      (404 for anything not recorded)
+    - requests / curl / a browser: `serve` runs a local HTTP server that maps
+      its paths onto the recorded origin
+
+Usage (from backend/):
+
+    python scripts/job_scraper.py --record data/fixtures/pgrkam.zip --details 20
+    python scripts/pgrkam_content_scraper.py --record data/fixtures/pgrkam.zip
+    python scripts/scraper_fixtures.py list data/fixtures/pgrkam.zip
+    python scripts/scraper_fixtures.py serve data/fixtures/pgrkam.zip --port 8765
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ARCHIVE = os.path.join(BACKEND_DIR, "data", "fixtures", "pgrkam.zip")
+DEFAULT_ORIGIN = "https://www.pgrkam.com"
+
+# Bodies are stored decoded, so transfer headers from the live response no longer apply
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+SNAPSHOT_KINDS = ("listing", "modal", "detail")
+
+
+# ------------------ ARCHIVE ------------------
+class FixtureArchive:
+    def __init__(self, path: str, mode: str = "r"):
+        if mode not in ("r", "w"):
+            raise ValueError(f"Unknown archive mode '{mode}' (expected 'r' or 'w')")
+        self.path = path
+        self.mode = mode
+        self.entries: Dict[str, dict] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._zip = None
+        if os.path.exists(path):
+            self._zip = zipfile.ZipFile(path)
+            self.entries = json.loads(self._zip.read("manifest.json"))
+            if mode == "w":
+                # Merge: carry the existing bodies over into the rewritten archive
+                self._bodies = {name: self._zip.read(f"bodies/{name}") for name in self._body_names()}
+                self._zip.close()
+                self._zip = None
+        elif mode == "r":
+            raise FileNotFoundError(f"No fixture archive at {path}")
+        self._order = max((e.get("order", 0) for e in self.entries.values()), default=0)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "w"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "r"
+
+    @staticmethod
+    def response_key(method: str, url: str, post_data: Optional[str] = None) -> str:
+        key = f"response {method.upper()} {url}"
+        if post_data:
+            key += " " + hashlib.sha1(post_data.encode("utf-8")).hexdigest()[:12]
+        return key
+
+    def _body_names(self):
+        return {entry["body"] for entry in self.entries.values()}
+
+    def _store(self, body: bytes) -> str:
+        name = hashlib.sha1(body).hexdigest()
+        self._bodies.setdefault(name, body)
+        return name
+
+    def body(self, entry: dict) -> bytes:
+        if entry["body"] in self._bodies:
+            return self._bodies[entry["body"]]
+        with self._lock:
+            return self._zip.read(f"bodies/{entry['body']}")
+
+    # --- Record ---
+    def put_response(self, method: str, url: str, post_data: Optional[str], status: int,
+                     headers: Dict[str, str], body: bytes):
+        headers = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        with self._lock:
+            self.entries[self.response_key(method, url, post_data)] = {
+                "kind": "response", "method": method.upper(), "url": url, "status": status,
+                "headers": headers, "body": self._store(body),
+            }
+
+    def put_snapshot(self, kind: str, key: str, html: str):
+        with self._lock:
+            self._order += 1
+            self.entries[f"{kind} {key}"] = {
+                "kind": kind, "url": key, "order": self._order, "body": self._store(html.encode("utf-8")),
+            }
+
+    def forget_snapshots(self, prefix: str):
+        """
+        Drops snapshots under a listing URL before it is re-recorded, so pages
+        from an older, longer run don't linger.
+        """
+        with self._lock:
+            for key in [k for k, e in self.entries.items() if e["kind"] in SNAPSHOT_KINDS and e["url"].startswith(prefix)]:
+                del self.entries[key]
+
+    def save(self):
+        if not self.recording:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            zf.writestr("manifest.json", json.dumps(self.entries, ensure_ascii=False, indent=1))
+            for name in sorted(self._body_names()):
+                zf.writestr(f"bodies/{name}", self._bodies[name])
+        os.replace(tmp, self.path)
+
+    # --- Replay ---
+    def get_response(self, method: str, url: str, post_data: Optional[str] = None) -> Optional[dict]:
+        entry = self.entries.get(self.response_key(method, url, post_data))
+        if entry is None:
+            self.misses += 1
+            return None
+        return {**entry, "body": self.body(entry)}
+
+    def snapshots(self, kind: str) -> List[Tuple[str, str]]:
+        """
+        (key, html) of every snapshot of one kind, in recording order.
+        """
+        found = sorted((e for e in self.entries.values() if e["kind"] == kind), key=lambda e: e["order"])
+        return [(e["url"], self.body(e).decode("utf-8")) for e in found]
+
+    def html_documents(self) -> List[Tuple[str, str]]:
+        """
+        Every recorded HTML page: document responses plus listing/detail snapshots.
+        """
+        docs = []
+        for entry in self.entries.values():
+            if entry["kind"] == "response" and "html" in _content_type(entry) and entry["status"] == 200:
+                docs.append((entry["url"], self.body(entry).decode("utf-8", errors="replace")))
+        for kind in ("listing", "detail"):
+            docs.extend(self.snapshots(kind))
+        return docs
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+def _content_type(entry: dict) -> str:
+    for key, value in entry.get("headers", {}).items():
+        if key.lower() == "content-type":
+            return value.lower()
+    return ""
+
+
+# ------------------ PLAYWRIGHT ROUTING ------------------
+def install_routes(context, archive: FixtureArchive):
+    """
+    Routes every request of a Playwright BrowserContext through the archive:
+    live + saved when recording, served from the archive when replaying.
+    """
+    if archive.recording:
+        def handler(route, request):
+            try:
+                response = route.fetch()
+                body = response.body()
+            except Exception:
+                route.abort()
+                return
+            archive.put_response(request.method, request.url, request.post_data,
+                                 response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+    else:
+        def handler(route, request):
+            hit = archive.get_response(request.method, request.url, request.post_data)
+            if hit is None:
+                route.fulfill(status=404, body="")
+                return
+            route.fulfill(status=hit["status"], headers=hit["headers"], body=hit["body"])
+
+    context.route("**/*", handler)
+
+
+# ------------------ REQUESTS ------------------
+class RecordingSession(requests.Session):
+    """
+    requests.Session that saves every response it receives into the archive.
+    """
+
+    def __init__(self, archive: FixtureArchive):
+        super().__init__()
+        self.archive = archive
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        data = kwargs.get("data")
+        for r in response.history + [response]:
+            # Redirect hops too, so replay starts from the same URL
+            self.archive.put_response(r.request.method, r.request.url, data if isinstance(data, str) else None,
+                                      r.status_code, dict(r.headers), r.content)
+        return response
+
+
+# ------------------ LOCAL SERVER ------------------
+def serve(archive: FixtureArchive, port: int = 0, origin: str = DEFAULT_ORIGIN) -> ThreadingHTTPServer:
+    """
+    Serves recorded responses of `origin` on 127.0.0.1:<port> from a background
+    thread (`server.server_address` has the bound port; `server.shutdown()` stops it).
+    """
+    origin = origin.rstrip("/")
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, method: str):
+            length = int(self.headers.get("Content-Length") or 0)
+            post_data = self.rfile.read(length).decode("utf-8", errors="replace") if length else None
+            hit = archive.get_response(method, origin + self.path, post_data)
+            if hit is None:
+                self.send_error(404, "Not recorded")
+                return
+            self.send_response(hit["status"])
+            local = f"http://127.0.0.1:{self.server.server_address[1]}"
+            for key, value in hit["headers"].items():
+                if key.lower() == "location" and value.startswith(origin):
+                    value = local + value[len(origin):]  # keep redirects on the replay server
+                if key.lower() not in ("server", "date"):
+                    self.send_header(key, value)
+            self.send_header("Content-Length", str(len(hit["body"])))
+            self.end_headers()
+            self.wfile.write(hit["body"])
+
+        def do_GET(self):
+            self._reply("GET")
+
+        def do_POST(self):
+            self._reply("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ------------------ MAIN ------------------
+def describe(archive: FixtureArchive):
+    kinds = Counter(entry["kind"] for entry in archive.entries.values())
+    hosts = Counter(urlsplit(e["url"]).netloc for e in archive.entries.values() if e["kind"] == "response")
+    stored = sum(info.compress_size for info in archive._zip.infolist()) if archive._zip else 0
+    raw = sum(info.file_size for info in archive._zip.infolist()) if archive._zip else 0
+    print(f"📦 {archive.path}: {len(archive.entries)} entries, {raw / 2**20:.1f} MB raw, "
+          f"{stored / 2**20:.1f} MB compressed")
+    for kind, count in sorted(kinds.items()):
+        print(f"   {kind:<9} {count}")
+    for host, count in hosts.most_common(10):
+        print(f"   {count:>5}  {host}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or serve a scraper fixture archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_cmd = sub.add_parser("list", help="Summarize an archive")
+    list_cmd.add_argument("archive", nargs="?", default=DEFAULT_ARCHIVE)
+    serve_cmd = sub.add_parser("serve", help="Serve recorded responses over HTTP")
+    serve_cmd.add_argument("archive", nargs="?", default=DEFAULT_ARCHIVE)
+    serve_cmd.add_argument("--port", type=int, default=8765)
+    serve_cmd.add_argument("--origin", default=DEFAULT_ORIGIN)
+    args = parser.parse_args()
+
+    archive = FixtureArchive(args.archive)
+    if args.command == "list":
+        describe(archive)
+        return
+
+    server = serve(archive, args.port, args.origin)
+    print(f"🚀 Replaying {args.origin} from {args.archive} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n[INFO] Stopped ({archive.misses} requests were not in the archive)")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# backend/scripts/serve_prefork.py
+"""
+Pre-fork server: load once, fork many.
+
+`uvicorn --workers N` starts N fresh interpreters that each load GLiNER, the
+reranker, the BM25 structures and the facet index, so memory grows linearly
+with workers. This script instead loads everything in the parent
+(app.core.warmup), moves the loaded objects out of the garbage collector's
+reach with gc.freeze() so collections in the workers don't write to their
+pages, and then forks the workers, which share those pages copy-on-write and
+serve on one inherited listening socket.
+
+The parent supervises the workers (restarting any that die) and prints
+per-worker memory from /proc/<pid>/smaps_rollup: USS (private, what each extra
+worker really costs), PSS (fair share of shared pages) and RSS.
+
+Usage (from backend/):
+
+    python scripts/serve_prefork.py --workers 4 --port 8000
+    python scripts/serve_prefork.py --workers 4 --no-preload        # baseline: every worker loads its own copy
+    python scripts/serve_prefork.py --workers 4 --report-interval 60
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+# ------------------ MEMORY REPORT ------------------
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """
+    Memory of one process in kB (Linux 4.14+).
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    fields[key] = int(value.split()[0])
+    except (FileNotFoundError, ProcessLookupError):
+        return {}
+    fields["Uss"] = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields
+
+
+def print_memory_report(parent_pid: int, workers: List[int]):
+    print(f"\n📊 Memory per process (MB)")
+    print(f"{'process':<16} {'pid':>8} {'USS':>8} {'PSS':>8} {'RSS':>8} {'shared':>8}")
+    total_uss = total_pss = 0.0
+    for name, pid in [("parent", parent_pid)] + [(f"worker {i}", pid) for i, pid in enumerate(workers)]:
+        mem = smaps_rollup(pid)
+        if not mem:
+            continue
+        shared = mem.get("Shared_Clean", 0) + mem.get("Shared_Dirty", 0)
+        print(f"{name:<16} {pid:>8} {mem['Uss'] / 1024:>8.1f} {mem.get('Pss', 0) / 1024:>8.1f} "
+              f"{mem.get('Rss', 0) / 1024:>8.1f} {shared / 1024:>8.1f}")
+        total_uss += mem["Uss"] / 1024
+        total_pss += mem.get("Pss", 0) / 1024
+    print(f"{'total':<16} {'':>8} {total_uss:>8.1f} {total_pss:>8.1f}   (PSS total = real memory used by the tree)\n")
+
+
+# ------------------ PRELOAD ------------------
+def fetch_page(offset: int, limit: int) -> dict:
+    """
+    Reads one page of the job corpus from the vector store. Runs in a spawned
+    interpreter so the parent never initializes Chroma, which cannot be used after fork.
+    """
+    os.chdir(BACKEND_DIR)
+    from app.rag.vector_store import get_collection
+    return get_collection().get(limit=limit, offset=offset, include=["documents", "metadatas"])
+
+
+def read_corpus_pages():
+    from app.core import config
+    if config.VECTOR_BACKEND != "chroma":
+        return None  # the flat index is plain mmapped arrays, safe to open before fork
+    return _pages_from_helper(config.CORPUS_PAGE_SIZE)
+
+
+def _pages_from_helper(page_size: int):
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        offset = 0
+        while True:
+            page = pool.apply(fetch_page, (offset, page_size))
+            if page["ids"]:
+                yield page
+            if len(page["ids"]) < page_size:
+                return
+            offset += page_size
+
+
+# ------------------ WORKERS ------------------
+def limit_torch_threads(threads: int):
+    # Keep OpenMP/intra-op pools from starting in the parent; they do not survive fork
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def run_worker(sock: socket.socket, args, app):
+    import uvicorn
+
+    gc.enable()
+    if args.worker_threads:
+        limit_torch_threads(args.worker_threads)
+    config = uvicorn.Config(
+        app if app is not None else "app.main:app",
+        log_level=args.log_level,
+        timeout_keep_alive=5,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(sock: socket.socket, args, app) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            run_worker(sock, args, app)
+        except Exception as e:
+            print(f"❌ Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+# ------------------ MAIN ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork server sharing loaded models copy-on-write")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker-threads", type=int, default=0, help="torch threads per worker (0 = leave default)")
+    parser.add_argument("--no-preload", action="store_true", help="Load models in each worker (for comparison)")
+    parser.add_argument("--report-after", type=float, default=5.0, help="Seconds after start for the first memory report")
+    parser.add_argument("--report-interval", type=float, default=0, help="Repeat the memory report every N seconds (0 = once)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)  # data/ paths are relative to backend/
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    app = None
+    if not args.no_preload:
+        # No collections while loading: objects stay where they were allocated
+        gc.disable()
+        limit_torch_threads(1)
+        from app.core.warmup import warm_up
+        warm_up(read_corpus_pages())
+        from app.main import app
+        # Move everything loaded so far to the permanent generation, so
+        # worker GCs never touch (and un-share) these pages
+        gc.collect()
+        gc.freeze()
+        print(f"🧊 Froze {gc.get_freeze_count()} objects before forking.")
+
+    workers: Dict[int, int] = {}  # pid -> slot
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(args.workers):
+        workers[spawn(sock, args, app)] = slot
+    mode = "shared (pre-loaded)" if app is not None else "per-worker (no preload)"
+    print(f"🚀 {args.workers} workers on http://{args.host}:{args.port}, models {mode}")
+
+    next_report = time.monotonic() + args.report_after
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            slot = workers.pop(pid, None)
+            if not stopping and slot is not None:
+                print(f"⚠️ Worker {pid} exited ({status}), restarting.")
+                workers[spawn(sock, args, app)] = slot
+            continue
+        if next_report and time.monotonic() >= next_report and not stopping:
+            print_memory_report(os.getpid(), sorted(workers, key=workers.get))
+            next_report = time.monotonic() + args.report_interval if args.report_interval else 0
+        time.sleep(0.2)
+
+    sock.close()
+    print("🛑 All workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionLimiter, AdmissionRejected, _networks, client_ip
+
+PROXIES = _networks(["10.0.0.0/8", "127.0.0.1"])
+
+
+def scope(peer, **headers):
+    return {"client": (peer, 5000),
+            "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]}
+
+
+def test_peer_is_used_without_trusted_proxies():
+    assert client_ip(scope("10.0.0.5", x_forwarded_for="1.2.3.4"), trusted=[]) == "10.0.0.5"
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peer():
+    assert client_ip(scope("8.8.8.8", x_forwarded_for="1.2.3.4"), PROXIES) == "8.8.8.8"
+
+
+def test_rightmost_untrusted_hop_wins():
+    forged = scope("10.0.0.5", x_forwarded_for="6.6.6.6, 1.2.3.4, 10.0.0.9")
+    assert client_ip(forged, PROXIES) == "1.2.3.4"
+
+
+def test_real_ip_fallback():
+    assert client_ip(scope("127.0.0.1", x_real_ip="1.2.3.4"), PROXIES) == "1.2.3.4"
+    assert client_ip(scope("127.0.0.1"), PROXIES) == "127.0.0.1"
+
+
+def test_invalid_entries_are_skipped():
+    assert _networks(["bogus", "192.168.0.0/16"]) == _networks(["192.168.0.0/16"])
+
+
+def test_per_ip_cap_is_per_forwarded_client():
+    async def run():
+        limiter = AdmissionLimiter(max_inflight=10, max_queue=0, max_wait=0, per_session=5, per_ip=1)
+        first = client_ip(scope("10.0.0.5", x_forwarded_for="1.1.1.1"), PROXIES)
+        second = client_ip(scope("10.0.0.5", x_forwarded_for="2.2.2.2"), PROXIES)
+        await limiter.acquire(None, first)
+        await limiter.acquire(None, second)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire(None, first)
+        assert rejected.value.status == 429
+        limiter.release(None, first)
+        await limiter.acquire(None, first)
+
+    asyncio.run(run())
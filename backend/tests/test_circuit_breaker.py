@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.sarvam_client import CircuitBreaker, CircuitOpenError
+
+
+def breaker(cooldown=0.0):
+    return CircuitBreaker("test", error_rate=0.5, min_calls=2, window=60, cooldown=cooldown)
+
+
+def trip(b):
+    for _ in range(2):
+        b.record(False, b.before_call())
+
+
+def test_opens_on_errors_and_fails_fast():
+    b = breaker(cooldown=60)
+    trip(b)
+    assert b.state == "open"
+    with pytest.raises(CircuitOpenError):
+        b.before_call()
+
+
+def test_probe_closes_it():
+    b = breaker()
+    trip(b)
+    probe = b.before_call()
+    with pytest.raises(CircuitOpenError):
+        b.before_call()  # one probe at a time
+    b.record(True, probe)
+    assert b.state == "closed"
+
+
+def test_call_started_before_opening_is_not_the_probe():
+    b = breaker()
+    slow = b.before_call()  # admitted while closed, still running
+    trip(b)
+    probe = b.before_call()
+    b.record(True, slow)
+    assert b.state == "half_open"
+    b.record(False, probe)
+    b.record(True, slow)
+    assert b.state == "half_open"  # the failed probe reopened it, the stale success changes nothing
+    b.record(True, b.before_call())
+    assert b.state == "closed"
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from app.core import config
+from app.rag.compaction import expired_where, expiry_cutoff
+from app.rag.job_fields import matches_where
+
+
+def test_expiry_cutoff_applies_the_grace_period(monkeypatch):
+    monkeypatch.setattr(config, "EXPIRY_GRACE_DAYS", 2)
+    assert expiry_cutoff(datetime(2027, 3, 1, 15, 45)) == datetime(2027, 2, 27)
+
+
+def test_expired_where():
+    where = expired_where(datetime(2027, 1, 15))
+    assert matches_where({"deadline": 20270114}, where)
+    assert not matches_where({"deadline": 20270115}, where)
+    assert not matches_where({"deadline": 20270301}, where)
+    # Unknown deadlines (0 or missing) never expire
+    assert not matches_where({"deadline": 0}, where)
+    assert not matches_where({}, where)
@@ -0,0 +1,49 @@
+from app.rag.dedup import NearDuplicateIndex
+
+CLERK = "JOB_TYPE: Government\nROLE: Clerk Typist\nORGANIZATION: {}\nLOCATION: Patiala\nQUALIFICATION: 12th pass\nAPPLY LINK: {}\n"
+ENGINEER = "JOB_TYPE: Private Sector\nROLE: Software Engineer\nORGANIZATION: Infosys\nLOCATION: Mohali\nQUALIFICATION: B.Tech\n"
+
+
+def index():
+    return NearDuplicateIndex(num_perm=64, bands=16, threshold=0.8)
+
+
+def test_reposted_vacancy_is_folded_into_the_first_posting():
+    dedup = index()
+    assert dedup.assign("1", CLERK.format("PSSSB", "a"), {"apply_link": "a"}) == "1"
+    assert dedup.assign("2", CLERK.format("Agency", "b"), {"apply_link": "b"}) == "1"
+    assert dedup.assign("3", ENGINEER) == "3"
+    assert dedup.is_duplicate("2") and not dedup.is_duplicate("1")
+    assert dedup.alternates("1") == [{"apply_link": "b"}]
+    assert dedup.stats() == {"canonical": 2, "duplicates": 1, "clusters": 1}
+
+
+def test_removing_a_duplicate_keeps_the_cluster():
+    dedup = index()
+    dedup.assign("1", CLERK.format("PSSSB", "a"))
+    dedup.assign("2", CLERK.format("Agency", "b"))
+    assert dedup.remove("2") == ("1", [])
+    assert dedup.members["1"] == []
+    assert dedup.known_ids() == {"1"}
+
+
+def test_removing_the_canonical_orphans_its_members():
+    dedup = index()
+    dedup.assign("1", CLERK.format("PSSSB", "a"))
+    dedup.assign("2", CLERK.format("Agency", "b"))
+    dedup.assign("3", CLERK.format("Other", "c"))
+    canonical, orphans = dedup.remove("1")
+    assert canonical is None and orphans == ["2", "3"]
+    assert dedup.known_ids() == set()
+    # Re-assigned in order, the oldest orphan becomes the new canonical
+    assert dedup.assign("2", CLERK.format("Agency", "b")) == "2"
+    assert dedup.assign("3", CLERK.format("Other", "c")) == "2"
+
+
+def test_reassigning_an_id_replaces_its_previous_version():
+    dedup = index()
+    dedup.assign("1", CLERK.format("PSSSB", "a"))
+    dedup.assign("2", CLERK.format("Agency", "b"))
+    # Edited into a different job: it leaves the cluster
+    assert dedup.assign("2", ENGINEER) == "2"
+    assert dedup.members == {"1": [], "2": []}
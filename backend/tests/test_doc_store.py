@@ -0,0 +1,53 @@
+import numpy as np
+
+from app.rag.doc_store import DocStore
+
+IDS = ["a", "b", "c", "d"]
+DOCS = ["ROLE: Clerk", "ROLE: Engineer", "ROLE: Teacher", "ROLE: Nurse"]
+METAS = [
+    {"district": "patiala", "type": "govt", "deadline": 20270115, "job_id": "a"},
+    {"district": "mohali", "type": "private", "job_id": "b"},
+    {"district": "patiala", "type": "govt", "deadline": 20250101, "job_id": "c"},
+    {"type": "private", "remote": True, "job_id": "d"},
+]
+
+
+def build(ids=IDS, docs=DOCS, metas=METAS):
+    store = DocStore()
+    store.add(ids, docs, metas)
+    return store.finalize()
+
+
+def test_round_trip():
+    store = build()
+    assert len(store) == 4
+    for i, (doc_id, doc, meta) in enumerate(zip(IDS, DOCS, METAS)):
+        assert store.get(i) == {"id": doc_id, "content": doc, "meta": meta}
+
+
+def test_id_mask():
+    store = build()
+    assert store.id_mask({"b", "d", "missing"}).tolist() == [False, True, False, True]
+    assert not store.id_mask(set()).any()
+
+
+def test_mask_matches_where_semantics():
+    store = build()
+    assert store.mask({"district": "patiala"}).tolist() == [True, False, True, False]
+    assert store.mask({"$and": [{"deadline": {"$gt": 0}}, {"deadline": {"$lt": 20260101}}]}).tolist() == \
+        [False, False, True, False]
+    assert store.mask({"$or": [{"type": "private"}, {"district": "patiala"}]}).all()
+    assert store.mask({"job_id": {"$in": ["a", "d"]}}).tolist() == [True, False, False, True]
+
+
+def test_updated_matches_fresh_build():
+    keep = np.array([True, False, True, False])
+    new_ids, new_docs = ["c", "e"], ["ROLE: Senior Teacher", "ROLE: Driver"]
+    new_metas = [{"district": "amritsar", "type": "govt", "job_id": "c"}, {"type": "private", "job_id": "e"}]
+    # "c" is replaced: the caller drops its old version through `keep`
+    keep &= ~build().id_mask(set(new_ids))
+    updated = build().updated(keep, new_ids, new_docs, new_metas)
+    fresh = build(["a"] + new_ids, [DOCS[0]] + new_docs, [METAS[0]] + new_metas)
+
+    assert [updated.get(i) for i in range(len(updated))] == [fresh.get(i) for i in range(len(fresh))]
+    assert updated.mask({"type": "govt"}).tolist() == fresh.mask({"type": "govt"}).tolist()
@@ -0,0 +1,39 @@
+from app.rag.facet_index import FacetIndex
+
+
+def job(district, qualification, age, deadline, post="Clerk"):
+    return {"place_of_posting": district, "required_qualification": qualification,
+            "maximum_applicable_age": age, "last_apply_date": deadline, "name_of_post": post}
+
+
+RECORDS = [
+    ("1", job("Patiala", "12th", "30", "15-01-2027"), "govt"),
+    ("2", job("Mohali", "B.Tech", "N/A", "N/A"), "private"),
+    ("3", job("Patiala", "Graduate", "25", "01-01-2025"), "govt"),
+    ("4", job("Ludhiana", "10th", "40", "20-02-2027"), "private"),
+]
+FILTERS = [{}, {"districts": ["patiala"]}, {"job_type": "govt"}, {"age": 28}, {"qualification_level": 2},
+           {"deadline_from": 20260101}, {"districts": ["amritsar", "mohali"], "age": 35}]
+
+
+def ids(index, **filters):
+    return sorted(row["id"] for row in index.search(limit=100, **filters))
+
+
+def test_updated_matches_full_rebuild():
+    changed = ("4", job("Amritsar", "12th", "35", "10-03-2027"), "govt")
+    added = ("5", job("Mohali", "Diploma", "45", "N/A", post="Electrician"), "private")
+    updated = FacetIndex.build(RECORDS).updated({"3"}, [changed, added])
+    rebuilt = FacetIndex.build([RECORDS[0], RECORDS[1], changed, added])
+
+    assert updated.size == rebuilt.size == 4
+    for filters in FILTERS:
+        assert ids(updated, **filters) == ids(rebuilt, **filters), filters
+        assert updated.facet_counts("district", **filters) == rebuilt.facet_counts("district", **filters)
+    assert {row["id"]: row for row in updated.rows} == {row["id"]: row for row in rebuilt.rows}
+
+
+def test_updated_from_empty_index():
+    updated = FacetIndex.build([]).updated(set(), RECORDS)
+    for filters in FILTERS:
+        assert ids(updated, **filters) == ids(FacetIndex.build(RECORDS), **filters)
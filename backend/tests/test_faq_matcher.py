@@ -0,0 +1,33 @@
+from app.rag.faq_matcher import FaqMatcher
+
+FAQS = [
+    {"question": "How to apply for government jobs in Punjab?", "answer": "Apply on the PGRKAM portal."},
+    {"question": "What documents are required for job application?", "answer": "Aadhaar and certificates."},
+    {"question": "What is the age limit for government jobs?", "answer": "Usually 18-37 years."},
+    {"question": "How to check application status?", "answer": "See My Applications."},
+    {"question": "What is PGRKAM?", "answer": "Punjab's employment portal."},
+]
+
+
+def question(matcher, text):
+    hit = matcher.match(text, record=False)
+    return hit and hit["faq"]["question"]
+
+
+def test_reworded_questions_match():
+    matcher = FaqMatcher(FAQS)
+    assert question(matcher, "how to apply for government jobs punjab") == FAQS[0]["question"]
+    assert question(matcher, "age limit for government jobs") == FAQS[2]["question"]
+    assert question(matcher, "how do i check my application status") == FAQS[3]["question"]
+
+
+def test_job_search_is_not_an_faq():
+    matcher = FaqMatcher(FAQS)
+    assert question(matcher, "government jobs in Punjab") is None
+
+
+def test_embedding_tier_skips_partial_queries():
+    # Every text embeds to the same vector: only the word checks decide
+    matcher = FaqMatcher(FAQS, embed=lambda texts: [[1.0, 0.0] for _ in texts])
+    assert question(matcher, "government jobs in Punjab") is None
+    assert question(matcher, "how can I apply for govt jobs in punjab") == FAQS[0]["question"]
@@ -0,0 +1,33 @@
+from app.nlu.entity_extractor import extract_entities_fast
+from app.rag.fast_path import is_structured_query
+
+
+def structured(query: str, intent: str = "search_job") -> bool:
+    return is_structured_query(query, intent, extract_entities_fast(query))
+
+
+def test_fully_described_search_is_structured():
+    assert structured("govt clerk jobs in Patiala for 12th pass")
+    assert structured("show me private jobs in Ludhiana")
+
+
+def test_age_in_years_is_structured():
+    assert structured("jobs in Amritsar for 25 years old")
+
+
+def test_unparsed_age_limit_falls_back():
+    # The extractor only reads "NN years": "under 30" would be dropped from the filters
+    assert not structured("govt jobs in Patiala for 12th pass under 30")
+
+
+def test_unconsumed_number_falls_back():
+    assert not structured("jobs in Mohali with 5 vacancies")
+
+
+def test_unknown_content_word_falls_back():
+    assert not structured("govt jobs in Patiala with good salary")
+
+
+def test_requires_search_intent_and_a_filter():
+    assert not structured("govt jobs in Patiala", intent="scheme_info")
+    assert not structured("show me jobs")
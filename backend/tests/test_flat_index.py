@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.rag import flat_index
+from app.rag.flat_index import FlatCollection
+
+
+def vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def upsert(collection, start, vecs, **meta):
+    ids = [str(i) for i in range(start, start + len(vecs))]
+    collection.upsert([f"doc {i}" for i in ids], [{"n": int(i), **meta} for i in ids], ids, embeddings=vecs)
+
+
+def test_batched_upserts_append(tmp_path):
+    data = vectors(300)
+    collection = FlatCollection(str(tmp_path), None)
+    for start in range(0, 300, 100):
+        upsert(collection, start, data[start:start + 100])
+    assert collection.count() == 300
+    # One file per array, grown by appends: exactly one row per vector
+    assert (tmp_path / flat_index.VECTORS_FILE).stat().st_size == 300 * 16 * 2
+    assert collection.query(query_embeddings=[data[42]], n_results=1)["ids"] == [["42"]]
+
+
+def test_replace_delete_and_reopen(tmp_path):
+    data = vectors(100)
+    collection = FlatCollection(str(tmp_path), None)
+    upsert(collection, 0, data)
+    collection.upsert(["new 7"], [{"n": 7}], ["7"], embeddings=[data[50] * -1])
+    collection.delete(where={"n": {"$lt": 5}})
+
+    for reopened in (collection, FlatCollection(str(tmp_path), None, codes="binary")):
+        assert reopened.count() == 95
+        assert reopened.get(ids=["7"])["documents"] == ["new 7"]
+        assert reopened.get(ids=["3"])["ids"] == []
+        hits = reopened.query(query_embeddings=[data[7]], n_results=95)["ids"][0]
+        assert "7" not in hits[:10] and "3" not in hits
+
+
+def test_compacts_once_enough_rows_are_dead(tmp_path):
+    data = vectors(100)
+    collection = FlatCollection(str(tmp_path), None)
+    upsert(collection, 0, data)
+    collection.delete(ids=[str(i) for i in range(20)])
+    assert collection._snapshot.dead == 20
+    collection.delete(ids=[str(i) for i in range(20, 30)])
+    assert collection._snapshot.dead == 0
+    assert len(collection._snapshot) == collection.count() == 70
+    assert collection.query(query_embeddings=[data[99]], n_results=1)["ids"] == [["99"]]
+
+
+def test_readers_keep_their_snapshot(tmp_path):
+    data = vectors(50)
+    collection = FlatCollection(str(tmp_path), None)
+    upsert(collection, 0, data)
+    snapshot = collection._snapshot
+    upsert(collection, 50, vectors(50, seed=1))
+    collection.delete(ids=[str(i) for i in range(40)])
+    # A query that started before the writes still sees a consistent old version
+    scores = collection.approximate_scores(data[0] / np.linalg.norm(data[0]), snapshot)
+    assert len(scores) == len(snapshot) == 50
+    assert int(np.argmax(scores)) == 0
@@ -0,0 +1,17 @@
+from app.core import sarvam_client
+from app.core.deadline import Deadline
+from app.rag.generator import generate_response
+
+DOCS = [{"id": "1", "content": "ROLE: Clerk\nLOCATION: Patiala", "meta": {}, "source": "jobs"}]
+
+
+def test_failed_completion_is_reported(monkeypatch):
+    def fail(**kwargs):
+        raise TimeoutError("upstream timed out")
+
+    monkeypatch.setattr(sarvam_client, "chat_completion", fail)
+    deadline, stats = Deadline(10), {}
+    answer = generate_response("clerk jobs in patiala", DOCS, "search_job", stats=stats, deadline=deadline)
+    assert "unable to generate a response" in answer
+    assert stats["llm_failed"] is True
+    assert deadline.degradations == ["llm_failed"]
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from app.rag.job_fields import is_expired, matches_where, parse_date, parse_deadline
+
+
+def test_parse_deadline_formats():
+    expected = datetime(2027, 1, 15)
+    for text in ("15-01-2027", "15/01/2027", "15.01.2027", "2027-01-15", "15 Jan 2027",
+                 "15 January 2027", "15-Jan-2027", "Jan 15, 2027", "  15   Jan  2027 "):
+        assert parse_deadline(text) == expected, text
+
+
+def test_parse_deadline_unparseable():
+    for text in (None, "", "N/A", "soon", "31-02-2027"):
+        assert parse_deadline(text) is None
+
+
+def test_parse_deadline_drops_the_time_of_day():
+    assert parse_deadline(datetime(2027, 1, 15, 17, 30)) == datetime(2027, 1, 15)
+
+
+def test_parse_date():
+    assert parse_date("15-01-2027") == 20270115
+    assert parse_date("N/A") == 0
+
+
+def test_matches_where():
+    meta = {"district": "patiala", "deadline": 20270115}
+    assert matches_where(meta, {"district": "patiala"})
+    assert matches_where(meta, {"$and": [{"deadline": {"$gte": 20270115}}, {"district": {"$in": ["patiala"]}}]})
+    assert not matches_where(meta, {"max_age": {"$gt": 0}})
+    assert matches_where(meta, {"$or": [{"district": "mohali"}, {"deadline": {"$lt": 20280101}}]})
+
+
+def test_is_expired():
+    cutoff = datetime(2026, 10, 18)
+    assert is_expired({"last_apply_date": "17-10-2026"}, cutoff)
+    assert not is_expired({"last_apply_date": "18-10-2026"}, cutoff)
+    assert not is_expired({"last_apply_date": "N/A"}, cutoff)
+    # The typed deadline written by the scraper wins over the raw text
+    assert is_expired({"deadline_at": datetime(2026, 1, 1), "last_apply_date": "garbled"}, cutoff)
@@ -0,0 +1,73 @@
+import copy
+
+from app.services.session_store import SessionStore, _new_session
+
+
+class SharedBackend:
+    """
+    Stands in for the Mongo collection shared by several workers.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        self.before_save = None
+
+    def load(self, session_id):
+        doc = self.docs.get(session_id)
+        if doc is None:
+            return None
+        session = _new_session()
+        session.update(copy.deepcopy(doc))
+        return session
+
+    def save(self, session_id, snapshot, version):
+        if self.before_save is not None:
+            hook, self.before_save = self.before_save, None
+            hook()
+        if self.docs.get(session_id, {}).get("version", 0) != version:
+            return False
+        self.docs[session_id] = {**copy.deepcopy(snapshot), "version": version + 1}
+        return True
+
+    def delete(self, session_id):
+        self.docs.pop(session_id, None)
+
+
+def workers(n=2):
+    backend = SharedBackend()
+    return backend, [SessionStore(recent_turns=2, backend=backend) for _ in range(n)]
+
+
+def questions(store, session_id="s"):
+    summary, turns = store.get_context(session_id)
+    return summary, [t["content"] for t in turns if t["role"] == "user"]
+
+
+def test_workers_see_each_others_turns():
+    _, (a, b) = workers()
+    a.append_turn("s", "clerk jobs", "answer 1")
+    b.append_turn("s", "in patiala", "answer 2")
+    a.append_turn("s", "for 12th pass", "answer 3")
+    summary, recent = questions(b)
+    assert recent == ["in patiala", "for 12th pass"]
+    assert "clerk jobs" in summary
+
+
+def test_concurrent_append_is_not_lost():
+    backend, (a, b) = workers()
+    a.append_turn("s", "first", "answer 1")
+    # b saves between a's read and a's write
+    backend.before_save = lambda: b.append_turn("s", "from b", "answer b")
+    a.append_turn("s", "from a", "answer a")
+    assert questions(a)[1] == ["from b", "from a"]
+    assert backend.docs["s"]["version"] == 3
+
+
+def test_memory_only_store():
+    store = SessionStore(recent_turns=1)
+    store.append_turn("s", "clerk jobs", "answer 1")
+    store.append_turn("s", "in patiala", "answer 2")
+    summary, recent = questions(store)
+    assert recent == ["in patiala"] and "clerk jobs" in summary
+    store.clear("s")
+    assert store.get_context("s") == ("", [])
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_followers_share_the_leaders_result():
+    flight, release, calls = SingleFlight("test"), threading.Event(), []
+
+    def compute(value):
+        calls.append(value)
+        release.wait(5)
+        return {"answer": value}
+
+    async def run():
+        leader = asyncio.ensure_future(flight.run("k", compute, 1))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.run("k", compute, 2))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await leader, await follower
+
+    (leader, shared_leader), (follower, shared_follower) = asyncio.run(run())
+    assert calls == [1]
+    assert leader == follower == {"answer": 1}
+    assert not shared_leader and shared_follower
+    assert flight.inflight() == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight, release = SingleFlight("test"), threading.Event()
+
+    def compute():
+        release.wait(5)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.run("k", compute))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.run("k", compute))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        results = await asyncio.gather(flight.run("k", fail), flight.run("k", fail), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.inflight() == 0
+
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.nlu.gurmukhi import tokenize
+from app.rag.sparse_index import SparseIndex
+
+DOCS = [
+    "clerk vacancy in patiala for 12th pass",
+    "software engineer private job in mohali",
+    "government teacher posts in amritsar",
+    "clerk and data entry operator in ludhiana",
+    "nurse recruitment patiala civil hospital",
+]
+QUERIES = ["clerk patiala", "engineer mohali", "teacher", "nurse hospital patiala", "unknown words"]
+
+
+def build(docs):
+    index = SparseIndex()
+    index.add(tokenize(doc) for doc in docs)
+    return index.finalize()
+
+
+def test_paged_build_matches_single_build():
+    paged = SparseIndex()
+    paged.add(tokenize(doc) for doc in DOCS[:2])
+    paged.add(tokenize(doc) for doc in DOCS[2:])
+    paged.finalize()
+    single = build(DOCS)
+    for query in QUERIES:
+        np.testing.assert_allclose(paged.get_scores(tokenize(query)), single.get_scores(tokenize(query)))
+
+
+def test_updated_matches_full_rebuild():
+    keep = np.array([True, False, True, True, False])
+    added = ["clerk vacancy in bathinda", "staff nurse in patiala"]
+    updated = build(DOCS).updated(keep, (tokenize(doc) for doc in added))
+    rebuilt = build([doc for doc, kept in zip(DOCS, keep) if kept] + added)
+
+    assert updated.size == rebuilt.size == 5
+    assert updated.vocabulary_size() == rebuilt.vocabulary_size()
+    for query in QUERIES + ["bathinda", "staff nurse"]:
+        np.testing.assert_allclose(updated.get_scores(tokenize(query)), rebuilt.get_scores(tokenize(query)))
+
+
+def test_updated_can_drop_everything():
+    updated = build(DOCS).updated(np.zeros(len(DOCS), dtype=bool), [tokenize("clerk in moga")])
+    assert updated.size == 1
+    np.testing.assert_allclose(updated.get_scores(tokenize("clerk")), build(["clerk in moga"]).get_scores(tokenize("clerk")))
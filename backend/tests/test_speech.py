@@ -0,0 +1,35 @@
+from app.services.speech import RingBuffer
+
+
+def test_read_within_capacity():
+    ring = RingBuffer(8)
+    ring.write(b"abcde")
+    assert ring.read(0) == b"abcde"
+    assert ring.read(1, 3) == b"bc"
+
+
+def test_wraparound_keeps_the_newest_bytes():
+    ring = RingBuffer(8)
+    ring.write(b"abcdef")
+    ring.write(b"ghij")
+    assert ring.total == 10
+    # Positions 0-1 were overwritten: reads are clipped to what is still buffered
+    assert ring.read(0) == b"cdefghij"
+    assert ring.read(5, 9) == b"fghi"
+    assert ring.read(8) == b"ij"
+
+
+def test_write_larger_than_capacity():
+    ring = RingBuffer(4)
+    ring.write(b"ab")
+    ring.write(b"cdefgh")
+    assert ring.total == 8
+    assert ring.read(0) == b"efgh"
+
+
+def test_empty_and_past_end_reads():
+    ring = RingBuffer(4)
+    assert ring.read(0) == b""
+    ring.write(b"abc")
+    assert ring.read(3) == b""
+    assert ring.read(2, 100) == b"c"
@@ -365,11 +365,14 @@ export default function PGRKAMChatbot() {
     setLoading(true);
 
     try {
+      // The backend keeps conversation memory per session, so history is only
+      // sent until the first response hands us a session id
+      const currentSessionId = sessionId || sessionStorage.getItem('pgrkam_session_id') || undefined;
       const requestBody = {
         message: messageText,
         language: language,
-        session_id: sessionId || sessionStorage.getItem('pgrkam_session_id') || undefined,
-        history: messages.slice(-8).map(m => ({
+        session_id: currentSessionId,
+        history: currentSessionId ? undefined : messages.slice(-8).map(m => ({
           role: m.role === "assistant" ? "assistant" : "user",
           content: m.content
         }))
@@ -382,7 +385,9 @@ export default function PGRKAMChatbot() {
         method: "POST",
         headers: { 
           "Content-Type": "application/json",
-          "Accept": "application/json"
+          "Accept": "application/json",
+          // Lets the backend's admission control apply per-session limits without parsing the body
+          ...(currentSessionId ? { "X-Session-Id": currentSessionId } : {})
         },
         body: JSON.stringify(requestBody),
         signal: controller.signal